@@ -3,14 +3,15 @@ from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate, login, logout
+from apps.core.permissions import RegistrationsOpen, SiteAvailable
 from .serializers import UserSerializer, RegisterSerializer
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [SiteAvailable, RegistrationsOpen, permissions.AllowAny]
 
 class LoginView(APIView):
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [SiteAvailable, permissions.AllowAny]
 
     def post(self, request):
         username = request.data.get('username')
@@ -23,14 +24,14 @@ class LoginView(APIView):
         return Response({'error': 'Invalid credentials'}, status=400)
 
 class LogoutView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [SiteAvailable, permissions.IsAuthenticated]
 
     def post(self, request):
         logout(request)
         return Response({'success': 'Logged out'})
 
 class CurrentUserView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [SiteAvailable, permissions.IsAuthenticated]
 
     def get(self, request):
         serializer = UserSerializer(request.user)
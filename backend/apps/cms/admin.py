@@ -1,4 +1,5 @@
 # CMS Admin
+from django.db.models import F
 from apps.cms.models import SiteSettings, Page, MediaAsset
 
 @admin.register(SiteSettings)
@@ -36,7 +37,7 @@ class PageAdmin(ModelAdmin, ImportExportModelAdmin):
     list_filter = ['page_type', 'status', 'show_in_menu', 'published_at']
     search_fields = ['title', 'content', 'meta_title']
     list_editable = ['status', 'show_in_menu']
-    ordering = ['-published_at', '-created_at']
+    ordering = [F('published_at').desc(nulls_last=True), '-created_at']
     prepopulated_fields = {'slug': ('title',)}
 
     fieldsets = (
@@ -2,7 +2,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from cloudinary.models import CloudinaryField
-from apps.core.models import TimeStampedModel
+from apps.core.models import KeysetIndex, TimeStampedModel, UUIDTaggedItem
 from tinymce.models import HTMLField
 from taggit.managers import TaggableManager
 
@@ -59,7 +59,7 @@ class SiteSettings(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         # Ensure only one instance exists
-        if not self.pk and SiteSettings.objects.exists():
+        if self._state.adding and SiteSettings.objects.exists():
             raise ValueError("Only one SiteSettings instance is allowed")
         super().save(*args, **kwargs)
 
@@ -112,13 +112,16 @@ class Page(TimeStampedModel):
     allowed_membership_tiers = models.JSONField(default=list, blank=True)
 
     # Tags and Categories
-    tags = TaggableManager(blank=True)
+    tags = TaggableManager(blank=True, through=UUIDTaggedItem)
 
     # View tracking
     view_count = models.PositiveIntegerField(default=0)
 
     class Meta:
-        ordering = ['-published_at', '-created_at']
+        ordering = [models.F('published_at').desc(nulls_last=True), '-created_at']
+        indexes = [
+            KeysetIndex(fields=['status', '-published_at', '-created_at', '-id'], name='cms_page_keyset_idx'),
+        ]
         verbose_name = "Page"
         verbose_name_plural = "Pages"
 
@@ -163,7 +166,7 @@ class MediaAsset(TimeStampedModel):
 
     # Organization
     folder = models.CharField(max_length=100, blank=True, help_text="Organizational folder")
-    tags = TaggableManager(blank=True)
+    tags = TaggableManager(blank=True, through=UUIDTaggedItem)
 
     # Usage tracking
     used_in_pages = models.ManyToManyField(Page, blank=True, related_name='media_assets')
@@ -1,5 +1,6 @@
 
 from django.contrib import admin
+from django.db.models import F
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -122,9 +123,19 @@ class ContactAdmin(ModelAdmin):
         }),
     )
 
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['attempts', 'last_error', 'sent_at', 'created_at']
+    ordering = ['-created_at']
+
 @admin.register(SiteStats)
 class SiteStatsAdmin(ModelAdmin):
     list_display = ['updated_at', 'active_projects', 'total_members', 'research_papers_published', 'cities_impacted']
+    # Maintained from the source tables; run recount_site_stats to fix drift
+    readonly_fields = ['active_projects', 'total_members', 'research_papers_published', 'cities_impacted']
 
     def has_add_permission(self, request):
         # Only allow one instance
@@ -227,8 +238,10 @@ class PublicationAdmin(ModelAdmin, ImportExportModelAdmin):
     list_filter = ['publication_type', 'status', 'category', 'publication_date']
     search_fields = ['title', 'abstract', 'keywords']
     list_editable = ['status']
-    ordering = ['-publication_date', '-created_at']
+    ordering = [F('publication_date').desc(nulls_last=True), '-created_at']
     filter_horizontal = ['authors']
+    # Maintained from verified Citation rows
+    readonly_fields = ['citation_count']
 
     fieldsets = (
         ('Basic Information', {
@@ -353,7 +366,7 @@ class PageAdmin(ModelAdmin, ImportExportModelAdmin):
     list_filter = ['page_type', 'status', 'show_in_menu', 'published_at']
     search_fields = ['title', 'content', 'meta_title']
     list_editable = ['status', 'show_in_menu']
-    ordering = ['-published_at', '-created_at']
+    ordering = [F('published_at').desc(nulls_last=True), '-created_at']
     prepopulated_fields = {'slug': ('title',)}
 
     fieldsets = (
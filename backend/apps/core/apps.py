@@ -1,4 +1,3 @@
-
 from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
@@ -6,9 +5,5 @@ class CoreConfig(AppConfig):
     name = 'apps.core'
     verbose_name = 'Core'
 
-from django.apps import AppConfig
-
-class CoreConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.core'
-    verbose_name = 'Core'
+    def ready(self):
+        from apps.core import signals  # noqa: F401
@@ -0,0 +1,172 @@
+import atexit
+import logging
+import threading
+import time
+import redis
+from collections import defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# Model label -> counter fields that may be bumped through this module
+COUNTED_FIELDS = {
+    'research.publication': {'view_count', 'download_count'},
+    'cms.page': {'view_count'},
+    'cms.faq': {'view_count'},
+    'cms.mediaasset': {'download_count'},
+}
+
+# Rows per UPDATE ... WHERE pk IN (...)
+COUNTER_UPDATE_BATCH_SIZE = 500
+
+FLUSH_LOCK_KEY = 'counters:flush-lock'
+FLUSH_LOCK_TIMEOUT = 60
+
+REDIS_PENDING_KEY = 'counters:pending'
+REDIS_FLUSHING_KEY = 'counters:flushing'
+
+def counter_key(label, field, pk):
+    return f"{label}:{field}:{pk}"
+
+def apply_deltas(deltas):
+    """Add {counter key: delta} to the database, returning the number of rows updated
+
+    Rows sharing a model, field and delta go in one UPDATE ... SET field =
+    field + delta, so a flush costs a handful of statements however many
+    reads it covers, and never touches updated_at.
+    """
+    groups = defaultdict(list)
+    for key, delta in deltas.items():
+        label, field, pk = key.split(':', 2)
+        if delta:
+            groups[label, field, delta].append(pk)
+
+    updated = 0
+    with transaction.atomic():
+        # Sorted keys take row locks in the same order in every flush
+        for (label, field, delta), pks in sorted(groups.items()):
+            model = apps.get_model(label)
+            pks = sorted(pks)
+            for start in range(0, len(pks), COUNTER_UPDATE_BATCH_SIZE):
+                updated += model.objects.filter(pk__in=pks[start:start + COUNTER_UPDATE_BATCH_SIZE]).update(
+                    **{field: F(field) + delta})
+    return updated
+
+class MemoryCounterBuffer:
+    """Per-process buffer for development, flushed by a background thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Held for a whole flush, so a flush returns only once earlier ones are written
+        self._flush_lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._flusher = None
+
+    def add(self, key, amount):
+        with self._lock:
+            self._pending[key] += amount
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name='counter-flusher', daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending = self._pending, defaultdict(int)
+            if not deltas:
+                return 0
+            try:
+                apply_deltas(deltas)
+            except Exception:
+                # Put the counts back for the next flush rather than lose them
+                with self._lock:
+                    for key, delta in deltas.items():
+                        self._pending[key] += delta
+                raise
+            return len(deltas)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Counter flush failed")
+            finally:
+                close_old_connections()
+
+class RedisCounterBuffer:
+    """Counters shared by every worker in one Redis hash, flushed by the flush_counters task
+
+    A flush renames the pending hash aside and deletes it only after the
+    database transaction commits. A flush that dies in between leaves the
+    hash for the next one to apply again, so a count can be written twice
+    but is never lost.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def add(self, key, amount):
+        self.client.hincrby(REDIS_PENDING_KEY, key, amount)
+
+    def flush(self):
+        if not self.client.exists(REDIS_FLUSHING_KEY):
+            try:
+                self.client.rename(REDIS_PENDING_KEY, REDIS_FLUSHING_KEY)
+            except redis.ResponseError:
+                return 0  # Nothing pending
+        deltas = {key.decode(): int(value) for key, value in self.client.hgetall(REDIS_FLUSHING_KEY).items()}
+        apply_deltas(deltas)
+        self.client.delete(REDIS_FLUSHING_KEY)
+        return len(deltas)
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def counter_buffer():
+    """The process's counter buffer, chosen by COUNTER_BACKEND"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if settings.COUNTER_BACKEND == 'redis':
+                    _buffer = RedisCounterBuffer(settings.COUNTER_REDIS_URL)
+                else:
+                    _buffer = MemoryCounterBuffer(settings.COUNTER_FLUSH_INTERVAL)
+    return _buffer
+
+def increment(model, pk, field, amount=1):
+    """Count a view or download without writing to the row"""
+    label = model._meta.label_lower
+    if field not in COUNTED_FIELDS.get(label, ()):
+        raise ValueError(f"{label}.{field} is not a buffered counter")
+    key = counter_key(label, field, pk)
+    try:
+        counter_buffer().add(key, amount)
+    except Exception:
+        # Redis is down: keep the count with a direct update instead
+        logger.warning("Counter buffer unavailable, updating %s directly", key, exc_info=True)
+        apply_deltas({key: amount})
+
+def flush_counters():
+    """Write buffered increments to the database, returning how many counters changed"""
+    if not cache.add(FLUSH_LOCK_KEY, True, timeout=FLUSH_LOCK_TIMEOUT):
+        return 0  # Another flush is running
+    try:
+        return counter_buffer().flush()
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
@@ -0,0 +1,89 @@
+import json
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.core.models import SiteStats, FocusArea, ImpactStory, SocialMediaLink
+from apps.cms.models import Slider, Testimonial
+
+HOMEPAGE_SNAPSHOT_KEY = 'core:homepage-snapshot'
+FEATURED_STORIES_LIMIT = 6
+
+# Models whose changes invalidate the homepage snapshot
+HOMEPAGE_SOURCE_MODELS = [SiteStats, Slider, ImpactStory, FocusArea, Testimonial, SocialMediaLink]
+
+def _media_url(field):
+    return field.url if field else None
+
+def build_homepage_snapshot():
+    """Build the homepage payload and store it as pre-serialized JSON in the cache"""
+    # An unsaved instance carries the model defaults without writing a row
+    stats = SiteStats.objects.first() or SiteStats()
+
+    sliders = Slider.objects.filter(is_active=True).select_related('cta_page').order_by('order')
+    stories = ImpactStory.objects.filter(status='published', featured=True)[:FEATURED_STORIES_LIMIT]
+    focus_areas = FocusArea.objects.filter(is_active=True).order_by('order', 'title')
+    testimonials = Testimonial.objects.filter(is_active=True, featured=True)
+    social_links = SocialMediaLink.objects.filter(is_active=True).order_by('order', 'platform')
+
+    data = {
+        'stats': {
+            'active_projects': stats.active_projects,
+            'total_members': stats.total_members,
+            'research_papers_published': stats.research_papers_published,
+            'cities_impacted': stats.cities_impacted,
+        },
+        'sliders': [{
+            'id': str(slider.id),
+            'title': slider.title,
+            'subtitle': slider.subtitle,
+            'description': slider.description,
+            'image': _media_url(slider.image),
+            'video_url': slider.video_url,
+            'cta_text': slider.cta_text,
+            'cta_url': slider.cta_url,
+            'animation_type': slider.animation_type,
+        } for slider in sliders],
+        'featured_stories': [{
+            'id': str(story.id),
+            'title': story.title,
+            'summary': story.summary,
+            'image': _media_url(story.image),
+            'location': story.location,
+            'impact_metrics': story.impact_metrics,
+        } for story in stories],
+        'focus_areas': [{
+            'id': str(area.id),
+            'title': area.title,
+            'category': area.category,
+            'description': area.description,
+            'subtopics': area.subtopics,
+            'icon': area.icon,
+            'color': area.color,
+        } for area in focus_areas],
+        'testimonials': [{
+            'id': str(testimonial.id),
+            'name': testimonial.name,
+            'position': testimonial.position,
+            'organization': testimonial.organization,
+            'content': testimonial.content,
+            'photo': _media_url(testimonial.photo),
+            'rating': testimonial.rating,
+        } for testimonial in testimonials],
+        'social_links': [{
+            'platform': link.platform,
+            'url': link.url,
+            'username': link.username,
+        } for link in social_links],
+    }
+
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    # No expiry: the snapshot is replaced whenever a source model changes
+    cache.set(HOMEPAGE_SNAPSHOT_KEY, payload, timeout=None)
+    return payload
+
+def get_homepage_snapshot():
+    """Return the cached homepage JSON, building it on a cold cache"""
+    payload = cache.get(HOMEPAGE_SNAPSHOT_KEY)
+    if payload is None:
+        payload = build_homepage_snapshot()
+    return payload
@@ -0,0 +1,16 @@
+import hashlib
+from django.db import connections
+
+def lock_until_commit(name, using='default'):
+    """Wait for, then hold, a database-wide lock on `name` until the current transaction ends
+
+    Call inside transaction.atomic(). On PostgreSQL this is a transaction
+    advisory lock, so writers in other processes and on other hosts queue
+    behind the holder. SQLite already lets one writer in at a time.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    key = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big', signed=True)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
@@ -0,0 +1,79 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """Store an email in the outbox and wake the delivery worker after commit"""
+    from apps.core.tasks import send_queued_emails
+
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+    transaction.on_commit(send_queued_emails.delay)
+    return email
+
+def _claim_batch(batch_size):
+    """Lock a batch of due emails, skipping rows another worker already holds"""
+    return list(
+        OutboundEmail.objects.select_for_update(skip_locked=True)
+        .filter(status='pending', next_attempt_at__lte=timezone.now())
+        .order_by('next_attempt_at')[:batch_size]
+    )
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        # Exponential backoff: 1, 2, 4, 8... minutes
+        email.next_attempt_at = timezone.now() + timedelta(minutes=2 ** (email.attempts - 1))
+
+def deliver_outbox(batch_size=None):
+    """Send due emails in batches over one reused SMTP connection, returning the count sent"""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = 0
+    connection = get_connection()
+
+    try:
+        while True:
+            with transaction.atomic():
+                batch = _claim_batch(batch_size)
+                if not batch:
+                    break
+
+                for email in batch:
+                    message = EmailMessage(email.subject, email.body, email.from_email,
+                                           email.recipients, connection=connection)
+                    try:
+                        # Opens the connection on first use and keeps it open
+                        connection.open()
+                        message.send()
+                    except Exception as e:
+                        logger.warning("Failed to send outbox email %s: %s", email.pk, e)
+                        _record_failure(email, e)
+                        # The server may have dropped us; reconnect for the next one
+                        connection.close()
+                    else:
+                        email.attempts += 1
+                        email.status = 'sent'
+                        email.sent_at = timezone.now()
+                        email.last_error = ''
+                        sent += 1
+
+                OutboundEmail.objects.bulk_update(
+                    batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    finally:
+        connection.close()
+
+    return sent
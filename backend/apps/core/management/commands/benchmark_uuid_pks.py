@@ -0,0 +1,73 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+
+from apps.core.models import time_ordered_uuid
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': time_ordered_uuid,
+}
+
+def make_bench_model(name):
+    """Throwaway model mirroring TimeStampedModel's key and timestamp columns"""
+    class Meta:
+        app_label = 'core'
+        db_table = f'core_bench_{name}'
+        managed = False
+
+    return type(f'Bench{name.title()}', (models.Model,), {
+        '__module__': __name__,
+        'Meta': Meta,
+        'id': models.UUIDField(primary_key=True),
+        'created_at': models.DateTimeField(auto_now_add=True),
+    })
+
+class Command(BaseCommand):
+    help = "Compare insert throughput and primary key index size of uuid4 and time-ordered keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        rows, batch_size = options['rows'], options['batch_size']
+        self.stdout.write(f"Inserting {rows:,} rows per key type on {connection.vendor}")
+
+        for name, generate in GENERATORS.items():
+            model = make_bench_model(name)
+            with connection.schema_editor() as editor:
+                editor.create_model(model)
+            try:
+                started = time.perf_counter()
+                for offset in range(0, rows, batch_size):
+                    count = min(batch_size, rows - offset)
+                    model.objects.bulk_create([model(id=generate()) for _ in range(count)])
+                elapsed = time.perf_counter() - started
+
+                index_size = self.index_size(model)
+                size_display = f"{index_size / 1024 / 1024:.1f} MB" if index_size else "n/a"
+                self.stdout.write(
+                    f"{name}: {rows / elapsed:,.0f} rows/s ({elapsed:.1f}s), pk index {size_display}")
+            finally:
+                with connection.schema_editor() as editor:
+                    editor.delete_model(model)
+
+    def index_size(self, model):
+        """Size in bytes of the table's primary key index, where the backend reports it"""
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT pg_relation_size(%s)", [f'{table}_pkey'])
+                return cursor.fetchone()[0]
+            if connection.vendor == 'sqlite':
+                try:
+                    cursor.execute(
+                        "SELECT SUM(pgsize) FROM dbstat WHERE name = %s",
+                        [f'sqlite_autoindex_{table}_1'])
+                    return cursor.fetchone()[0]
+                except Exception:
+                    # dbstat is an optional SQLite build feature
+                    return None
+        return None
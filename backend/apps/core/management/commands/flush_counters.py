@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.counters import flush_counters
+
+class Command(BaseCommand):
+    help = "Write buffered view and download counts to the database"
+
+    def handle(self, *args, **options):
+        if settings.COUNTER_BACKEND != 'redis':
+            self.stdout.write("The in-process buffer is flushed by each web process; nothing shared to flush")
+            return
+        changed = flush_counters()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {changed:,} counters"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.stats import recount_site_stats
+
+class Command(BaseCommand):
+    help = "Recompute SiteStats counters from the source tables to fix any drift"
+
+    def handle(self, *args, **options):
+        values = recount_site_stats()
+        for field, value in values.items():
+            self.stdout.write(f"{field}: {value}")
+        self.stdout.write(self.style.SUCCESS("Site statistics recounted"))
@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F
+
+from apps.core.counters import flush_counters, increment
+from apps.research.models import Publication
+
+class Command(BaseCommand):
+    help = "Count views on a few hot publications from many threads and check no increment is lost"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--increments', type=int, default=5_000, help="Views per thread")
+        parser.add_argument('--rows', type=int, default=20, help="Publications the views are spread over")
+        parser.add_argument('--flush-interval', type=float, default=0.5)
+        parser.add_argument('--compare', action='store_true',
+                            help="Also time a direct UPDATE per view, as a per-read save would do")
+
+    def handle(self, *args, **options):
+        marker = f'stress-{uuid.uuid4().hex[:8]}'
+        publications = Publication.objects.bulk_create([
+            Publication(title=f'{marker} {i}', abstract='', publication_type='report')
+            for i in range(options['rows'])
+        ])
+        pks = [publication.pk for publication in publications]
+
+        try:
+            buffered = self.run(pks, options, lambda pk: increment(Publication, pk, 'view_count'),
+                                flush=True)
+            if options['compare']:
+                direct = self.run(pks, options, lambda pk: Publication.objects.filter(pk=pk).update(
+                    view_count=F('view_count') + 1))
+                self.stdout.write(f"Buffered counting is {direct / buffered:.0f}x faster than an UPDATE per view")
+        finally:
+            Publication.objects.filter(pk__in=pks).delete()
+
+    def run(self, pks, options, count_view, flush=False):
+        threads, increments = options['threads'], options['increments']
+        Publication.objects.filter(pk__in=pks).update(view_count=0)
+        expected = {pk: 0 for pk in pks}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local = {pk: 0 for pk in pks}
+            try:
+                for _ in range(increments):
+                    # Skewed towards the first rows, like a front-page paper
+                    pk = pks[min(int(rng.expovariate(4 / len(pks))), len(pks) - 1)]
+                    count_view(pk)
+                    local[pk] += 1
+            finally:
+                connection.close()
+            with lock:
+                for pk, count in local.items():
+                    expected[pk] += count
+
+        def flusher():
+            try:
+                while not done.wait(options['flush_interval']):
+                    flush_counters()
+            finally:
+                connection.close()
+
+        flush_thread = threading.Thread(target=flusher) if flush else None
+        if flush_thread:
+            flush_thread.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for future in [pool.submit(worker, seed) for seed in range(threads)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+        done.set()
+        if flush_thread:
+            flush_thread.join()
+            flush_counters()
+
+        total = threads * increments
+        label = "buffered" if flush else "direct UPDATE"
+        self.stdout.write(f"{label}: {total:,} views on {threads} threads in {elapsed:.2f}s "
+                          f"({total / elapsed:,.0f}/s)")
+
+        counts = dict(Publication.objects.filter(pk__in=pks).values_list('pk', 'view_count'))
+        if counts != expected:
+            lost = sum(expected.values()) - sum(counts.values())
+            raise CommandError(f"Counts do not match the views made ({lost:+,} missing)")
+        self.stdout.write(self.style.SUCCESS(f"All {total:,} views reached the database"))
+        return elapsed
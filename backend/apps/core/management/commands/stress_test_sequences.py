@@ -0,0 +1,61 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.core.models import SequenceCounter
+from apps.core.sequences import next_sequence_value
+
+class Command(BaseCommand):
+    help = "Allocate from one sequence on many threads and check for duplicates, gaps and slowdown"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--allocations', type=int, default=500,
+                            help="Allocations per thread")
+
+    def handle(self, *args, **options):
+        threads, allocations = options['threads'], options['allocations']
+        name = f'stress_{uuid.uuid4().hex[:8]}'
+        year = 2000
+        lock = threading.Lock()
+        values, timings = [], []
+
+        def worker():
+            try:
+                for _ in range(allocations):
+                    started = time.perf_counter()
+                    value = next_sequence_value(name, year)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        values.append(value)
+                        timings.append(elapsed)
+            finally:
+                # Each thread opens its own connection
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                for future in [pool.submit(worker) for _ in range(threads)]:
+                    future.result()
+            elapsed = time.perf_counter() - started
+        finally:
+            SequenceCounter.objects.filter(name=name, year=year).delete()
+
+        total = threads * allocations
+        if len(set(values)) != len(values):
+            raise CommandError(f"Duplicate numbers allocated: {len(values) - len(set(values))}")
+        if sorted(values) != list(range(1, total + 1)):
+            raise CommandError("Allocated numbers are not a gapless 1..N range")
+
+        # Compare the first and last tenth of allocations to show cost does not grow
+        tenth = max(len(timings) // 10, 1)
+        first = sum(timings[:tenth]) / tenth * 1000
+        last = sum(timings[-tenth:]) / tenth * 1000
+        self.stdout.write(f"{total:,} allocations on {threads} threads in {elapsed:.2f}s "
+                          f"({total / elapsed:,.0f}/s)")
+        self.stdout.write(f"Mean latency: first 10% {first:.2f} ms, last 10% {last:.2f} ms")
+        self.stdout.write(self.style.SUCCESS("No duplicates or gaps"))
@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.singletons import get_site_settings
+
+class SiteSettingsMiddleware:
+    """Expose SiteSettings on the request
+
+    Its feature flags are enforced by the permissions in apps.core.permissions,
+    which run once DRF has authenticated the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Served from worker memory, so reading flags costs no query
+        request.site_settings = SimpleLazyObject(get_site_settings)
+        return self.get_response(request)
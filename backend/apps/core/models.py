@@ -4,17 +4,70 @@ from django.contrib.auth.models import User
 from cloudinary.models import CloudinaryField
 from django.urls import reverse
 from taggit.managers import TaggableManager
+from taggit.models import GenericUUIDTaggedItemBase, TaggedItemBase
+from django.conf import settings
+from django.utils import timezone
+import os
+import time
 import uuid
 
+def time_ordered_uuid():
+    """UUIDv7-style id: 48-bit millisecond timestamp followed by random bits"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), 'big') & ((1 << 80) - 1)
+    # Stamp the version (7) and RFC 4122 variant bits
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+def default_pk():
+    """Primary key default, time-ordered when TIME_ORDERED_UUID_PKS is enabled"""
+    # Random uuid4 keys scatter inserts across the B-tree; time-ordered keys
+    # append to its right edge so recent pages stay hot in the buffer cache.
+    if getattr(settings, 'TIME_ORDERED_UUID_PKS', False):
+        return time_ordered_uuid()
+    return uuid.uuid4()
+
+class KeysetIndex(models.Index):
+    """Index over a keyset ordering that stores NULLs where KeysetPagination reads them
+
+    NULL counts as the smallest value: last in a descending column, first
+    in an ascending one. SQLite indexes it that way already; PostgreSQL
+    puts NULLs the other way round unless told, and SQLite rejects the
+    NULLS clause, so it is only added there.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql' or self.expressions:
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        fields = [model._meta.get_field(name) for name, _ in self.fields_orders]
+        suffixes = [(f'{order} NULLS LAST' if order else 'NULLS FIRST') if field.null else order
+                    for field, (_, order) in zip(fields, self.fields_orders)]
+        return schema_editor._create_index_sql(
+            model, fields=fields, name=self.name, using=using, db_tablespace=self.db_tablespace,
+            col_suffixes=suffixes, opclasses=self.opclasses,
+            condition=self._get_condition_sql(model, schema_editor),
+            include=[model._meta.get_field(name).column for name in self.include], **kwargs)
+
 class TimeStampedModel(models.Model):
     """Base model with created and updated timestamps"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=default_pk, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
 
+class UUIDTaggedItem(GenericUUIDTaggedItemBase, TaggedItemBase):
+    """Tag assignments for models with UUID primary keys"""
+    # taggit's default through model stores object_id as an integer, which
+    # cannot hold the UUID keys every model here uses
+
+    class Meta:
+        verbose_name = "Tagged Item"
+        verbose_name_plural = "Tagged Items"
+
 class Team(TimeStampedModel):
     """Team member model"""
     POSITION_CHOICES = [
@@ -120,7 +173,7 @@ class ImpactStory(TimeStampedModel):
     focus_areas = models.ManyToManyField(FocusArea, blank=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     featured = models.BooleanField(default=False, help_text="Show on homepage")
-    tags = TaggableManager(blank=True)
+    tags = TaggableManager(blank=True, through=UUIDTaggedItem)
 
     class Meta:
         ordering = ['-featured', '-created_at']
@@ -192,6 +245,33 @@ class Contact(TimeStampedModel):
     def __str__(self):
         return f"{self.name} - {self.get_subject_display()}"
 
+class OutboundEmail(TimeStampedModel):
+    """Emails queued by request handlers and delivered by a background worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list, help_text="List of recipient addresses")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
 class SiteStats(TimeStampedModel):
     """Site statistics for the homepage counter"""
     active_projects = models.PositiveIntegerField(default=0)
@@ -208,10 +288,37 @@ class SiteStats(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         # Ensure only one instance exists
-        if not self.pk and SiteStats.objects.exists():
+        if self._state.adding and SiteStats.objects.exists():
             raise ValueError("Only one SiteStats instance is allowed")
         super().save(*args, **kwargs)
 
+class ImpactedCity(TimeStampedModel):
+    """Reference counts of cities named by issues and impact stories"""
+    name = models.CharField(max_length=100, unique=True)
+    reference_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Impacted City"
+        verbose_name_plural = "Impacted Cities"
+
+    def __str__(self):
+        return f"{self.name} ({self.reference_count})"
+
+class SequenceCounter(TimeStampedModel):
+    """Per-year counters backing human-readable document numbers"""
+    name = models.CharField(max_length=50)
+    year = models.PositiveIntegerField()
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['name', 'year']
+        verbose_name = "Sequence Counter"
+        verbose_name_plural = "Sequence Counters"
+
+    def __str__(self):
+        return f"{self.name} {self.year}: {self.last_value}"
+
 class Headquarters(TimeStampedModel):
     """Organization headquarters information"""
     name = models.CharField(max_length=100, default="ShodhSrija Foundation")
@@ -247,6 +354,6 @@ class Headquarters(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         # Ensure only one instance exists  
-        if not self.pk and Headquarters.objects.exists():
+        if self._state.adding and Headquarters.objects.exists():
             raise ValueError("Only one Headquarters instance is allowed")
         super().save(*args, **kwargs)
@@ -0,0 +1,223 @@
+import base64
+import binascii
+import copy
+import json
+from datetime import date, datetime, time
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.db.models import F, OrderBy, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over the model's Meta.ordering, with the primary key as tiebreaker
+
+    Pages are found with range conditions on the ordering columns instead of
+    OFFSET, and nothing is counted, so with an index over the ordering a page
+    deep in the list costs the same as the first. Views opt in by setting
+    pagination_class; a view's own `ordering` overrides Meta.ordering and
+    may name annotations on the queryset as well as fields.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE or 20
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset, view):
+        """(field, descending) pairs, ending with the primary key
+
+        An annotation stands in as a copy of its output field named after it.
+        Orderings may be written as F('name').desc(nulls_last=True) and the
+        like; where NULLs go is decided here, see _segments.
+        """
+        names = getattr(view, 'ordering', None) or queryset.model._meta.ordering
+        opts = queryset.model._meta
+        annotations = queryset.query.annotations
+        ordering = []
+        for name in names:
+            if isinstance(name, OrderBy) and isinstance(name.expression, F):
+                name = ('-' if name.descending else '') + name.expression.name
+            if not isinstance(name, str) or '__' in name.lstrip('-'):
+                raise ImproperlyConfigured(f"Keyset pagination needs plain field names, not {name!r}")
+            if name.lstrip('-') in annotations:
+                field = copy.copy(annotations[name.lstrip('-')].output_field)
+                field.set_attributes_from_name(name.lstrip('-'))
+                ordering.append((field, name.startswith('-')))
+                continue
+            try:
+                field = opts.pk if name.lstrip('-') == 'pk' else opts.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"{opts.label} has no field {name!r} to paginate on")
+            ordering.append((field, name.startswith('-')))
+        if opts.pk not in [field for field, _ in ordering]:
+            ordering.append((opts.pk, ordering[-1][1] if ordering else False))
+        return ordering
+
+    def _segments(self, scan, values, i=0, prefix=Q()):
+        """Conditions whose rows, each in plain index order, concatenate to the page's order
+
+        NULL counts as the smallest value, last in a descending column and
+        first in an ascending one, whatever the backend's default; PostgreSQL's
+        is the opposite. Splitting on NULL and on equality with the cursor
+        keeps each condition a single index range, where one OR'd WHERE
+        clause would fall back to a sort.
+        """
+        if i == len(scan):
+            return [prefix]
+        field, descending = scan[i]
+        column = field.attname
+        is_null = Q(**{f'{column}__isnull': True})
+        not_null = Q(**{f'{column}__isnull': False})
+
+        if values is None:
+            # No cursor bound on this column
+            if not field.null:
+                return self._segments(scan, None, i + 1, prefix)
+            non_null_rows = self._segments(scan, None, i + 1, prefix & not_null)
+            null_rows = self._segments(scan, None, i + 1, prefix & is_null)
+            return non_null_rows + null_rows if descending else null_rows + non_null_rows
+
+        value = values[i]
+        if value is None:
+            segments = self._segments(scan, values, i + 1, prefix & is_null)
+            if not descending:
+                segments += self._segments(scan, None, i + 1, prefix & not_null)
+            return segments
+
+        beyond = Q(**{f"{column}__{'lt' if descending else 'gt'}": value})
+        if i == len(scan) - 1:
+            return [prefix & beyond]
+        segments = self._segments(scan, values, i + 1, prefix & Q(**{column: value}))
+        segments += self._segments(scan, None, i + 1, prefix & beyond)
+        if descending and field.null:
+            segments += self._segments(scan, None, i + 1, prefix & is_null)
+        return segments
+
+    @staticmethod
+    def order_by(scan):
+        """ORDER BY for (field, descending) pairs, NULLs placed as in _segments
+
+        Columns that cannot be NULL are left without a NULLS clause, so the
+        clause matches a KeysetIndex over them on every backend.
+        """
+        order_by = []
+        for field, descending in scan:
+            column = F(field.attname)
+            if not field.null:
+                order_by.append(column.desc() if descending else column.asc())
+            else:
+                order_by.append(column.desc(nulls_last=True) if descending else column.asc(nulls_first=True))
+        return order_by
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        values, reverse = self.decode_cursor(request)
+
+        # Going back scans the reversed ordering from the cursor, then flips the page
+        scan = [(field, descending != reverse) for field, descending in self.ordering]
+        order_by = self.order_by(scan)
+
+        rows = []
+        for condition in self._segments(scan, values):
+            rows += queryset.filter(condition).order_by(*order_by)[:self.page_size + 1 - len(rows)]
+            if len(rows) > self.page_size:
+                break
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else values is not None
+        self.has_previous = has_more if reverse else values is not None
+        self.page = rows
+        return rows
+
+    def row_values(self, row):
+        return [getattr(row, field.attname) for field, _ in self.ordering]
+
+    def encode_cursor(self, values, reverse=False):
+        """Opaque token for the rows after these ordering values, or before them when reversed"""
+        def plain(value):
+            if isinstance(value, (date, datetime, time)):
+                # Full precision, unlike DjangoJSONEncoder's milliseconds
+                return value.isoformat()
+            return value if value is None or isinstance(value, (int, float, str, bool)) else str(value)
+
+        payload = {'v': [plain(value) for value in values]}
+        if reverse:
+            payload['r'] = 1
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+    def decode_cursor(self, request):
+        """(ordering values, reverse) from the cursor parameter, or (None, False) for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            raw = payload['v']
+            if len(raw) != len(self.ordering):
+                raise ValueError("Cursor does not match the ordering")
+            values = []
+            for (field, _), value in zip(self.ordering, raw):
+                if value is None and not field.null:
+                    raise ValueError(f"{field.name} cannot be null")
+                values.append(None if value is None else field.to_python(value))
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.row_values(self.page[-1]))
+
+    def previous_cursor(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.row_values(self.page[0]), reverse=True)
+
+    def get_next_link(self):
+        cursor = self.next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        cursor = self.previous_cursor()
+        if cursor is None:
+            # Stepped past the end; the first page is still there
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,51 @@
+from functools import wraps
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException, AuthenticationFailed, PermissionDenied
+from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from apps.core.singletons import get_site_settings
+
+class SiteUnderMaintenance(APIException):
+    status_code = 503
+    default_detail = 'The site is under maintenance. Please try again later.'
+    default_code = 'maintenance'
+
+class SiteAvailable(BasePermission):
+    """Only staff get through while SiteSettings.maintenance_mode is on
+
+    Checked after DRF authentication, so staff signed in with a token
+    count as staff too.
+    """
+
+    def has_permission(self, request, view):
+        if get_site_settings().maintenance_mode and not request.user.is_staff:
+            raise SiteUnderMaintenance()
+        return True
+
+class RegistrationsOpen(BasePermission):
+    """Refuse sign-ups while SiteSettings.allow_registrations is off"""
+
+    def has_permission(self, request, view):
+        # Raised rather than returned, or DRF would tell anonymous visitors to log in
+        if request.method == 'POST' and not get_site_settings().allow_registrations:
+            raise PermissionDenied('New registrations are currently closed.')
+        return True
+
+def site_available(view):
+    """SiteAvailable for plain Django views, which DRF permissions never see"""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if get_site_settings().maintenance_mode:
+            # Authenticated as DRF would, so token-holding staff get through here too
+            drf_request = Request(request, authenticators=[auth() for auth in
+                                                           api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+            try:
+                is_staff = drf_request.user.is_staff
+            except AuthenticationFailed:
+                is_staff = False
+            if not is_staff:
+                return JsonResponse({'detail': SiteUnderMaintenance.default_detail}, status=503)
+        return view(request, *args, **kwargs)
+    return wrapped
@@ -0,0 +1,28 @@
+from django.db import transaction
+
+from apps.core.models import SequenceCounter
+
+def next_sequence_value(name, year, seed=None):
+    """Allocate the next number in a per-year sequence without gaps or duplicates"""
+    # The counter row stays locked until the caller's transaction ends, so
+    # concurrent callers queue on it, and a rollback returns the number.
+    with transaction.atomic():
+        counter = SequenceCounter.objects.select_for_update().filter(name=name, year=year).first()
+        if counter is None:
+            # `seed` continues numbering from rows issued before the counter existed
+            counter, _ = SequenceCounter.objects.get_or_create(
+                name=name, year=year,
+                defaults={'last_value': seed() if seed else 0})
+            counter = SequenceCounter.objects.select_for_update().get(pk=counter.pk)
+
+        counter.last_value += 1
+        counter.save(update_fields=['last_value', 'updated_at'])
+        return counter.last_value
+
+def highest_issued(queryset, field, prefix):
+    """Largest number issued after `prefix` in `field`, or 0, to seed a new counter from"""
+    # Not a row count: deleted rows leave gaps below the highest number.
+    # Numbers are padded to four digits but can outgrow them, so compare as integers.
+    numbers = (value[len(prefix):] for value in
+               queryset.filter(**{f'{field}__startswith': prefix}).values_list(field, flat=True).iterator())
+    return max((int(number) for number in numbers if number.isdigit()), default=0)
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+
+from apps.core import stats
+from apps.core.singletons import SINGLETON_CACHES
+from apps.core.homepage import HOMEPAGE_SOURCE_MODELS
+from apps.core.tasks import rebuild_homepage_snapshot
+
+def schedule_homepage_rebuild(sender, **kwargs):
+    """Queue a snapshot rebuild once the current transaction commits"""
+    transaction.on_commit(rebuild_homepage_snapshot.delay)
+
+for model in HOMEPAGE_SOURCE_MODELS:
+    post_save.connect(schedule_homepage_rebuild, sender=model,
+                      dispatch_uid=f'homepage-save-{model._meta.label_lower}')
+    post_delete.connect(schedule_homepage_rebuild, sender=model,
+                        dispatch_uid=f'homepage-delete-{model._meta.label_lower}')
+
+# Keep SiteStats counters in step with their source tables
+for model in stats.TRACKED_MODELS:
+    label = model._meta.label_lower
+    post_init.connect(stats.remember_loaded_values, sender=model,
+                      dispatch_uid=f'stats-init-{label}')
+    pre_save.connect(stats.fill_missing_loaded_values, sender=model,
+                     dispatch_uid=f'stats-pre-save-{label}')
+    post_save.connect(stats.update_counters_on_save, sender=model,
+                      dispatch_uid=f'stats-save-{label}')
+    pre_delete.connect(stats.fill_missing_loaded_values, sender=model,
+                       dispatch_uid=f'stats-pre-delete-{label}')
+    post_delete.connect(stats.update_counters_on_delete, sender=model,
+                        dispatch_uid=f'stats-delete-{label}')
+
+def invalidate_singleton(sender, **kwargs):
+    """Tell every worker to drop its in-memory copy after the write commits"""
+    for singleton in SINGLETON_CACHES:
+        if singleton.model is sender:
+            transaction.on_commit(singleton.invalidate)
+
+for singleton in SINGLETON_CACHES:
+    label = singleton.model._meta.label_lower
+    post_save.connect(invalidate_singleton, sender=singleton.model,
+                      dispatch_uid=f'singleton-save-{label}')
+    post_delete.connect(invalidate_singleton, sender=singleton.model,
+                        dispatch_uid=f'singleton-delete-{label}')
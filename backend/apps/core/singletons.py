@@ -0,0 +1,65 @@
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.models import SiteStats, Headquarters
+from apps.cms.models import SiteSettings
+
+class SingletonCache:
+    """Keep a singleton row in worker memory, checked against a shared version key"""
+
+    # Writes bump the version key in the shared cache (Redis in production);
+    # workers compare against it at most once per check interval.
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f'singleton:{model._meta.label_lower}:version'
+        self._lock = threading.Lock()
+        self._instance = None
+        self._version = None
+        self._checked_at = 0.0
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'SINGLETON_VERSION_CHECK_INTERVAL', 1.0)
+
+    def get(self):
+        """Return the singleton, or an unsaved instance with defaults if none exists"""
+        now = time.monotonic()
+        if self._instance is not None and now - self._checked_at < self.check_interval:
+            return self._instance
+
+        with self._lock:
+            version = cache.get(self.version_key)
+            if self._instance is None or version is None or version != self._version:
+                if version is None:
+                    cache.add(self.version_key, uuid.uuid4().hex, timeout=None)
+                    version = cache.get(self.version_key)
+                self._instance = self.model.objects.first() or self.model()
+                self._version = version
+            self._checked_at = now
+            return self._instance
+
+    def invalidate(self):
+        """Drop the local copy and tell every other worker to drop theirs"""
+        cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+        with self._lock:
+            self._instance = None
+            self._version = None
+
+site_settings = SingletonCache(SiteSettings)
+site_stats = SingletonCache(SiteStats)
+headquarters = SingletonCache(Headquarters)
+
+SINGLETON_CACHES = [site_settings, site_stats, headquarters]
+
+def get_site_settings():
+    return site_settings.get()
+
+def get_site_stats():
+    return site_stats.get()
+
+def get_headquarters():
+    return headquarters.get()
@@ -0,0 +1,176 @@
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.core.models import SiteStats, ImpactedCity, ImpactStory
+from apps.core.singletons import site_stats
+from apps.core.tasks import rebuild_homepage_snapshot
+from apps.issues.models import ReportedIssue
+from apps.membership.models import MembershipApplication
+from apps.research.models import Publication, ResearchProject
+
+# Model -> (SiteStats field, model field, value that makes a row count)
+COUNTED_MODELS = {
+    ResearchProject: ('active_projects', 'status', 'active'),
+    MembershipApplication: ('total_members', 'status', 'active'),
+    Publication: ('research_papers_published', 'status', 'published'),
+}
+
+# Model -> field naming the city a row refers to
+CITY_SOURCES = {
+    ReportedIssue: 'city',
+    ImpactStory: 'location',
+}
+
+TRACKED_MODELS = set(COUNTED_MODELS) | set(CITY_SOURCES)
+
+def normalize_city(value):
+    """Collapse whitespace and case so 'new  delhi' and 'New Delhi' match"""
+    return ' '.join((value or '').split()).title()
+
+def _tracked_fields(model):
+    fields = []
+    if model in COUNTED_MODELS:
+        fields.append(COUNTED_MODELS[model][1])
+    if model in CITY_SOURCES:
+        fields.append(CITY_SOURCES[model])
+    return fields
+
+def _apply_deltas(**deltas):
+    """Shift SiteStats counters in place without reading the row"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updates = {field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items()}
+    if not SiteStats.objects.update(updated_at=timezone.now(), **updates):
+        # No stats row yet: seed it from a full recount instead
+        recount_site_stats()
+        return
+
+    # Queryset updates skip post_save, so invalidate the cached copies ourselves
+    transaction.on_commit(site_stats.invalidate)
+    transaction.on_commit(rebuild_homepage_snapshot.delay)
+
+def _adjust_city(name, delta):
+    """Change a city's reference count, returning the change in distinct cities"""
+    with transaction.atomic():
+        city, _ = ImpactedCity.objects.select_for_update().get_or_create(name=name)
+        before = city.reference_count
+        city.reference_count = max(before + delta, 0)
+        city.save(update_fields=['reference_count', 'updated_at'])
+
+    if before == 0 and city.reference_count > 0:
+        return 1
+    if before > 0 and city.reference_count == 0:
+        return -1
+    return 0
+
+def _city_delta(old_city, new_city):
+    delta = 0
+    if old_city:
+        delta += _adjust_city(old_city, -1)
+    if new_city:
+        delta += _adjust_city(new_city, 1)
+    return delta
+
+def remember_loaded_values(sender, instance, **kwargs):
+    """Keep the tracked values a row was loaded with so saves can compute deltas"""
+    if sender not in TRACKED_MODELS:
+        return
+    deferred = instance.get_deferred_fields()
+    instance._stats_loaded = {
+        field: getattr(instance, field)
+        for field in _tracked_fields(sender) if field not in deferred
+    }
+
+def fill_missing_loaded_values(sender, instance, raw=False, **kwargs):
+    """Fetch tracked values that were deferred when an existing row was loaded"""
+    if raw or sender not in TRACKED_MODELS or instance._state.adding:
+        return
+    loaded = instance.__dict__.setdefault('_stats_loaded', {})
+    missing = [field for field in _tracked_fields(sender) if field not in loaded]
+    if missing:
+        loaded.update(sender.objects.filter(pk=instance.pk).values(*missing).first() or {})
+
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    """Apply counter deltas for a created or changed row"""
+    if raw or sender not in TRACKED_MODELS:
+        return
+
+    old = {} if created else instance._stats_loaded
+    deltas = {}
+
+    if sender in COUNTED_MODELS:
+        stats_field, field, counted_value = COUNTED_MODELS[sender]
+        was_counted = old.get(field) == counted_value
+        is_counted = getattr(instance, field) == counted_value
+        deltas[stats_field] = int(is_counted) - int(was_counted)
+
+    if sender in CITY_SOURCES:
+        field = CITY_SOURCES[sender]
+        old_city = normalize_city(old.get(field))
+        new_city = normalize_city(getattr(instance, field))
+        if old_city != new_city:
+            deltas['cities_impacted'] = _city_delta(old_city, new_city)
+
+    instance._stats_loaded = {field: getattr(instance, field) for field in _tracked_fields(sender)}
+    _apply_deltas(**deltas)
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    """Remove a deleted row's contribution from the counters"""
+    if sender not in TRACKED_MODELS:
+        return
+
+    loaded = getattr(instance, '_stats_loaded', {})
+    deltas = {}
+
+    if sender in COUNTED_MODELS:
+        stats_field, field, counted_value = COUNTED_MODELS[sender]
+        deltas[stats_field] = -int(loaded.get(field) == counted_value)
+
+    if sender in CITY_SOURCES:
+        deltas['cities_impacted'] = _city_delta(normalize_city(loaded.get(CITY_SOURCES[sender])), '')
+
+    _apply_deltas(**deltas)
+
+def record_bulk_created(model, instances):
+    """Count rows inserted with bulk_create, which sends no post_save"""
+    if model not in COUNTED_MODELS:
+        return
+    stats_field, field, counted_value = COUNTED_MODELS[model]
+    _apply_deltas(**{stats_field: sum(getattr(instance, field) == counted_value for instance in instances)})
+
+def recount_site_stats():
+    """Recompute every counter from the source tables, fixing any drift"""
+    city_counts = {}
+    for model, field in CITY_SOURCES.items():
+        rows = model.objects.exclude(**{field: ''}).values(field).annotate(total=Count('pk'))
+        for row in rows.order_by():
+            name = normalize_city(row[field])
+            if name:
+                city_counts[name] = city_counts.get(name, 0) + row['total']
+
+    values = {'cities_impacted': len(city_counts)}
+    for model, (stats_field, field, counted_value) in COUNTED_MODELS.items():
+        values[stats_field] = model.objects.filter(**{field: counted_value}).count()
+
+    with transaction.atomic():
+        ImpactedCity.objects.exclude(name__in=city_counts).delete()
+        existing = {city.name: city for city in ImpactedCity.objects.select_for_update()}
+        new_cities = []
+        for name, total in city_counts.items():
+            if name in existing:
+                existing[name].reference_count = total
+            else:
+                new_cities.append(ImpactedCity(name=name, reference_count=total))
+        ImpactedCity.objects.bulk_update(existing.values(), ['reference_count'])
+        ImpactedCity.objects.bulk_create(new_cities)
+
+        stats = SiteStats.objects.select_for_update().first() or SiteStats()
+        for field, value in values.items():
+            setattr(stats, field, value)
+        stats.save()
+
+    return values
@@ -0,0 +1,26 @@
+from celery import shared_task
+
+from apps.core.homepage import build_homepage_snapshot
+
+@shared_task(ignore_result=True)
+def rebuild_homepage_snapshot():
+    """Rebuild the cached homepage snapshot"""
+    build_homepage_snapshot()
+
+@shared_task(ignore_result=True)
+def recount_site_stats():
+    """Recompute SiteStats counters from the source tables"""
+    from apps.core.stats import recount_site_stats as recount
+    recount()
+
+@shared_task(ignore_result=True)
+def send_queued_emails():
+    """Deliver due emails from the outbox"""
+    from apps.core.mail import deliver_outbox
+    deliver_outbox()
+
+@shared_task(ignore_result=True)
+def flush_counters():
+    """Write buffered view and download counts to the database"""
+    from apps.core.counters import flush_counters as flush
+    flush()
@@ -0,0 +1,97 @@
+from unittest import mock
+from django.test import TestCase
+
+from apps.core import counters
+from apps.core.counters import (
+    REDIS_FLUSHING_KEY, MemoryCounterBuffer, RedisCounterBuffer, counter_key, increment,
+)
+from apps.research.models import Publication
+
+class FakeRedis:
+    """The few hash commands RedisCounterBuffer uses, kept in a dict"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hincrby(self, name, key, amount):
+        values = self.hashes.setdefault(name, {})
+        values[key.encode()] = values.get(key.encode(), 0) + amount
+
+    def exists(self, name):
+        return int(name in self.hashes)
+
+    def rename(self, src, dst):
+        if src not in self.hashes:
+            raise counters.redis.ResponseError('no such key')
+        self.hashes[dst] = self.hashes.pop(src)
+
+    def hgetall(self, name):
+        return {key: str(value).encode() for key, value in self.hashes.get(name, {}).items()}
+
+    def delete(self, name):
+        self.hashes.pop(name, None)
+
+class CounterTests(TestCase):
+    """Buffered view and download counts reach the row once flushed, and are never lost"""
+
+    def setUp(self):
+        self.publication = Publication.objects.create(title='Paper', abstract='', publication_type='report',
+                                                      status='published')
+        self.key = counter_key('research.publication', 'view_count', self.publication.pk)
+
+    def views(self):
+        self.publication.refresh_from_db(fields=['view_count'])
+        return self.publication.view_count
+
+    def redis_buffer(self):
+        buffer = RedisCounterBuffer('redis://unused')
+        buffer._client = FakeRedis()
+        return buffer
+
+    def test_memory_buffer_flush(self):
+        buffer = MemoryCounterBuffer(interval=3600)
+        buffer.add(self.key, 1)
+        buffer.add(self.key, 2)
+        self.assertEqual(self.views(), 0)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.views(), 3)
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_memory_buffer_keeps_counts_of_failed_flush(self):
+        buffer = MemoryCounterBuffer(interval=3600)
+        buffer.add(self.key, 2)
+        with mock.patch.object(counters, 'apply_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                buffer.flush()
+        buffer.flush()
+        self.assertEqual(self.views(), 2)
+
+    def test_leftover_flushing_hash_applied(self):
+        buffer = self.redis_buffer()
+        buffer.add(self.key, 2)
+        # The flush dies after renaming the hash aside, before deleting it
+        with mock.patch.object(counters, 'apply_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                buffer.flush()
+        self.assertIn(REDIS_FLUSHING_KEY, buffer.client.hashes)
+        buffer.add(self.key, 5)
+
+        # The next flush applies the leftover first, then what arrived since
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.views(), 2)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(self.views(), 7)
+        self.assertEqual(buffer.client.hashes, {})
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_direct_update_when_buffer_unavailable(self):
+        buffer = mock.Mock()
+        buffer.add.side_effect = counters.redis.ConnectionError
+        with mock.patch.object(counters, 'counter_buffer', return_value=buffer):
+            increment(Publication, self.publication.pk, 'view_count')
+        self.assertEqual(self.views(), 1)
+
+    def test_increment_rejects_unregistered_fields(self):
+        with self.assertRaises(ValueError):
+            increment(Publication, self.publication.pk, 'citation_count')
+        self.assertEqual(self.views(), 0)
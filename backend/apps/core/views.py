@@ -1,8 +1,9 @@
 
 from rest_framework import generics, viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
@@ -12,6 +13,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q, Count, Sum
 import razorpay
+import requests
 import json
 import uuid
 from datetime import datetime, timedelta
@@ -23,14 +25,17 @@ from apps.research.models import Publication, ResearchProject
 from apps.donations.models import Donation, DonationCertificate
 from apps.issues.models import ReportedIssue, IssueCategory
 from apps.cms.models import SiteSettings, Page, Slider
+from apps.payments.gateway import GatewayUnavailable, get_razorpay_client
+from apps.payments.idempotency import idempotent
+from apps.core.homepage import get_homepage_snapshot
+from apps.core.mail import queue_email
+from apps.core.permissions import SiteAvailable
 
-# Initialize Razorpay client
-razorpay_client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
 
 class TeamListView(generics.ListAPIView):
     """Get team members"""
     queryset = Team.objects.filter(status='active')
-    permission_classes = [AllowAny]
+    permission_classes = [SiteAvailable, AllowAny]
 
     def list(self, request):
         team_members = self.get_queryset().order_by('order', 'name')
@@ -50,7 +55,7 @@ class TeamListView(generics.ListAPIView):
         return Response(data)
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def contact_form_submit(request):
     """Handle contact form submissions"""
     try:
@@ -63,9 +68,8 @@ def contact_form_submit(request):
             message=data.get('message')
         )
 
-        # Send notification email
-        try:
-            email_message = f"""
+        # Queue notification email; the outbox worker delivers it
+        email_message = f"""
 New contact form submission received:
 
 Name: {contact.name}
@@ -74,17 +78,13 @@ Subject: {contact.get_subject_display()}
 Message: {contact.message}
 
 Submitted at: {contact.created_at}
-            """
-
-            send_mail(
-                subject=f'New Contact Form Submission: {contact.get_subject_display()}',
-                message=email_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.DEFAULT_FROM_EMAIL],
-                fail_silently=True,
-            )
-        except Exception as e:
-            print(f"Failed to send notification email: {e}")
+        """
+
+        queue_email(
+            subject=f'New Contact Form Submission: {contact.get_subject_display()}',
+            message=email_message,
+            recipient_list=[settings.DEFAULT_FROM_EMAIL],
+        )
 
         return Response({
             'success': True,
@@ -98,7 +98,8 @@ Submitted at: {contact.created_at}
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
+@idempotent('payment-order')
 def create_payment_order(request):
     """Create Razorpay order for payment"""
     try:
@@ -107,7 +108,7 @@ def create_payment_order(request):
         amount = float(data.get('amount'))
 
         # Create Razorpay order
-        razorpay_order = razorpay_client.order.create({
+        razorpay_order = get_razorpay_client().order.create({
             'amount': int(amount * 100),  # Convert to paise
             'currency': 'INR',
             'payment_capture': '1'
@@ -131,6 +132,13 @@ def create_payment_order(request):
             'razorpay_key': settings.RAZORPAY_KEY_ID
         })
 
+    except (GatewayUnavailable, requests.RequestException,
+            razorpay.errors.ServerError, razorpay.errors.GatewayError):
+        return Response({
+            'success': False,
+            'error': 'Payment gateway is not responding. Please try again shortly.'
+        }, status=503)
+
     except Exception as e:
         return Response({
             'success': False,
@@ -138,7 +146,7 @@ def create_payment_order(request):
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
 def verify_payment(request):
     """Verify Razorpay payment"""
     try:
@@ -161,7 +169,7 @@ def verify_payment(request):
         }
 
         try:
-            razorpay_client.utility.verify_payment_signature(params_dict)
+            get_razorpay_client().utility.verify_payment_signature(params_dict)
         except razorpay.errors.SignatureVerificationError:
             payment.status = 'failed'
             payment.save()
@@ -190,23 +198,13 @@ def verify_payment(request):
         }, status=400)
 
 @api_view(['GET'])
-@permission_classes([AllowAny])
+@authentication_classes([])
+@permission_classes([SiteAvailable, AllowAny])
 def homepage_data(request):
     """Get all data needed for homepage"""
     try:
-        # Get site stats
-        stats = SiteStats.objects.first()
-        if not stats:
-            stats = SiteStats.objects.create()
-
-        return Response({
-            'stats': {
-                'active_projects': stats.active_projects,
-                'total_members': stats.total_members,
-                'research_papers_published': stats.research_papers_published,
-                'cities_impacted': stats.cities_impacted,
-            },
-        })
+        # Served straight from the cached snapshot, rebuilt by signals on change
+        return HttpResponse(get_homepage_snapshot(), content_type='application/json')
 
     except Exception as e:
         return Response({
@@ -1,7 +1,8 @@
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from apps.core.models import TimeStampedModel
+from apps.core.sequences import highest_issued, next_sequence_value
 import uuid
 from cloudinary.models import CloudinaryField
 
@@ -42,8 +43,8 @@ class Donation(TimeStampedModel):
     wants_80g_certificate = models.BooleanField(default=False)
 
     # Payment Details
-    razorpay_order_id = models.CharField(max_length=100, blank=True)
-    razorpay_payment_id = models.CharField(max_length=100, blank=True)
+    razorpay_order_id = models.CharField(max_length=100, blank=True, db_index=True)
+    razorpay_payment_id = models.CharField(max_length=100, blank=True, db_index=True)
     razorpay_signature = models.CharField(max_length=200, blank=True)
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
 
@@ -116,14 +117,18 @@ class DonationCertificate(TimeStampedModel):
         return f"Certificate {self.certificate_number} for {self.donation.donor_display_name}"
 
     def save(self, *args, **kwargs):
-        if not self.certificate_number:
-            from django.utils import timezone
-            year = timezone.now().year
-            count = DonationCertificate.objects.filter(
-                issued_date__year=year
-            ).count() + 1
-            self.certificate_number = f"80G/{year}/{count:04d}"
-        super().save(*args, **kwargs)
+        if self.certificate_number:
+            return super().save(*args, **kwargs)
+
+        from django.utils import timezone
+        year = timezone.now().year
+        # Number and row commit together, so a failed insert frees its number
+        with transaction.atomic():
+            number = next_sequence_value(
+                'donation_certificate', year,
+                seed=lambda: highest_issued(DonationCertificate.objects.all(), 'certificate_number', f"80G/{year}/"))
+            self.certificate_number = f"80G/{year}/{number:04d}"
+            super().save(*args, **kwargs)
 
 class DonationCampaign(TimeStampedModel):
     """Fundraising campaigns"""
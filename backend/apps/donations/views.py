@@ -12,6 +12,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q, Count, Sum
 import razorpay
+import requests
 import json
 import uuid
 from datetime import datetime, timedelta
@@ -23,14 +24,15 @@ from apps.research.models import Publication, ResearchProject
 from apps.donations.models import Donation, DonationCertificate
 from apps.issues.models import ReportedIssue, IssueCategory
 from apps.cms.models import SiteSettings, Page, Slider
-
-# Initialize Razorpay client
-razorpay_client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+from apps.payments.gateway import GatewayUnavailable, get_razorpay_client
+from apps.payments.idempotency import idempotent
+from apps.core.permissions import SiteAvailable
+from apps.core.singletons import get_site_settings
 
 class TeamListView(generics.ListAPIView):
     """Get team members"""
     queryset = Team.objects.filter(status='active')
-    permission_classes = [AllowAny]
+    permission_classes = [SiteAvailable, AllowAny]
 
     def list(self, request):
         team_members = self.get_queryset().order_by('order', 'name')
@@ -50,7 +52,7 @@ class TeamListView(generics.ListAPIView):
         return Response(data)
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def contact_form_submit(request):
     """Handle contact form submissions"""
     try:
@@ -98,7 +100,8 @@ Submitted at: {contact.created_at}
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
+@idempotent('payment-order')
 def create_payment_order(request):
     """Create Razorpay order for payment"""
     try:
@@ -107,7 +110,7 @@ def create_payment_order(request):
         amount = float(data.get('amount'))
 
         # Create Razorpay order
-        razorpay_order = razorpay_client.order.create({
+        razorpay_order = get_razorpay_client().order.create({
             'amount': int(amount * 100),  # Convert to paise
             'currency': 'INR',
             'payment_capture': '1'
@@ -131,6 +134,13 @@ def create_payment_order(request):
             'razorpay_key': settings.RAZORPAY_KEY_ID
         })
 
+    except (GatewayUnavailable, requests.RequestException,
+            razorpay.errors.ServerError, razorpay.errors.GatewayError):
+        return Response({
+            'success': False,
+            'error': 'Payment gateway is not responding. Please try again shortly.'
+        }, status=503)
+
     except Exception as e:
         return Response({
             'success': False,
@@ -138,7 +148,7 @@ def create_payment_order(request):
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
 def verify_payment(request):
     """Verify Razorpay payment"""
     try:
@@ -161,7 +171,7 @@ def verify_payment(request):
         }
 
         try:
-            razorpay_client.utility.verify_payment_signature(params_dict)
+            get_razorpay_client().utility.verify_payment_signature(params_dict)
         except razorpay.errors.SignatureVerificationError:
             payment.status = 'failed'
             payment.save()
@@ -189,8 +199,81 @@ def verify_payment(request):
             'error': str(e)
         }, status=400)
 
+@api_view(['POST'])
+@permission_classes([SiteAvailable, AllowAny])
+@idempotent('donation-order')
+def create_donation_order(request):
+    """Create Razorpay order for a donation"""
+    try:
+        data = request.data
+        user = request.user if request.user.is_authenticated else None
+        if user is None and not get_site_settings().allow_anonymous_donations:
+            return Response({
+                'success': False,
+                'error': 'Please log in to make a donation'
+            }, status=403)
+
+        amount = float(data.get('amount'))
+        donor_name = data.get('donor_name') or (user.get_full_name() or user.username if user else '')
+        donor_email = data.get('donor_email') or (user.email if user else '')
+        if amount <= 0 or not donor_name or not donor_email:
+            return Response({
+                'success': False,
+                'error': 'Amount, donor name and donor email are required'
+            }, status=400)
+
+        donation = Donation(
+            donor=user,
+            donor_name=donor_name,
+            donor_email=donor_email,
+            donor_phone=data.get('donor_phone', ''),
+            donor_address=data.get('donor_address', ''),
+            amount=amount,
+            donation_type=data.get('donation_type', 'one_time'),
+            pan_number=data.get('pan_number', ''),
+            wants_80g_certificate=bool(data.get('wants_80g_certificate', False)),
+            purpose=data.get('purpose', ''),
+            message=data.get('message', ''),
+            status='pending'
+        )
+        donation.full_clean(exclude=['donation_id', 'razorpay_order_id'])
+        donation.donation_id = f"DON_{uuid.uuid4().hex[:12].upper()}"
+
+        # Create Razorpay order
+        razorpay_order = get_razorpay_client().order.create({
+            'amount': int(amount * 100),  # Convert to paise
+            'currency': 'INR',
+            'receipt': donation.donation_id,
+            'payment_capture': '1'
+        })
+
+        donation.razorpay_order_id = razorpay_order['id']
+        donation.save()
+
+        return Response({
+            'success': True,
+            'donation_id': donation.donation_id,
+            'razorpay_order_id': razorpay_order['id'],
+            'amount': amount,
+            'currency': 'INR',
+            'razorpay_key': settings.RAZORPAY_KEY_ID
+        })
+
+    except (GatewayUnavailable, requests.RequestException,
+            razorpay.errors.ServerError, razorpay.errors.GatewayError):
+        return Response({
+            'success': False,
+            'error': 'Payment gateway is not responding. Please try again shortly.'
+        }, status=503)
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
 @api_view(['GET'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def homepage_data(request):
     """Get all data needed for homepage"""
     try:
@@ -1,8 +1,9 @@
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from cloudinary.models import CloudinaryField
 from apps.core.models import TimeStampedModel
+from apps.core.sequences import highest_issued, next_sequence_value
 
 class IssueCategory(TimeStampedModel):
     """Categories for reported issues"""
@@ -104,6 +105,9 @@ class ReportedIssue(TimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='issues_issue_keyset_idx'),
+        ]
         verbose_name = "Reported Issue"
         verbose_name_plural = "Reported Issues"
 
@@ -111,12 +115,18 @@ class ReportedIssue(TimeStampedModel):
         return f"#{self.issue_number}: {self.title}"
 
     def save(self, *args, **kwargs):
-        if not self.issue_number:
-            from django.utils import timezone
-            year = timezone.now().year
-            count = ReportedIssue.objects.filter(created_at__year=year).count() + 1
-            self.issue_number = f"ISS-{year}-{count:04d}"
-        super().save(*args, **kwargs)
+        if self.issue_number:
+            return super().save(*args, **kwargs)
+
+        from django.utils import timezone
+        year = timezone.now().year
+        # Number and row commit together, so a failed insert frees its number
+        with transaction.atomic():
+            number = next_sequence_value(
+                'reported_issue', year,
+                seed=lambda: highest_issued(ReportedIssue.objects.all(), 'issue_number', f"ISS-{year}-"))
+            self.issue_number = f"ISS-{year}-{number:04d}"
+            super().save(*args, **kwargs)
 
     @property
     def reporter_display_name(self):
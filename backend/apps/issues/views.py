@@ -12,25 +12,26 @@ from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q, Count, Sum
 import razorpay
+import requests
 import json
 import uuid
 from datetime import datetime, timedelta
 
 # Import your models (adjust imports based on actual structure)
 from apps.core.models import Team, Department, FocusArea, ImpactStory, Contact, SiteStats
+from apps.core.permissions import SiteAvailable
 from apps.membership.models import MembershipTier, MembershipApplication, Payment
 from apps.research.models import Publication, ResearchProject
 from apps.donations.models import Donation, DonationCertificate
 from apps.issues.models import ReportedIssue, IssueCategory
 from apps.cms.models import SiteSettings, Page, Slider
-
-# Initialize Razorpay client
-razorpay_client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+from apps.payments.gateway import GatewayUnavailable, get_razorpay_client
+from apps.payments.idempotency import idempotent
 
 class TeamListView(generics.ListAPIView):
     """Get team members"""
     queryset = Team.objects.filter(status='active')
-    permission_classes = [AllowAny]
+    permission_classes = [SiteAvailable, AllowAny]
 
     def list(self, request):
         team_members = self.get_queryset().order_by('order', 'name')
@@ -50,7 +51,7 @@ class TeamListView(generics.ListAPIView):
         return Response(data)
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def contact_form_submit(request):
     """Handle contact form submissions"""
     try:
@@ -98,7 +99,8 @@ Submitted at: {contact.created_at}
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
+@idempotent('payment-order')
 def create_payment_order(request):
     """Create Razorpay order for payment"""
     try:
@@ -107,7 +109,7 @@ def create_payment_order(request):
         amount = float(data.get('amount'))
 
         # Create Razorpay order
-        razorpay_order = razorpay_client.order.create({
+        razorpay_order = get_razorpay_client().order.create({
             'amount': int(amount * 100),  # Convert to paise
             'currency': 'INR',
             'payment_capture': '1'
@@ -131,6 +133,13 @@ def create_payment_order(request):
             'razorpay_key': settings.RAZORPAY_KEY_ID
         })
 
+    except (GatewayUnavailable, requests.RequestException,
+            razorpay.errors.ServerError, razorpay.errors.GatewayError):
+        return Response({
+            'success': False,
+            'error': 'Payment gateway is not responding. Please try again shortly.'
+        }, status=503)
+
     except Exception as e:
         return Response({
             'success': False,
@@ -138,7 +147,7 @@ def create_payment_order(request):
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
 def verify_payment(request):
     """Verify Razorpay payment"""
     try:
@@ -161,7 +170,7 @@ def verify_payment(request):
         }
 
         try:
-            razorpay_client.utility.verify_payment_signature(params_dict)
+            get_razorpay_client().utility.verify_payment_signature(params_dict)
         except razorpay.errors.SignatureVerificationError:
             payment.status = 'failed'
             payment.save()
@@ -190,7 +199,7 @@ def verify_payment(request):
         }, status=400)
 
 @api_view(['GET'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def homepage_data(request):
     """Get all data needed for homepage"""
     try:
@@ -162,8 +162,8 @@ class Payment(TimeStampedModel):
     ]
 
     payment_id = models.CharField(max_length=100, unique=True)
-    razorpay_order_id = models.CharField(max_length=100, blank=True)
-    razorpay_payment_id = models.CharField(max_length=100, blank=True)
+    razorpay_order_id = models.CharField(max_length=100, blank=True, db_index=True)
+    razorpay_payment_id = models.CharField(max_length=100, blank=True, db_index=True)
     razorpay_signature = models.CharField(max_length=200, blank=True)
 
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from unfold.admin import ModelAdmin
+from .models import IdempotencyRecord, WebhookEvent
+
+@admin.register(IdempotencyRecord)
+class IdempotencyRecordAdmin(ModelAdmin):
+    list_display = ['key_hash', 'response_status', 'created_at', 'expires_at']
+    list_filter = ['response_status']
+    readonly_fields = ['key_hash', 'request_hash', 'response_status', 'response_body', 'expires_at']
+    ordering = ['-created_at']
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(ModelAdmin):
+    list_display = ['event_id', 'event_type', 'status', 'created_at', 'processed_at']
+    list_filter = ['status', 'event_type']
+    search_fields = ['event_id']
+    readonly_fields = ['event_id', 'event_type', 'payload', 'processed_at', 'last_error']
+    ordering = ['-created_at']
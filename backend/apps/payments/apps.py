@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+class PaymentsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.payments'
+    verbose_name = 'Payments'
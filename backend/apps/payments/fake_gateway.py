@@ -0,0 +1,94 @@
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+class FakeRazorpayHandler(BaseHTTPRequestHandler):
+    """Answers the subset of the Razorpay v1 API this project calls"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length).decode() if length else ''
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(raw or '{}')
+        return {key: values[0] for key, values in parse_qs(raw).items()}
+
+    def _simulate_conditions(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.failure_rate and random.random() < server.failure_rate:
+            self._reply(500, {'error': {'code': 'SERVER_ERROR', 'description': 'Simulated failure'}})
+            return False
+        return True
+
+    def do_POST(self):
+        if not self._simulate_conditions():
+            return
+        if self.path.rstrip('/') == '/v1/orders':
+            data = self._read_body()
+            order = {
+                'id': f'order_{uuid.uuid4().hex[:14]}',
+                'entity': 'order',
+                'amount': int(data.get('amount', 0)),
+                'currency': data.get('currency', 'INR'),
+                'receipt': data.get('receipt'),
+                'status': 'created',
+                'created_at': int(time.time()),
+            }
+            self.server.orders[order['id']] = order
+            self._reply(200, order)
+        else:
+            self._reply(404, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Not found'}})
+
+    def do_GET(self):
+        if not self._simulate_conditions():
+            return
+        prefix = '/v1/orders/'
+        order = self.server.orders.get(self.path[len(prefix):]) if self.path.startswith(prefix) else None
+        if order:
+            self._reply(200, order)
+        else:
+            self._reply(404, {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Not found'}})
+
+class FakeRazorpayServer(ThreadingHTTPServer):
+    """Local stand-in for api.razorpay.com with tunable latency and failures"""
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0):
+        super().__init__((host, port), FakeRazorpayHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.orders = {}
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their read timeout hang up before the reply is written
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a background thread, e.g. inside a test"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from collections import deque
+import razorpay
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class GatewayUnavailable(Exception):
+    """Raised without calling Razorpay while the circuit breaker is open"""
+
+class CircuitBreaker:
+    """Fail fast after repeated gateway failures, probing again after a cool-off"""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == 'open' or (state == 'half_open' and self._probing):
+                raise GatewayUnavailable("Payment gateway is temporarily unavailable")
+            # Let a single probe through once the cool-off has passed
+            self._probing = state == 'half_open'
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                logger.warning("Razorpay circuit breaker opened after %s failures", self._failures)
+
+class GatewayMetrics:
+    """Per-process call counts and latencies for Razorpay requests"""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def record(self, latency, error=False, timeout=False):
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.timeouts += int(timeout)
+            self._latencies.append(latency)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 1)
+
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'rejected_by_breaker': self.rejected,
+            'latency_ms_p50': percentile(0.5),
+            'latency_ms_p95': percentile(0.95),
+            'latency_ms_max': round(latencies[-1] * 1000, 1) if latencies else None,
+        }
+
+class GatewaySession(requests.Session):
+    """Pooled session that bounds every call and reports to the breaker and metrics"""
+
+    def __init__(self, breaker, metrics, timeout):
+        super().__init__()
+        self.breaker = breaker
+        self.metrics = metrics
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.RAZORPAY_POOL_SIZE,
+                              max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            self.breaker.before_call()
+        except GatewayUnavailable:
+            self.metrics.record_rejected()
+            raise
+
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.Timeout:
+            self.metrics.record(time.perf_counter() - started, error=True, timeout=True)
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            # Anything else, an SSL or decoding bug included, still ends a
+            # half-open probe; otherwise the breaker would wait on it forever
+            self.metrics.record(time.perf_counter() - started, error=True)
+            self.breaker.record_failure()
+            raise
+
+        # 4xx responses are our mistakes, not signs of a degraded gateway
+        failed = response.status_code >= 500
+        self.metrics.record(time.perf_counter() - started, error=failed)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+_client = None
+_client_lock = threading.Lock()
+breaker = None
+metrics = GatewayMetrics()
+
+def get_razorpay_client():
+    """Return the process-wide Razorpay client, building it on first use"""
+    global _client, breaker
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                breaker = CircuitBreaker(settings.RAZORPAY_BREAKER_FAILURE_THRESHOLD,
+                                         settings.RAZORPAY_BREAKER_RESET_TIMEOUT)
+                session = GatewaySession(breaker, metrics, timeout=(
+                    settings.RAZORPAY_CONNECT_TIMEOUT, settings.RAZORPAY_READ_TIMEOUT))
+                _client = razorpay.Client(
+                    session=session,
+                    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET),
+                    base_url=settings.RAZORPAY_BASE_URL)
+    return _client
+
+def get_gateway_metrics():
+    data = metrics.snapshot()
+    data['breaker_state'] = breaker.state if breaker else 'closed'
+    return data
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from apps.payments.models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Client errors that are a final answer to the request; other 4xx, such as
+# the 400 a view's catch-all returns, may pass on a retry so are not kept
+REPLAYED_CLIENT_ERRORS = {409, 422}
+
+def _sha256(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+def _is_stale(record, now):
+    """Expired, or unfinished for longer than a live request could take"""
+    if record.expires_at <= now:
+        return True
+    return not record.is_complete and record.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_CLAIM_LEASE)
+
+def _claim(key_hash, request_hash):
+    """Insert the record, or return the existing one if the key was seen before"""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyRecord.objects.create(
+                    key_hash=key_hash, request_hash=request_hash, expires_at=expires_at), True
+        except IntegrityError:
+            existing = IdempotencyRecord.objects.filter(key_hash=key_hash).first()
+            if existing is None or not _is_stale(existing, now):
+                return existing, False
+            # Expired but not yet purged, or abandoned by a killed worker:
+            # treat the key as new. Of two requests doing this at once, one
+            # wins the insert and the other sees its fresh claim.
+            _release(existing)
+    return None, False
+
+def _release(record):
+    # By primary key, so a claim taken over after the lease is left alone
+    IdempotencyRecord.objects.filter(pk=record.pk).delete()
+
+def idempotent(scope):
+    """Replay the stored response when a POST repeats its Idempotency-Key"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view(request, *args, **kwargs)
+
+            if len(key) > 255:
+                return Response({'success': False, 'error': f'{IDEMPOTENCY_HEADER} is too long'},
+                                status=400)
+
+            user_id = request.user.pk if request.user.is_authenticated else 'anonymous'
+            key_hash = _sha256(f'{scope}:{user_id}:{key}')
+            request_hash = _sha256(json.dumps(request.data, sort_keys=True, default=str))
+
+            record, created = _claim(key_hash, request_hash)
+            if not created:
+                if record is None or not record.is_complete:
+                    # The first submission is still running (or just vanished); retry later
+                    response = Response({
+                        'success': False,
+                        'error': 'A request with this Idempotency-Key is already in progress'
+                    }, status=409)
+                    response['Retry-After'] = '1'
+                    return response
+                if record.request_hash != request_hash:
+                    return Response({
+                        'success': False,
+                        'error': f'{IDEMPOTENCY_HEADER} was already used with a different request'
+                    }, status=422)
+                response = Response(record.response_body, status=record.response_status)
+                response['Idempotent-Replayed'] = 'true'
+                return response
+
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                _release(record)
+                raise
+
+            if 200 <= response.status_code < 300 or response.status_code in REPLAYED_CLIENT_ERRORS:
+                # update() rather than save(): the row is gone if the lease ran out meanwhile
+                IdempotencyRecord.objects.filter(pk=record.pk).update(
+                    response_status=response.status_code, response_body=response.data,
+                    updated_at=timezone.now())
+            else:
+                # Server errors and the views' catch-all 400 are not final;
+                # let the client retry with the same key
+                _release(record)
+            return response
+        return wrapped
+    return decorator
+
+def purge_expired_records():
+    """Delete idempotency records past their TTL, returning how many were removed"""
+    deleted, _ = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,62 @@
+import csv
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.reconciliation import parse_rows, reconcile_settlements
+
+class Command(BaseCommand):
+    help = "Stream a Razorpay settlement CSV, fix Payment/Donation statuses and report mismatches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="Settlement export, or - for stdin")
+        parser.add_argument('--report', default='settlement_mismatches.csv',
+                            help="Where to write the mismatch report")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report mismatches without changing any rows")
+        parser.add_argument('--entity-id-column', default='entity_id',
+                            help="Row id: the payment id on payment rows, the refund id on refunds")
+        parser.add_argument('--payment-id-column', default='payment_id',
+                            help="Payment id on refund and other non-payment rows")
+        parser.add_argument('--order-id-column', default='order_id')
+        parser.add_argument('--type-column', default='type')
+        parser.add_argument('--amount-column', default='amount')
+        parser.add_argument('--amount-in-paise', action='store_true',
+                            help="Amounts in the export are in paise rather than rupees")
+
+    def handle(self, *args, **options):
+        columns = {
+            'entity_id': options['entity_id_column'],
+            'payment_id': options['payment_id_column'],
+            'order_id': options['order_id_column'],
+            'type': options['type_column'],
+            'amount': options['amount_column'],
+        }
+        source = sys.stdin if options['csv_file'] == '-' else open(
+            options['csv_file'], newline='', encoding='utf-8-sig')
+        started = time.perf_counter()
+
+        try:
+            reader = csv.DictReader(source)
+            if reader.fieldnames is None or columns['entity_id'] not in reader.fieldnames:
+                raise CommandError(f"Column '{columns['entity_id']}' not found in {options['csv_file']}")
+
+            with open(options['report'], 'w', newline='') as report_file:
+                totals = reconcile_settlements(
+                    parse_rows(reader, columns, options['amount_in_paise']),
+                    csv.writer(report_file),
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                    progress=lambda totals: self.stdout.write(f"{totals['rows']:,} rows...", ending='\r'),
+                )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{totals['rows']:,} rows in {elapsed:.1f}s: {totals['matched']:,} matched, "
+                          f"{totals['corrected']:,} corrected, {totals['mismatched']:,} mismatches")
+        if options['dry_run']:
+            self.stdout.write("Dry run: no rows were changed")
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['report']}"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.payments.fake_gateway import FakeRazorpayServer
+
+class Command(BaseCommand):
+    help = "Run a local fake Razorpay API; point RAZORPAY_BASE_URL at it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help="Seconds to wait before every response")
+        parser.add_argument('--failure-rate', type=float, default=0.0,
+                            help="Fraction of requests answered with HTTP 500")
+
+    def handle(self, *args, **options):
+        server = FakeRazorpayServer(port=options['port'], latency=options['latency'],
+                                    failure_rate=options['failure_rate'])
+        self.stdout.write(f"Fake Razorpay listening on {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
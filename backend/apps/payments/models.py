@@ -0,0 +1,48 @@
+from django.db import models
+from apps.core.models import TimeStampedModel
+
+class IdempotencyRecord(TimeStampedModel):
+    """Stored outcome of a request made with an Idempotency-Key header"""
+    # sha256 of scope, user and client key, so rows stay small and fixed-width
+    key_hash = models.CharField(max_length=64, unique=True)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Idempotency Record"
+        verbose_name_plural = "Idempotency Records"
+
+    def __str__(self):
+        return f"{self.key_hash[:12]} ({self.response_status or 'in progress'})"
+
+    @property
+    def is_complete(self):
+        return self.response_status is not None
+
+class WebhookEvent(TimeStampedModel):
+    """Raw Razorpay webhook event, stored on receipt and applied by a background worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    # X-Razorpay-Event-Id; Razorpay redelivers with the same id, so it dedupes retries
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+        verbose_name = "Webhook Event"
+        verbose_name_plural = "Webhook Events"
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.get_status_display()})"
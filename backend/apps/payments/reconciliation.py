@@ -0,0 +1,156 @@
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.donations.models import Donation
+from apps.membership.models import Payment
+
+# Settlement row type -> status the matching record should have
+SETTLED_STATUSES = {
+    'payment': 'completed',
+    'refund': 'refunded',
+}
+
+# Statuses a settled payment may legitimately be in already
+FINAL_STATUSES = {'completed', 'refunded'}
+
+RECONCILED_MODELS = [Payment, Donation]
+
+REPORT_HEADER = ['razorpay_payment_id', 'razorpay_order_id', 'record', 'issue', 'expected', 'actual']
+
+class SettlementRow:
+    """One settlement CSV line, reduced to the columns reconciliation needs"""
+
+    def __init__(self, payment_id, order_id, row_type, amount):
+        self.payment_id = payment_id
+        self.order_id = order_id
+        self.row_type = row_type
+        self.amount = amount
+
+def parse_rows(reader, columns, amount_in_paise=False):
+    """Yield SettlementRows from a csv.DictReader, one at a time
+
+    A payment row's entity id is the payment id. Refunds and other rows
+    carry their own id there (rfnd_...) and the payment's in a column of
+    its own.
+    """
+    for line in reader:
+        try:
+            amount = Decimal(line.get(columns['amount']) or '')
+        except InvalidOperation:
+            amount = None
+        if amount is not None and amount_in_paise:
+            amount = amount / 100
+        row_type = (line.get(columns['type']) or 'payment').strip().lower()
+        payment_id_column = columns['entity_id'] if row_type == 'payment' else columns['payment_id']
+        yield SettlementRow(
+            payment_id=(line.get(payment_id_column) or '').strip(),
+            order_id=(line.get(columns['order_id']) or '').strip(),
+            row_type=row_type,
+            amount=amount,
+        )
+
+def _load_records(chunk):
+    """Fetch the Payment and Donation rows a chunk refers to, in one IN lookup per model and key"""
+    payment_ids = {row.payment_id for row in chunk if row.payment_id}
+    by_payment_id, by_order_id = {}, {}
+
+    for model in RECONCILED_MODELS:
+        fields = ['status', 'amount', 'razorpay_payment_id', 'razorpay_order_id']
+        for record in model.objects.filter(razorpay_payment_id__in=payment_ids).only(*fields):
+            by_payment_id[record.razorpay_payment_id] = record
+        # Payments the browser never verified have no payment id yet; fall back to the order
+        unmatched = {row.order_id for row in chunk
+                     if row.order_id and row.payment_id not in by_payment_id}
+        if unmatched:
+            for record in model.objects.filter(razorpay_order_id__in=unmatched).only(*fields):
+                by_order_id[record.razorpay_order_id] = record
+
+    return by_payment_id, by_order_id
+
+def _label(record):
+    return f"{record._meta.label_lower}:{record.pk}"
+
+def reconcile_chunk(chunk, report, dry_run=False):
+    """Match one chunk of settlement rows, correct statuses and report mismatches"""
+    by_payment_id, by_order_id = _load_records(chunk)
+    # (model, status) -> pks moving to that status; model -> records gaining a payment id
+    status_fixes = defaultdict(set)
+    payment_id_fixes = defaultdict(dict)
+    counts = {'rows': len(chunk), 'matched': 0, 'corrected': 0, 'mismatched': 0}
+
+    for row in chunk:
+        record = by_payment_id.get(row.payment_id) or by_order_id.get(row.order_id)
+        if record is None:
+            counts['mismatched'] += 1
+            report.writerow([row.payment_id, row.order_id, '', 'missing', row.row_type, ''])
+            continue
+
+        counts['matched'] += 1
+        if row.amount is not None and row.row_type == 'payment' and row.amount != record.amount:
+            counts['mismatched'] += 1
+            report.writerow([row.payment_id, row.order_id, _label(record), 'amount',
+                             row.amount, record.amount])
+
+        changed = False
+        if row.row_type == 'payment' and row.payment_id and not record.razorpay_payment_id:
+            # Matched by order id: record the payment id the browser never sent back
+            record.razorpay_payment_id = row.payment_id
+            payment_id_fixes[type(record)][record.pk] = record
+            changed = True
+
+        expected = SETTLED_STATUSES.get(row.row_type)
+        status_wrong = expected is not None and record.status != expected and not (
+            expected == 'completed' and record.status in FINAL_STATUSES)
+        if status_wrong:
+            report.writerow([row.payment_id, row.order_id, _label(record), 'status',
+                             expected, record.status])
+            record.status = expected
+            status_fixes[type(record), expected].add(record.pk)
+            changed = True
+
+        if changed:
+            counts['corrected'] += 1
+
+    if not dry_run:
+        _apply_fixes(status_fixes, payment_id_fixes)
+
+    return counts
+
+def _apply_fixes(status_fixes, payment_id_fixes):
+    """Write a chunk's corrections: one UPDATE per target status, bulk_update for payment ids"""
+    now = timezone.now()
+    with transaction.atomic():
+        # Status corrections share their new values, so a grouped UPDATE avoids
+        # bulk_update's per-row CASE expressions
+        for (model, status), pks in status_fixes.items():
+            values = {'status': status, 'updated_at': now}
+            if status == 'completed':
+                values['completed_at'] = Coalesce(F('completed_at'), Value(now))
+            model.objects.filter(pk__in=pks).update(**values)
+        for model, records in payment_id_fixes.items():
+            # bulk_update skips auto_now
+            for record in records.values():
+                record.updated_at = now
+            model.objects.bulk_update(records.values(), ['razorpay_payment_id', 'updated_at'])
+
+def reconcile_settlements(rows, report, chunk_size=5000, dry_run=False, progress=None):
+    """Reconcile an iterable of SettlementRows chunk by chunk, returning totals"""
+    totals = {'rows': 0, 'matched': 0, 'corrected': 0, 'mismatched': 0}
+    report.writerow(REPORT_HEADER)
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        for key, value in reconcile_chunk(chunk, report, dry_run).items():
+            totals[key] += value
+        if progress:
+            progress(totals)
+
+    return totals
@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from apps.payments.idempotency import purge_expired_records
+
+@shared_task(ignore_result=True)
+def purge_idempotency_records():
+    """Drop idempotency records past their TTL"""
+    purge_expired_records()
+
+@shared_task(ignore_result=True)
+def process_webhook_events():
+    """Apply pending Razorpay webhook events to payments and donations"""
+    from apps.payments.webhooks import process_pending_events
+    process_pending_events()
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'payments'
+
+urlpatterns = [
+    path('webhook/', views.razorpay_webhook, name='razorpay-webhook'),
+    path('gateway-metrics/', views.gateway_metrics, name='gateway-metrics'),
+]
@@ -0,0 +1,37 @@
+import json
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+
+from apps.core.permissions import SiteAvailable
+from apps.payments.gateway import get_gateway_metrics
+from apps.payments.webhooks import record_event, verify_signature
+
+@api_view(['GET'])
+@permission_classes([SiteAvailable, IsAdminUser])
+def gateway_metrics(request):
+    """Razorpay call latency, error counts and breaker state for this worker"""
+    return Response(get_gateway_metrics())
+
+# Not held back by maintenance mode; Razorpay's events must still land
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def razorpay_webhook(request):
+    """Receive a Razorpay webhook; events are applied by a background worker"""
+    body = request.body
+    if not verify_signature(body, request.headers.get('X-Razorpay-Signature')):
+        return Response({
+            'success': False,
+            'error': 'Invalid signature'
+        }, status=400)
+
+    try:
+        record_event(body, request.headers.get('X-Razorpay-Event-Id'))
+    except json.JSONDecodeError:
+        return Response({
+            'success': False,
+            'error': 'Invalid payload'
+        }, status=400)
+
+    return Response({'success': True})
@@ -0,0 +1,141 @@
+import hashlib
+import hmac
+import json
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.donations.models import Donation
+from apps.membership.models import Payment
+from apps.payments.models import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# Razorpay event -> status it moves the Payment/Donation to
+EVENT_STATUSES = {
+    'payment.authorized': 'processing',
+    'payment.captured': 'completed',
+    'order.paid': 'completed',
+    'payment.failed': 'failed',
+    'refund.processed': 'refunded',
+}
+
+# An event never moves a row backwards, e.g. a late 'authorized' after 'captured'
+STATUS_RANK = {
+    'pending': 0,
+    'processing': 1,
+    'failed': 1,
+    'completed': 2,
+    'refunded': 3,
+}
+
+# Held while a processing task is queued, so a burst of events enqueues one task
+SCHEDULED_KEY = 'payments:webhooks:scheduled'
+
+def verify_signature(body, signature):
+    """Check the X-Razorpay-Signature HMAC of the raw request body"""
+    secret = settings.RAZORPAY_WEBHOOK_SECRET
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def record_event(body, event_id=None):
+    """Persist a verified event in a single insert, ignoring redeliveries"""
+    from apps.payments.tasks import process_webhook_events
+
+    payload = json.loads(body)
+    event_id = event_id or hashlib.sha256(body).hexdigest()
+    WebhookEvent.objects.bulk_create([
+        WebhookEvent(event_id=event_id, event_type=payload.get('event', ''), payload=payload)
+    ], ignore_conflicts=True)
+
+    if cache.add(SCHEDULED_KEY, True, timeout=settings.WEBHOOK_SCHEDULE_WINDOW):
+        transaction.on_commit(process_webhook_events.delay)
+
+def _payment_entity(payload):
+    return ((payload.get('payload') or {}).get('payment') or {}).get('entity') or {}
+
+def _claim_batch(batch_size):
+    """Lock a batch of pending events, skipping rows another worker already holds"""
+    return list(
+        WebhookEvent.objects.select_for_update(skip_locked=True)
+        .filter(status='pending')
+        .order_by('created_at')[:batch_size]
+    )
+
+def _apply(row, entity, status, now):
+    """Move one Payment or Donation to the event's status, returning whether it changed"""
+    if STATUS_RANK[status] < STATUS_RANK.get(row.status, 0):
+        return False
+    row.status = status
+    # bulk_update skips auto_now, so stamp it here
+    row.updated_at = now
+    row.razorpay_payment_id = entity.get('id') or row.razorpay_payment_id
+    if status == 'completed' and not row.completed_at:
+        row.completed_at = now
+    if isinstance(row, Payment):
+        row.payment_method = entity.get('method') or row.payment_method
+        row.gateway_response = entity
+    return True
+
+def _apply_batch(events):
+    now = timezone.now()
+    order_ids = {_payment_entity(event.payload).get('order_id') for event in events} - {None, ''}
+    payments = {
+        p.razorpay_order_id: p for p in Payment.objects.filter(razorpay_order_id__in=order_ids).only(
+            'status', 'razorpay_order_id', 'razorpay_payment_id', 'payment_method',
+            'gateway_response', 'completed_at')
+    }
+    donations = {
+        d.razorpay_order_id: d for d in Donation.objects.filter(razorpay_order_id__in=order_ids).only(
+            'status', 'razorpay_order_id', 'razorpay_payment_id', 'completed_at')
+    }
+    changed_payments, changed_donations = {}, {}
+
+    for event in events:
+        event.processed_at = now
+        event.updated_at = now
+        entity = _payment_entity(event.payload)
+        status = EVENT_STATUSES.get(event.event_type)
+        order_id = entity.get('order_id')
+        row = payments.get(order_id) or donations.get(order_id)
+        if status is None or row is None:
+            event.status = 'ignored'
+            continue
+
+        try:
+            if _apply(row, entity, status, now):
+                changed = changed_payments if isinstance(row, Payment) else changed_donations
+                changed[row.pk] = row
+        except Exception as e:
+            logger.exception("Failed to apply webhook event %s", event.event_id)
+            event.status = 'failed'
+            event.last_error = str(e)
+        else:
+            event.status = 'processed'
+
+    Payment.objects.bulk_update(changed_payments.values(), [
+        'status', 'razorpay_payment_id', 'payment_method', 'gateway_response', 'completed_at', 'updated_at'])
+    Donation.objects.bulk_update(changed_donations.values(), [
+        'status', 'razorpay_payment_id', 'completed_at', 'updated_at'])
+    WebhookEvent.objects.bulk_update(events, ['status', 'processed_at', 'last_error', 'updated_at'])
+
+def process_pending_events(batch_size=None):
+    """Apply pending webhook events in batches, returning how many were handled"""
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    # Events arriving from here on need a fresh task
+    cache.delete(SCHEDULED_KEY)
+    handled = 0
+
+    while True:
+        with transaction.atomic():
+            batch = _claim_batch(batch_size)
+            if not batch:
+                break
+            _apply_batch(batch)
+        handled += len(batch)
+
+    return handled
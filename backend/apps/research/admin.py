@@ -1,8 +1,34 @@
-from django.contrib import admin
+import io
+from django import forms
+from django.contrib import admin, messages
+from django.db.models import F
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from apps.research.bibliography import PARSERS, detect_format, import_bibliography
 from apps.research.models import Publication, ResearchCategory
 from django.utils.html import format_html
 from import_export.admin import ImportExportModelAdmin  # If used
 
+# Rows of the import report shown on the result page
+BIBLIOGRAPHY_REPORT_LIMIT = 500
+
+class BibliographyImportForm(forms.Form):
+    file = forms.FileField(help_text="A .bib or .ris file")
+    status = forms.ChoiceField(choices=Publication.STATUS_CHOICES, initial='published')
+    category = forms.ModelChoiceField(queryset=ResearchCategory.objects.all(), required=False)
+    tags = forms.CharField(required=False, help_text="Comma-separated tags added to every imported publication")
+    create_authors = forms.BooleanField(required=False, initial=False,
+                                        help_text="Create inactive users for authors without an account")
+    dry_run = forms.BooleanField(required=False, initial=True,
+                                 help_text="Only show what would be imported or skipped")
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if detect_format(upload.name) not in PARSERS:
+            raise forms.ValidationError("Upload a .bib or .ris file.")
+        return upload
+
 # Unregister ResearchCategory and Publication if already registered to avoid errors
 for model in [ResearchCategory, Publication]:
     try:
@@ -28,8 +54,11 @@ class PublicationAdmin(ImportExportModelAdmin):
     list_filter = ['publication_type', 'status', 'category', 'publication_date']
     search_fields = ['title', 'abstract', 'keywords']
     list_editable = ['status']
-    ordering = ['-publication_date', '-created_at']
+    ordering = [F('publication_date').desc(nulls_last=True), '-created_at']
     filter_horizontal = ['authors']
+    # Maintained from verified Citation rows
+    readonly_fields = ['citation_count']
+    import_export_change_list_template = 'admin/research/publication/change_list_import_export.html'
 
     fieldsets = (
         ('Basic Information', {
@@ -51,3 +80,49 @@ class PublicationAdmin(ImportExportModelAdmin):
             'fields': ('download_count', 'view_count', 'citation_count')
         }),
     )
+
+    def get_urls(self):
+        return [
+            path('import-bibliography/', self.admin_site.admin_view(self.import_bibliography_view),
+                 name='research_publication_import_bibliography'),
+        ] + super().get_urls()
+
+    def import_bibliography_view(self, request):
+        """Upload a BibTeX or RIS file, previewing the diff on a dry run"""
+        if not self.has_add_permission(request):
+            return redirect('admin:research_publication_changelist')
+
+        form = BibliographyImportForm(request.POST or None, request.FILES or None)
+        totals, rows = None, []
+
+        def keep_row(row):
+            if len(rows) < BIBLIOGRAPHY_REPORT_LIMIT:
+                rows.append(row)
+
+        if request.method == 'POST' and form.is_valid():
+            data = form.cleaned_data
+            upload = data['file']
+            source = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace')
+            totals = import_bibliography(
+                PARSERS[detect_format(upload.name)](source),
+                status=data['status'],
+                category=data['category'],
+                tags=[tag.strip() for tag in data['tags'].split(',') if tag.strip()],
+                dry_run=data['dry_run'],
+                create_authors=data['create_authors'],
+                report=keep_row,
+            )
+            if not data['dry_run']:
+                messages.success(request, f"Imported {totals['created']:,} publications from {upload.name}.")
+                return redirect('admin:research_publication_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': "Import BibTeX / RIS",
+            'form': form,
+            'totals': totals,
+            'rows': rows,
+            'report_limit': BIBLIOGRAPHY_REPORT_LIMIT,
+        }
+        return TemplateResponse(request, 'admin/research/publication/import_bibliography.html', context)
@@ -6,3 +6,5 @@ class ResearchConfig(AppConfig):
     name = 'apps.research'
     verbose_name = 'Research'
 
+    def ready(self):
+        from apps.research import signals  # noqa: F401
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from django.db import transaction
+
+from apps.research.models import AuthorContribution, AuthorStats, Publication
+from apps.research.tasks import refresh_author_stats as refresh_author_stats_task, update_coauthor_graph
+
+# Authors recomputed per query
+STATS_BATCH_SIZE = 1000
+# Publications with at least this many citations count towards the i10-index
+I10_THRESHOLD = 10
+
+def h_index(citation_counts):
+    """Largest h such that h publications have at least h citations each"""
+    ranked = sorted(citation_counts, reverse=True)
+    return sum(1 for rank, count in enumerate(ranked, start=1) if count >= rank)
+
+def compute_stats(author_id, citation_counts):
+    return AuthorStats(author_id=author_id, publication_count=len(citation_counts),
+                       citation_count=sum(citation_counts), h_index=h_index(citation_counts),
+                       i10_index=sum(1 for count in citation_counts if count >= I10_THRESHOLD))
+
+def refresh_author_stats(author_ids=None, batch_size=STATS_BATCH_SIZE):
+    """Recompute the stats rows of some authors, or of everyone, returning how many were stored
+
+    Each batch reads the authors' contributions and the citation counts
+    of their published publications in two queries. Authors left with nothing published lose
+    their row.
+    """
+    if author_ids is None:
+        author_ids = set(AuthorContribution.objects.values_list('author_id', flat=True).distinct())
+        author_ids |= set(AuthorStats.objects.values_list('author_id', flat=True))
+    author_ids = sorted({int(pk) for pk in author_ids})
+
+    stored = 0
+    for start in range(0, len(author_ids), batch_size):
+        batch = author_ids[start:start + batch_size]
+        contributions = AuthorContribution.objects.filter(author__in=batch).order_by()
+        # Two index-driven reads; joined in SQL, SQLite probes every published
+        # publication against the whole author list
+        citations = dict(Publication.objects.filter(pk__in=contributions.values('publication'), status='published')
+                         .order_by().values_list('pk', 'citation_count'))
+        counts = defaultdict(list)
+        for author_id, publication_id in contributions.values_list('author_id', 'publication_id'):
+            if publication_id in citations:
+                counts[author_id].append(citations[publication_id])
+        with transaction.atomic():
+            AuthorStats.objects.filter(author__in=batch).exclude(author__in=list(counts)).delete()
+            AuthorStats.objects.bulk_create(
+                [compute_stats(author_id, citation_counts) for author_id, citation_counts in counts.items()],
+                update_conflicts=True, unique_fields=['author'],
+                update_fields=['publication_count', 'citation_count', 'h_index', 'i10_index', 'updated_at'])
+        stored += len(counts)
+    return stored
+
+def author_stats(author_id):
+    """An author's stats row, computed on the spot if it has not been yet; None if nothing is published"""
+    stats = AuthorStats.objects.select_related('author').filter(author_id=author_id).first()
+    if stats is None and refresh_author_stats([author_id]):
+        stats = AuthorStats.objects.select_related('author').filter(author_id=author_id).first()
+    return stats
+
+def authors_changed(author_ids, publication_ids=None):
+    """Refresh some authors' stats once the change is committed
+
+    Given publication_ids, who wrote those publications changed too. Every
+    co-author on them gets new edges, since a publication's weight is
+    shared among all of its authors.
+    """
+    author_ids = sorted({pk for pk in author_ids if pk is not None})
+    if author_ids:
+        transaction.on_commit(lambda: refresh_author_stats_task.delay(author_ids))
+    if publication_ids is not None:
+        publication_ids = sorted({str(pk) for pk in publication_ids if pk is not None})
+        transaction.on_commit(lambda: update_coauthor_graph.delay(author_ids, publication_ids))
+
+def publications_changed(publication_ids, authorship=True):
+    """Refresh the stats of everyone who wrote the given publications, and their edges unless only counts moved"""
+    publication_ids = [pk for pk in publication_ids if pk is not None]
+    if publication_ids:
+        authors_changed(AuthorContribution.objects.filter(publication__in=publication_ids)
+                        .values_list('author_id', flat=True).distinct(),
+                        publication_ids if authorship else None)
+
+# Signal handlers
+
+def update_stats_on_publication_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Publishing, unpublishing or a new citation_count moves its authors' stats"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & {'status', 'citation_count'}:
+        return
+    publications_changed([instance.pk], authorship=update_fields is None or 'status' in update_fields)
+
+def update_stats_on_publication_delete(sender, instance, **kwargs):
+    # Read before the contributions are cascaded away
+    publications_changed([instance.pk])
+
+def remember_contribution_author(sender, instance, raw=False, **kwargs):
+    """Note what a contribution linked before, so reassigning it refreshes both sides"""
+    if raw or instance._state.adding:
+        return
+    instance._stats_previous = (AuthorContribution.objects.filter(pk=instance.pk)
+                                .values_list('author_id', 'publication_id').first() or (None, None))
+
+def update_stats_on_contribution_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    author_id, publication_id = getattr(instance, '_stats_previous', (None, None))
+    authors_changed([instance.author_id, author_id], [instance.publication_id, publication_id])
+
+def update_stats_on_authors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """publication.authors and user.publications add()/remove()/clear() bypass AuthorContribution's signals"""
+    if action == 'pre_clear':
+        # clear() does not report what it removed
+        contributions = AuthorContribution.objects.filter(**{'author' if reverse else 'publication': instance})
+        instance._stats_cleared = list(contributions.values_list('publication_id' if reverse else 'author_id',
+                                                                 flat=True))
+    if not action.startswith('post_'):
+        return
+    changed = getattr(instance, '_stats_cleared', []) if action == 'post_clear' else list(pk_set or [])
+    if reverse:
+        # The user's own stats, and the edges on every publication they joined or left
+        authors_changed([instance.pk], changed)
+    else:
+        authors_changed(changed, [instance.pk])
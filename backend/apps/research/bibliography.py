@@ -0,0 +1,602 @@
+import re
+import unicodedata
+import uuid
+from datetime import date
+from itertools import islice
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.text import slugify
+from taggit.models import Tag
+
+from apps.core.models import UUIDTaggedItem
+from apps.core.stats import record_bulk_created
+from apps.research import search
+from apps.research.exports import bump_catalog_version
+from apps.research.identifiers import (
+    ARXIV_PREFIX, DOI_PREFIX, ISSN, clean_identifier_fields, identifier_query, index_identifiers,
+    normalize_arxiv_id, normalize_doi, normalize_isbn,
+)
+from apps.research.models import AuthorContribution, AuthorSurname, Publication, PublicationIdentifier
+from apps.research.tasks import rebuild_coauthor_graph, rebuild_related_index, refresh_author_stats
+
+IMPORT_BATCH_SIZE = 1000
+
+REPORT_HEADER = ['line', 'action', 'matched_on', 'identifier', 'existing', 'title']
+
+# BibTeX entry type -> publication type; anything else is a research paper
+BIBTEX_PUBLICATION_TYPES = {
+    'techreport': 'report',
+    'report': 'report',
+    'unpublished': 'working_paper',
+    'misc': 'research_paper',
+}
+
+# RIS reference type -> publication type
+RIS_PUBLICATION_TYPES = {
+    'RPRT': 'report',
+    'CASE': 'case_study',
+    'UNPB': 'working_paper',
+}
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# BibTeX syntax
+ENTRY_START = re.compile(r'@\s*([A-Za-z]+)\s*\{')
+BRACE = re.compile(r'[{}]')
+QUOTED = re.compile(r'[{}"]')
+FIELD_NAME = re.compile(r'\s*([\w\-:.+]+)\s*=\s*')
+BARE_VALUE = re.compile(r'[^\s,#}]+')
+CONCAT = re.compile(r'\s*#\s*')
+SEPARATOR = re.compile(r'\s*,?')
+AUTHOR_SEPARATOR = re.compile(r'[{}]|\s+and\s+', re.IGNORECASE)
+
+# LaTeX markup found in BibTeX values
+LATEX_ACCENTS = {
+    "'": '\u0301', '`': '\u0300', '^': '\u0302', '"': '\u0308', '~': '\u0303', '=': '\u0304',
+    '.': '\u0307', 'u': '\u0306', 'v': '\u030c', 'H': '\u030b', 'c': '\u0327', 'k': '\u0328',
+}
+LATEX_ACCENT = re.compile(r'\\([\'`^"~=.]|[uvHck](?![A-Za-z]))\s*\{?\s*\\?([A-Za-z])\s*\}?')
+LATEX_LETTERS = {
+    'ss': 'ß', 'ae': 'æ', 'AE': 'Æ', 'oe': 'œ', 'OE': 'Œ', 'aa': 'å', 'AA': 'Å',
+    'o': 'ø', 'O': 'Ø', 'l': 'ł', 'L': 'Ł',
+}
+LATEX_LETTER = re.compile(r'\\(ss|ae|AE|oe|OE|aa|AA|o|O|l|L)(?![A-Za-z])\s*')
+LATEX_ESCAPE = re.compile(r'\\([&%$#_{}])')
+LATEX_COMMAND = re.compile(r'\\[A-Za-z]+\*?\s*')
+
+# RIS syntax: 'TY  - JOUR'
+RIS_LINE = re.compile(r'^([A-Z][A-Z0-9])  -(?: (.*))?$')
+
+class BibEntry:
+    """One bibliography record, mapped onto Publication fields"""
+
+    def __init__(self, line, fields, authors=(), keywords=(), error=''):
+        self.line = line  # Where the record starts in the source file
+        self.fields = fields
+        self.authors = list(authors)  # (first name, last name) pairs in author order
+        self.keywords = list(keywords)
+        self.error = error
+
+def identifier_keys(doi, isbn, arxiv_id):
+    """(kind, normalized value) pairs a record can be matched on"""
+    keys = [('doi', normalize_doi(doi)), ('isbn', normalize_isbn(isbn)),
+            ('arxiv', normalize_arxiv_id(arxiv_id))]
+    return [(kind, value) for kind, value in keys if value]
+
+def existing_identifiers(keys):
+    """Normalized identifier -> publication pk for those of the keys already in the catalog, in one query"""
+    if not keys:
+        return {}
+    rows = PublicationIdentifier.objects.filter(identifier_query(keys)).values_list('scheme', 'value', 'publication_id')
+    return {(scheme, value): str(pk) for scheme, value, pk in rows}
+
+def latex_to_text(value):
+    """Plain Unicode text from a BibTeX value: accents resolved, markup and braces dropped"""
+    if '\\' in value:
+        value = LATEX_ACCENT.sub(lambda m: m.group(2) + LATEX_ACCENTS[m.group(1)], value)
+        value = LATEX_LETTER.sub(lambda m: LATEX_LETTERS[m.group(1)], value)
+        # Escaped braces survive the brace stripping below as placeholders
+        value = LATEX_ESCAPE.sub(lambda m: {'{': '\x00', '}': '\x01'}.get(m.group(1), m.group(1)), value)
+        value = LATEX_COMMAND.sub('', value)
+    value = value.replace('{', '').replace('}', '').replace('~', ' ')
+    value = value.replace('\x00', '{').replace('\x01', '}')
+    return unicodedata.normalize('NFC', ' '.join(value.split()))
+
+def _name_parts(name, corporate=False):
+    """'Last, First' or 'First Last' -> (first, last)"""
+    if corporate:
+        return '', name
+    parts = [part.strip() for part in name.split(',')]
+    if len(parts) > 1:
+        # 'Last, Jr, First' keeps the suffix out of either name
+        return parts[-1], parts[0]
+    words = name.split()
+    return ' '.join(words[:-1]), words[-1] if words else ''
+
+def fold_name(name):
+    """A name without case, accents, dots or repeated spaces, so 'Müller' and 'muller' compare equal"""
+    text = unicodedata.normalize('NFKD', (name or '').replace('.', ' '))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    return ' '.join(text.split())
+
+def name_key(first, last):
+    """Case- and accent-insensitive key for matching author names"""
+    return f"{fold_name(first)}|{fold_name(last)}"
+
+def index_author_surnames(users):
+    """Store the folded surnames of (user id, last name) pairs"""
+    AuthorSurname.objects.bulk_create(
+        [AuthorSurname(user_id=pk, surname=fold_name(last_name)[:150]) for pk, last_name in users],
+        update_conflicts=True, unique_fields=['user'], update_fields=['surname'])
+
+def rebuild_author_surnames(batch_size=IMPORT_BATCH_SIZE, missing_only=False):
+    """Fold the surname of every user, or of those not indexed yet, returning how many were stored"""
+    users = User.objects.order_by('pk').values_list('pk', 'last_name')
+    if missing_only:
+        # Users created before the index existed, or by bulk_create, which skips the save signal
+        users = users.filter(folded_surname__isnull=True)
+    count, last_pk = 0, None
+    while True:
+        batch = list((users.filter(pk__gt=last_pk) if last_pk is not None else users)[:batch_size])
+        if not batch:
+            return count
+        index_author_surnames(batch)
+        count += len(batch)
+        last_pk = batch[-1][0]
+
+def update_author_surname(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'last_name' not in update_fields):
+        return
+    index_author_surnames([(instance.pk, instance.last_name)])
+
+def _split_bibtex_authors(value):
+    """Split an author field on ' and ' outside braces"""
+    names, depth, start = [], 0, 0
+    for match in AUTHOR_SEPARATOR.finditer(value):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+        elif depth == 0:
+            names.append(value[start:match.start()])
+            start = match.end()
+    names.append(value[start:])
+
+    authors = []
+    for name in names:
+        name = name.strip()
+        if not name or name.lower() == 'others':
+            continue
+        # A fully braced name is an organisation and is not split
+        corporate = name.startswith('{') and name.endswith('}') and BRACE.findall(name) == ['{', '}']
+        first, last = _name_parts(latex_to_text(name), corporate)
+        if last:
+            authors.append((first, last))
+    return authors
+
+def _split_keywords(value):
+    return [keyword.strip() for keyword in re.split(r'[;,]', value) if keyword.strip()]
+
+def _publication_date(year, month='', day=''):
+    """A date from loosely formatted parts, defaulting to the first of the month or year"""
+    year_match = re.search(r'\d{4}', year or '')
+    if not year_match:
+        return None
+    month = (month or '').strip().lower()
+    month_number = int(month) if month.isdigit() else (MONTHS.index(month[:3]) + 1 if month[:3] in MONTHS else 1)
+    try:
+        return date(int(year_match.group()), month_number, int(day) if str(day).isdigit() else 1)
+    except ValueError:
+        return None
+
+def _truncated(fields):
+    """Clip values to their column lengths; bulk_create does not validate"""
+    for name, value in fields.items():
+        max_length = Publication._meta.get_field(name).max_length
+        if isinstance(value, str) and max_length and len(value) > max_length:
+            # A clipped URL would point somewhere else entirely
+            fields[name] = '' if name == 'external_url' else value[:max_length]
+    return fields
+
+def _entry(line, fields, authors, keywords):
+    fields['keywords'] = ', '.join(keywords)
+    fields = _truncated({name: value for name, value in fields.items() if value is not None})
+    if not fields.get('title'):
+        return BibEntry(line, fields, authors, keywords, error='missing title')
+    return BibEntry(line, fields, authors, keywords)
+
+# BibTeX
+
+def _raw_bibtex_entries(stream):
+    """Yield (line number, entry type, body) for each @entry, reading one line at a time
+
+    An entry whose braces never close yields a body of None when the next
+    entry starts at the beginning of a line.
+    """
+    entry_type, parts, depth, start = None, [], 0, 0
+    for number, line in enumerate(stream, 1):
+        position = 0
+        if entry_type is not None and ENTRY_START.match(line):
+            yield start, entry_type, None
+            entry_type, parts = None, []
+        while True:
+            if entry_type is None:
+                match = ENTRY_START.search(line, position)
+                if not match:
+                    break
+                entry_type, start, depth = match.group(1).lower(), number, 1
+                position = match.end()
+            for brace in BRACE.finditer(line, position):
+                depth += 1 if brace.group() == '{' else -1
+                if depth == 0:
+                    parts.append(line[position:brace.start()])
+                    yield start, entry_type, ''.join(parts)
+                    entry_type, parts = None, []
+                    position = brace.end()
+                    break
+            else:
+                parts.append(line[position:])
+                break
+    if entry_type is not None:
+        yield start, entry_type, None
+
+def _bibtex_value(text, position, macros):
+    """Parse one {braced}, "quoted" or bare value, returning it and the position after it"""
+    opener = text[position:position + 1]
+    if opener == '{':
+        depth = 1
+        for brace in BRACE.finditer(text, position + 1):
+            depth += 1 if brace.group() == '{' else -1
+            if depth == 0:
+                return text[position + 1:brace.start()], brace.end()
+        return text[position + 1:], len(text)
+    if opener == '"':
+        depth = 0
+        for char in QUOTED.finditer(text, position + 1):
+            if char.group() == '"' and depth == 0:
+                return text[position + 1:char.start()], char.end()
+            depth += {'{': 1, '}': -1}.get(char.group(), 0)
+        return text[position + 1:], len(text)
+    match = BARE_VALUE.match(text, position)
+    word = match.group() if match else ''
+    return macros.get(word.lower(), word), position + len(word)
+
+def _bibtex_fields(text, macros):
+    """'field = {value} # macro, ...' -> {field: value}"""
+    fields, position = {}, 0
+    while True:
+        match = FIELD_NAME.match(text, position)
+        if not match:
+            return fields
+        name, position = match.group(1).lower(), match.end()
+        pieces = []
+        while True:
+            value, position = _bibtex_value(text, position, macros)
+            pieces.append(value)
+            match = CONCAT.match(text, position)
+            if not match:
+                break
+            position = match.end()
+        fields[name] = ''.join(pieces)
+        position = SEPARATOR.match(text, position).end()
+
+def _bibtex_entry(line, entry_type, raw):
+    text = {name: latex_to_text(value) for name, value in raw.items() if name != 'author'}
+    arxiv_id = ''
+    if text.get('eprint') and text.get('archiveprefix', text.get('eprinttype', 'arxiv')).lower() == 'arxiv':
+        arxiv_id = text['eprint']
+    elif text.get('arxiv'):
+        arxiv_id = text['arxiv']
+
+    if text.get('date') and not text.get('year'):
+        # biblatex dates: YYYY, YYYY-MM or YYYY-MM-DD
+        publication_date = _publication_date(*(text['date'].split('-') + ['', ''])[:3])
+    else:
+        publication_date = _publication_date(text.get('year', ''), text.get('month', ''))
+
+    fields = {
+        'publication_type': BIBTEX_PUBLICATION_TYPES.get(entry_type, 'research_paper'),
+        'title': text.get('title', ''),
+        'abstract': text.get('abstract', ''),
+        'journal_name': text.get('journal') or text.get('journaltitle') or text.get('booktitle', ''),
+        'publisher': text.get('publisher') or text.get('institution') or text.get('organization', ''),
+        'publication_date': publication_date,
+        'volume': text.get('volume', ''),
+        'issue': text.get('number') or text.get('issue', ''),
+        'pages': re.sub(r'\s*-+\s*', '-', text.get('pages', '')),
+        'doi': DOI_PREFIX.sub('', text.get('doi', '')),
+        'isbn': text.get('isbn', ''),
+        'issn': text.get('issn', ''),
+        'arxiv_id': ARXIV_PREFIX.sub('', arxiv_id),
+        'external_url': text.get('url', ''),
+    }
+    return _entry(line, fields, _split_bibtex_authors(raw.get('author', '')),
+                  _split_keywords(text.get('keywords', '')))
+
+def parse_bibtex(stream):
+    """Yield a BibEntry for each record in a BibTeX file, reading it as a stream"""
+    macros = {month: month for month in MONTHS}
+    for line, entry_type, body in _raw_bibtex_entries(stream):
+        if entry_type in ('comment', 'preamble'):
+            continue
+        if body is None:
+            yield BibEntry(line, {}, error='unterminated entry')
+        elif entry_type == 'string':
+            macros.update({name: latex_to_text(value) for name, value in _bibtex_fields(body, macros).items()})
+        else:
+            # Skip the citation key
+            yield _bibtex_entry(line, entry_type, _bibtex_fields(body.partition(',')[2], macros))
+
+# RIS
+
+def _ris_entry(line, tags):
+    def first(*names):
+        return next((tags[name][0] for name in names if tags.get(name)), '')
+
+    date_parts = (first('DA', 'PY', 'Y1').split('/') + ['', ''])[:3]
+    serial = first('SN')
+    isbn, issn = ('', serial) if ISSN.match(serial.strip()) else (serial, '')
+    start_page, end_page = first('SP'), first('EP')
+    arxiv_id = next((ARXIV_PREFIX.sub('', url) for url in tags.get('UR', []) if ARXIV_PREFIX.match(url)), '')
+
+    fields = {
+        'publication_type': RIS_PUBLICATION_TYPES.get(first('TY'), 'research_paper'),
+        'title': first('TI', 'T1', 'CT'),
+        'abstract': first('AB', 'N2'),
+        'journal_name': first('JO', 'JF', 'T2', 'JA'),
+        'publisher': first('PB'),
+        'publication_date': _publication_date(first('PY', 'Y1', 'DA'), date_parts[1], date_parts[2]),
+        'volume': first('VL'),
+        'issue': first('IS'),
+        'pages': f"{start_page}-{end_page}" if start_page and end_page else start_page,
+        'doi': DOI_PREFIX.sub('', first('DO')),
+        'isbn': isbn,
+        'issn': issn,
+        'arxiv_id': arxiv_id,
+        'external_url': first('UR'),
+    }
+    authors = [_name_parts(name) for name in tags.get('AU', []) + tags.get('A1', [])]
+    keywords = [keyword for value in tags.get('KW', []) for keyword in _split_keywords(value)]
+    return _entry(line, fields, [author for author in authors if author[1]], keywords)
+
+def parse_ris(stream):
+    """Yield a BibEntry for each record in a RIS file, reading it as a stream"""
+    tags, last_tag, start = {}, None, 0
+    for number, line in enumerate(stream, 1):
+        line = line.rstrip('\r\n').lstrip('\ufeff')
+        match = RIS_LINE.match(line)
+        if not match:
+            # Wrapped continuation of the previous value
+            if last_tag and line.strip():
+                tags[last_tag][-1] = f"{tags[last_tag][-1]} {line.strip()}"
+            continue
+        tag, value = match.group(1), (match.group(2) or '').strip()
+        if tag == 'TY':
+            tags, start = {}, number
+        if tag == 'ER':
+            if tags:
+                yield _ris_entry(start, tags)
+            tags, last_tag = {}, None
+            continue
+        tags.setdefault(tag, []).append(value)
+        last_tag = tag
+    if tags:
+        yield _ris_entry(start, tags)
+
+PARSERS = {
+    'bib': parse_bibtex,
+    'ris': parse_ris,
+}
+
+def detect_format(filename):
+    """Parser key from a file name, or None"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return {'bib': 'bib', 'bibtex': 'bib', 'ris': 'ris'}.get(extension)
+
+# Import
+
+class AuthorResolver:
+    """Maps author names to User ids, looking each unique name up once per import"""
+
+    def __init__(self, create=True):
+        self.create = create
+        self.ids = {}  # name key -> user id, None while unmatched
+        self.missing = 0
+
+    def resolve(self, names):
+        """User ids for a batch of (first, last) names, keyed by name_key"""
+        pending = {}
+        for first, last in names:
+            key = name_key(first, last)
+            if key not in self.ids:
+                pending.setdefault(key, (first, last))
+        if pending:
+            self._lookup(pending)
+        return self.ids
+
+    def _lookup(self, pending):
+        surnames = {fold_name(last)[:150] for _, last in pending.values()}
+        users = (User.objects.filter(folded_surname__surname__in=surnames)
+                 .order_by('-is_active', 'date_joined')
+                 .values_list('pk', 'first_name', 'last_name'))
+        for pk, first_name, last_name in users:
+            key = name_key(first_name, last_name)
+            if key in pending and key not in self.ids:
+                self.ids[key] = pk
+
+        unmatched = {key: name for key, name in pending.items() if key not in self.ids}
+        self.missing += len(unmatched)
+        if not self.create:
+            self.ids.update(dict.fromkeys(unmatched))
+            return
+
+        new_users = self._new_users(unmatched)
+        User.objects.bulk_create(new_users.values())
+        usernames = dict(User.objects.filter(username__in=[user.username for user in new_users.values()])
+                         .values_list('username', 'pk'))
+        for key, user in new_users.items():
+            self.ids[key] = usernames[user.username]
+        # bulk_create skips the save signal that folds surnames
+        index_author_surnames([(usernames[user.username], user.last_name) for user in new_users.values()])
+
+    def _new_users(self, names):
+        """Inactive accounts for authors without one, with unique usernames"""
+        bases = {}
+        for key, (first, last) in names.items():
+            ascii_name = unicodedata.normalize('NFKD', f"{first} {last}").encode('ascii', 'ignore').decode()
+            bases[key] = (slugify(ascii_name).replace('-', '.') or 'author')[:140]
+        taken = set(User.objects.filter(username__in=bases.values()).values_list('username', flat=True))
+
+        users = {}
+        for key, (first, last) in names.items():
+            username = bases[key]
+            if username in taken:
+                username = f"{username}.{uuid.uuid4().hex[:6]}"
+            taken.add(username)
+            user = User(username=username, first_name=first[:150], last_name=last[:150], is_active=False)
+            user.set_unusable_password()
+            users[key] = user
+        return users
+
+def _unique_tag_slugs(names):
+    """Slugs for new tags that collide neither with each other nor with existing tags"""
+    slugs = {name: slugify(name, allow_unicode=True)[:90] or 'tag' for name in names}
+    taken = set(Tag.objects.filter(slug__in=slugs.values()).values_list('slug', flat=True))
+    for name, slug in slugs.items():
+        if slug in taken:
+            slugs[name] = f"{slug}-{uuid.uuid4().hex[:6]}"
+        taken.add(slugs[name])
+    return slugs
+
+def assign_tags(publication_tags, batch_size=IMPORT_BATCH_SIZE):
+    """Tag many new publications at once: {publication pk: [tag names]}"""
+    names = {name for tag_names in publication_tags.values() for name in tag_names}
+    if not names:
+        return
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+    missing = names - set(tag_ids)
+    if missing:
+        slugs = _unique_tag_slugs(missing)
+        Tag.objects.bulk_create([Tag(name=name, slug=slugs[name]) for name in missing], batch_size=batch_size)
+        tag_ids.update(Tag.objects.filter(name__in=missing).values_list('name', 'pk'))
+
+    content_type = ContentType.objects.get_for_model(Publication)
+    UUIDTaggedItem.objects.bulk_create([
+        UUIDTaggedItem(content_type=content_type, object_id=pk, tag_id=tag_ids[name])
+        for pk, tag_names in publication_tags.items() for name in tag_names
+    ], batch_size=batch_size)
+
+def _entry_tags(entry, extra_tags):
+    """Keywords plus the import's own tags, without case-insensitive repeats"""
+    tags, seen = [], set()
+    for name in entry.keywords + list(extra_tags):
+        name = name[:100]
+        if name.casefold() not in seen:
+            seen.add(name.casefold())
+            tags.append(name)
+    return tags
+
+def _plan(entry, known):
+    """Report row for an entry, recording its identifiers as seen; action 'create' means insert"""
+    title = entry.fields.get('title', '')
+    if entry.error:
+        return [entry.line, 'invalid', '', '', '', entry.error]
+    keys = identifier_keys(entry.fields.get('doi'), entry.fields.get('isbn'), entry.fields.get('arxiv_id'))
+    for kind, value in keys:
+        match = known.get((kind, value))
+        if match is not None:
+            action = 'repeat' if match.startswith('line ') else 'duplicate'
+            return [entry.line, action, kind, value, match, title]
+    for key in keys:
+        known[key] = f"line {entry.line}"
+    return [entry.line, 'create', '', '', '', title]
+
+def _write_batch(entries, status, category, tags, resolver, batch_size):
+    """Insert one batch of new publications with their authors, tags and index entries"""
+    author_ids = resolver.resolve(name for entry in entries for name in entry.authors)
+
+    publications = [Publication(status=status, category=category, **entry.fields) for entry in entries]
+    for publication in publications:
+        clean_identifier_fields(publication)
+    Publication.objects.bulk_create(publications, batch_size=batch_size)
+
+    contributions = []
+    for entry, publication in zip(entries, publications):
+        seen = set()
+        for name in entry.authors:
+            user_id = author_ids[name_key(*name)]
+            # An author listed twice keeps their first position
+            if user_id is None or user_id in seen:
+                continue
+            seen.add(user_id)
+            contributions.append(AuthorContribution(
+                publication=publication, author_id=user_id, order=len(seen) - 1,
+                role='lead' if len(seen) == 1 else 'contributor'))
+    AuthorContribution.objects.bulk_create(contributions, batch_size=batch_size)
+
+    assign_tags({publication.pk: _entry_tags(entry, tags)
+                 for entry, publication in zip(entries, publications)}, batch_size)
+    search.index_publications(publications)
+    index_identifiers(publications)
+    # SiteStats and the homepage snapshot move when the import commits
+    record_bulk_created(Publication, publications)
+
+def import_bibliography(entries, status='published', category=None, tags=(), batch_size=IMPORT_BATCH_SIZE,
+                        dry_run=False, create_authors=False, report=None, progress=None):
+    """Import parsed BibEntries in batches, returning totals
+
+    Entries whose DOI, ISBN or arXiv id is already in the catalog (or earlier
+    in the same file) are skipped. Every entry is passed to report as a
+    REPORT_HEADER row, which on a dry run is the diff against the catalog.
+    The whole import commits or rolls back as one transaction.
+
+    Authors are matched through the folded surname index, so users missing
+    from it are indexed first, even on a dry run; otherwise every existing
+    researcher would count as unmatched. Unmatched authors are only created,
+    as inactive users, when create_authors is set.
+    """
+    rebuild_author_surnames(batch_size, missing_only=True)
+    totals = {'entries': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'new_authors': 0}
+    known = {}
+    resolver = AuthorResolver(create=create_authors and not dry_run)
+    entries = iter(entries)
+
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(entries, batch_size))
+            if not chunk:
+                break
+            # Identifiers seen earlier in the file keep their 'line N' match
+            chunk_keys = [key for entry in chunk for key in identifier_keys(
+                entry.fields.get('doi'), entry.fields.get('isbn'), entry.fields.get('arxiv_id'))]
+            for key, pk in existing_identifiers(chunk_keys).items():
+                known.setdefault(key, pk)
+            new_entries = []
+            for entry in chunk:
+                row = _plan(entry, known)
+                if report:
+                    report(row)
+                if row[1] == 'create':
+                    new_entries.append(entry)
+                else:
+                    totals['invalid' if row[1] == 'invalid' else 'duplicates'] += 1
+
+            totals['entries'] += len(chunk)
+            totals['created'] += len(new_entries)
+            if dry_run:
+                resolver.resolve(name for entry in new_entries for name in entry.authors)
+            elif new_entries:
+                _write_batch(new_entries, status, category, tags, resolver, batch_size)
+            totals['new_authors'] = resolver.missing
+            if progress:
+                progress(totals)
+
+    if totals['created'] and not dry_run:
+        bump_catalog_version()
+        # Bulk-created rows skip the save signals; a full build covers them all at once
+        rebuild_related_index.delay()
+        refresh_author_stats.delay()
+        rebuild_coauthor_graph.delay()
+    return totals
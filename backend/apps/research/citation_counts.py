@@ -0,0 +1,88 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from apps.research import author_stats
+from apps.research.models import Citation, Publication
+
+# Publications per recount query
+RECOUNT_BATCH_SIZE = 1000
+
+# Only verified citations count towards Publication.citation_count
+COUNTED_FIELDS = ['publication_id', 'is_verified']
+
+def _counted(values):
+    """The publication a citation row counts towards, or None"""
+    return values.get('publication_id') if values.get('is_verified') else None
+
+def apply_citation_deltas(deltas):
+    """Shift citation_count by {publication id: delta}, one UPDATE per distinct delta"""
+    groups = defaultdict(list)
+    for publication_id, delta in deltas.items():
+        if delta and publication_id is not None:
+            groups[delta].append(publication_id)
+    for delta, publication_ids in sorted(groups.items()):
+        Publication.objects.filter(pk__in=sorted(publication_ids)).update(
+            citation_count=Greatest(F('citation_count') + delta, Value(0)))
+    author_stats.publications_changed([pk for publication_ids in groups.values() for pk in publication_ids],
+                                      authorship=False)
+
+def remember_loaded_citation(sender, instance, **kwargs):
+    """Keep what a citation counted towards when loaded, so saves can compute deltas"""
+    deferred = instance.get_deferred_fields()
+    instance._citation_loaded = {field: getattr(instance, field)
+                                 for field in COUNTED_FIELDS if field not in deferred}
+
+def fill_missing_citation_values(sender, instance, raw=False, **kwargs):
+    """Fetch counted fields that were deferred when an existing citation was loaded"""
+    if raw or instance._state.adding:
+        return
+    loaded = instance.__dict__.setdefault('_citation_loaded', {})
+    missing = [field for field in COUNTED_FIELDS if field not in loaded]
+    if missing:
+        loaded.update(Citation.objects.filter(pk=instance.pk).values(*missing).first() or {})
+
+def update_citation_count_on_save(sender, instance, created, raw=False, **kwargs):
+    """Count a new verified citation, or move the count when one is verified, unverified or moved"""
+    if raw:
+        return
+    before = None if created else _counted(instance._citation_loaded)
+    instance._citation_loaded = {field: getattr(instance, field) for field in COUNTED_FIELDS}
+    after = _counted(instance._citation_loaded)
+    if before != after:
+        apply_citation_deltas({before: -1, after: 1})
+
+def update_citation_count_on_delete(sender, instance, **kwargs):
+    apply_citation_deltas({_counted(getattr(instance, '_citation_loaded', {})): -1})
+
+def recount_citations(publication_ids=None, batch_size=RECOUNT_BATCH_SIZE):
+    """Recompute citation_count from Citation rows in batches, returning how many were wrong
+
+    Bulk writes such as bulk_create and queryset updates skip the signals
+    that keep the counts live; this brings them back in line.
+    """
+    publications = Publication.objects.order_by('pk')
+    if publication_ids is not None:
+        publications = publications.filter(pk__in=publication_ids)
+    ids = list(publications.values_list('pk', flat=True))
+
+    corrected = 0
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        with transaction.atomic():
+            # Locked, so a delta landing mid-batch waits rather than being overwritten
+            stored = dict(Publication.objects.select_for_update().filter(pk__in=batch)
+                          .values_list('pk', 'citation_count'))
+            actual = dict(Citation.objects.filter(publication__in=batch, is_verified=True)
+                          .values('publication').annotate(total=Count('pk')).order_by()
+                          .values_list('publication', 'total'))
+            wrong = defaultdict(list)
+            for pk, count in stored.items():
+                if actual.get(pk, 0) != count:
+                    wrong[actual.get(pk, 0)].append(pk)
+            for count, pks in wrong.items():
+                Publication.objects.filter(pk__in=pks).update(citation_count=count)
+                corrected += len(pks)
+            author_stats.publications_changed([pk for pks in wrong.values() for pk in pks], authorship=False)
+    return corrected
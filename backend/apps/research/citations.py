@@ -0,0 +1,215 @@
+import re
+import unicodedata
+from django.core.cache import cache
+
+CITATION_CACHE_PREFIX = 'research:citation:v1'
+CITATION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+CITATION_STYLES = ['apa', 'mla', 'chicago', 'bibtex']
+
+# Publication type -> BibTeX entry type
+BIBTEX_TYPES = {
+    'research_paper': 'article',
+    'white_paper': 'techreport',
+    'report': 'techreport',
+    'policy_brief': 'techreport',
+    'case_study': 'misc',
+    'working_paper': 'unpublished',
+}
+
+BIBTEX_SPECIAL = re.compile(r'([&%$#_{}])')
+
+def display_name(first_name, last_name, username):
+    """Name as User.get_full_name() would show it, falling back to the username"""
+    return f"{first_name} {last_name}".strip() or username
+
+def _year(publication):
+    return publication.publication_date.year if publication.publication_date else 'n.d.'
+
+def _inverted(name):
+    """'First Middle Last' -> 'Last, First Middle'"""
+    if " " not in name:
+        return name
+    names = name.split()
+    return f"{names[-1]}, {' '.join(names[:-1])}"
+
+def format_apa(publication, authors):
+    """APA citation from the publication and its ordered author names"""
+    author_text = ", ".join(authors[:3])  # First 3 authors
+    if len(authors) > 3:
+        author_text += " et al."
+
+    citation = f"{author_text} ({_year(publication)}). {publication.title}."
+
+    if publication.journal_name:
+        citation += f" {publication.journal_name}"
+        if publication.volume:
+            citation += f", {publication.volume}"
+            if publication.issue:
+                citation += f"({publication.issue})"
+        if publication.pages:
+            citation += f", {publication.pages}"
+
+    citation += "."
+
+    if publication.doi:
+        citation += f" https://doi.org/{publication.doi}"
+    elif publication.external_url:
+        citation += f" {publication.external_url}"
+
+    return citation
+
+def format_mla(publication, authors):
+    """MLA citation from the publication and its ordered author names"""
+    if not authors:
+        return f'"{publication.title}." {_year(publication)}.'
+
+    citation = f'{_inverted(authors[0])}. "{publication.title}."'
+
+    if publication.journal_name:
+        citation += f" {publication.journal_name}"
+        if publication.volume:
+            citation += f", vol. {publication.volume}"
+            if publication.issue:
+                citation += f", no. {publication.issue}"
+        citation += f", {_year(publication)}"
+        if publication.pages:
+            citation += f", pp. {publication.pages}"
+
+    citation += "."
+
+    if publication.external_url:
+        citation += f" {publication.external_url}"
+
+    return citation
+
+def format_chicago(publication, authors):
+    """Chicago (notes and bibliography) citation"""
+    if not authors:
+        author_text = ""
+    elif len(authors) == 1:
+        author_text = _inverted(authors[0])
+    elif len(authors) > 10:
+        author_text = f"{_inverted(authors[0])}, " + ", ".join(authors[1:7]) + ", et al"
+    else:
+        author_text = ", ".join([_inverted(authors[0])] + authors[1:-1]) + f", and {authors[-1]}"
+
+    citation = f'{author_text}. "{publication.title}."' if author_text else f'"{publication.title}."'
+
+    if publication.journal_name:
+        citation += f" {publication.journal_name}"
+        if publication.volume:
+            citation += f" {publication.volume}"
+        if publication.issue:
+            citation += f", no. {publication.issue}"
+        citation += f" ({_year(publication)})"
+        if publication.pages:
+            citation += f": {publication.pages}"
+        citation += "."
+    else:
+        if publication.publisher:
+            citation += f" {publication.publisher},"
+        citation += f" {_year(publication)}."
+
+    if publication.doi:
+        citation += f" https://doi.org/{publication.doi}."
+    elif publication.external_url:
+        citation += f" {publication.external_url}."
+
+    return citation
+
+def _bibtex_escape(value):
+    return BIBTEX_SPECIAL.sub(r'\\\1', str(value))
+
+def bibtex_key(publication, authors):
+    """Citation key such as 'sharma2024urban'"""
+    surname = authors[0].split()[-1] if authors else 'anon'
+    words = re.findall(r'\w+', publication.title)
+    first_word = next((w for w in words if len(w) > 3), words[0] if words else 'untitled')
+    key = f"{surname}{_year(publication)}{first_word}".replace('n.d.', 'nd').lower()
+    # Keys must be plain ASCII
+    return unicodedata.normalize('NFKD', key).encode('ascii', 'ignore').decode()
+
+def format_bibtex(publication, authors):
+    """BibTeX entry for the publication"""
+    entry_type = BIBTEX_TYPES.get(publication.publication_type, 'misc')
+    if entry_type == 'article' and not publication.journal_name:
+        entry_type = 'misc'
+
+    fields = [
+        ('author', ' and '.join(_inverted(name) for name in authors)),
+        # Double braces keep the title's capitalization
+        ('title', f"{{{_bibtex_escape(publication.title)}}}"),
+        ('journal', publication.journal_name if entry_type == 'article' else ''),
+        ('institution', (publication.publisher or 'ShodhSrija Foundation')
+                        if entry_type == 'techreport' else ''),
+        ('publisher', publication.publisher if entry_type != 'techreport' else ''),
+        ('year', publication.publication_date.year if publication.publication_date else ''),
+        ('volume', publication.volume),
+        ('number', publication.issue),
+        ('pages', publication.pages.replace('-', '--') if publication.pages else ''),
+        ('doi', publication.doi),
+        ('isbn', publication.isbn),
+        ('issn', publication.issn),
+        ('eprint', publication.arxiv_id),
+        ('url', publication.external_url),
+    ]
+    lines = [f"@{entry_type}{{{bibtex_key(publication, authors)},"]
+    for name, value in fields:
+        if value:
+            value = value if name == 'title' else _bibtex_escape(value)
+            lines.append(f"  {name} = {{{value}}},")
+    lines.append("}")
+    return "\n".join(lines)
+
+FORMATTERS = {
+    'apa': format_apa,
+    'mla': format_mla,
+    'chicago': format_chicago,
+    'bibtex': format_bibtex,
+}
+
+def author_map(publication_ids):
+    """Ordered author names for many publications in a single query"""
+    from apps.research.models import AuthorContribution
+
+    authors = {pk: [] for pk in publication_ids}
+    rows = (AuthorContribution.objects.filter(publication_id__in=authors)
+            .order_by('publication_id', 'order')
+            .values_list('publication_id', 'author__first_name', 'author__last_name',
+                         'author__username'))
+    for publication_id, first_name, last_name, username in rows:
+        authors[publication_id].append(display_name(first_name, last_name, username))
+    return authors
+
+def _cache_key(pk):
+    return f"{CITATION_CACHE_PREFIX}:{pk}"
+
+def citation_entries(publications):
+    """Author names and every citation style for each publication, keyed by pk
+
+    Cached entries come back in one cache round trip; the misses are rendered
+    from a single author query and written back together.
+    """
+    publications = list(publications)
+    keys = {_cache_key(p.pk): p for p in publications}
+    cached = cache.get_many(list(keys))
+    entries = {keys[key].pk: entry for key, entry in cached.items()}
+
+    missing = [p for p in publications if p.pk not in entries]
+    if missing:
+        authors = author_map([p.pk for p in missing])
+        fresh = {}
+        for publication in missing:
+            names = authors[publication.pk]
+            entry = {'authors': names}
+            for style, formatter in FORMATTERS.items():
+                entry[style] = formatter(publication, names)
+            entries[publication.pk] = entry
+            fresh[_cache_key(publication.pk)] = entry
+        cache.set_many(fresh, timeout=CITATION_CACHE_TIMEOUT)
+
+    return entries
+
+def invalidate_citations(publication_ids):
+    """Drop cached citations after a publication or its authors change"""
+    cache.delete_many([_cache_key(pk) for pk in publication_ids])
@@ -0,0 +1,131 @@
+import uuid
+import numpy as np
+from scipy import sparse
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+
+from apps.core.locks import lock_until_commit
+from apps.research.models import AuthorContribution, CoauthorEdge
+
+COAUTHOR_WRITE_BATCH_SIZE = 5000
+GRAPH_VERSION_KEY = 'research:coauthor-graph:version'
+# Held while a build or update reads and rewrites edges
+GRAPH_LOCK = 'research:coauthor-graph'
+
+def graph_version():
+    """Token that moves on whenever any edge changes"""
+    version = cache.get(GRAPH_VERSION_KEY)
+    if version is None:
+        cache.add(GRAPH_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(GRAPH_VERSION_KEY)
+    return version
+
+def bump_graph_version():
+    cache.set(GRAPH_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+def coauthor_matrices(contributions):
+    """Author ids plus joint-publication counts and weights between them, from (publication, author) pairs
+
+    Both matrices are authors x authors and share one sparsity pattern;
+    the diagonal is empty.
+    """
+    publications = {}
+    rows, authors = [], []
+    for publication_id, author_id in contributions:
+        rows.append(publications.setdefault(publication_id, len(publications)))
+        authors.append(author_id)
+    author_ids, columns = np.unique(np.asarray(authors, dtype=np.int64), return_inverse=True)
+    incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.float64), (rows, columns)),
+                                  shape=(len(publications), len(author_ids)))
+
+    sizes = np.asarray(incidence.sum(axis=1)).ravel()
+    shares = np.divide(1, sizes - 1, out=np.zeros_like(sizes), where=sizes > 1)
+    counts = (incidence.T @ incidence).tocsr()
+    weights = (incidence.T @ sparse.diags(shares) @ incidence).tocsr()
+    for matrix in (counts, weights):
+        matrix.setdiag(0)
+        matrix.eliminate_zeros()
+    return author_ids, counts, weights
+
+def _write(author_ids, counts, weights, sources_in=None, targets_in=None):
+    """Insert edges, optionally only those from and to authors in boolean masks, returning how many"""
+    sources, targets = counts.nonzero()
+    selected = np.ones(len(sources), dtype=bool)
+    if sources_in is not None:
+        selected &= sources_in[sources]
+    if targets_in is not None:
+        selected &= targets_in[targets]
+    sources, targets = sources[selected], targets[selected]
+    # Indexing with empty arrays gives back a sparse matrix, not values
+    if not len(sources):
+        return 0
+    values = counts[sources, targets].A1.astype(np.int64).tolist()
+    shares = np.round(weights[sources, targets].A1, 4).tolist()
+    sources, targets = author_ids[sources].tolist(), author_ids[targets].tolist()
+
+    # A plain executemany, as for the related lists
+    sql = (f"INSERT INTO {CoauthorEdge._meta.db_table} (author_id, coauthor_id, publication_count, weight) "
+           f"VALUES (%s, %s, %s, %s)")
+    rows = list(zip(sources, targets, values, shares))
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), COAUTHOR_WRITE_BATCH_SIZE):
+            cursor.executemany(sql, rows[start:start + COAUTHOR_WRITE_BATCH_SIZE])
+    return len(rows)
+
+def published_contributions():
+    return (AuthorContribution.objects.filter(publication__status='published')
+            .order_by().values_list('publication_id', 'author_id'))
+
+def build_coauthor_graph():
+    """Recompute every co-authorship edge from published publications, returning (authors, links)"""
+    with transaction.atomic():
+        lock_until_commit(GRAPH_LOCK)
+        author_ids, counts, weights = coauthor_matrices(published_contributions())
+        CoauthorEdge.objects.all().delete()
+        written = _write(author_ids, counts, weights)
+    bump_graph_version()
+    return len(author_ids), written // 2
+
+def update_coauthor_graph(author_ids, publication_ids=()):
+    """Recompute the edges of authors whose publications changed, returning how many were stored
+
+    Everyone now on the given publications is included with the authors
+    named. Only publications one of them wrote are read; the edges between
+    everyone else are left as they are.
+    """
+    # Task arguments arrive as strings
+    author_ids = {int(pk) for pk in author_ids}
+    author_ids.update(AuthorContribution.objects.filter(publication__in=list(publication_ids))
+                      .values_list('author_id', flat=True))
+    changed = np.asarray(sorted(author_ids), dtype=np.int64)
+    if not len(changed):
+        return 0
+    with transaction.atomic():
+        # Runs queue here rather than insert the same (author, coauthor) pairs side by side
+        lock_until_commit(GRAPH_LOCK)
+        publications = published_contributions().filter(author__in=changed.tolist()).values('publication')
+        ids, counts, weights = coauthor_matrices(published_contributions().filter(publication__in=publications))
+        keep = np.isin(ids, changed)
+        CoauthorEdge.objects.filter(author__in=changed.tolist()).delete()
+        CoauthorEdge.objects.filter(coauthor__in=changed.tolist()).delete()
+        # The changed authors' own edges, then the way back to them from
+        # everyone else; the matrices are symmetric
+        written = _write(ids, counts, weights, sources_in=keep)
+        written += _write(ids, counts, weights, sources_in=~keep, targets_in=keep)
+    bump_graph_version()
+    return written
+
+def top_coauthors(author_id, limit):
+    """An author's edges with their users, most joint publications first"""
+    return list(CoauthorEdge.objects.filter(author_id=author_id).select_related('coauthor')
+                .only('publication_count', 'coauthor__first_name', 'coauthor__last_name', 'coauthor__username')
+                .order_by('-publication_count', 'coauthor__last_name', 'coauthor__first_name', 'coauthor_id')[:limit])
+
+def ego_network(author_id, limit):
+    """(neighbour edges, edges among the neighbours) for an author's strongest co-authors"""
+    edges = list(CoauthorEdge.objects.filter(author_id=author_id).order_by('-weight', 'coauthor_id')[:limit])
+    neighbours = [edge.coauthor_id for edge in edges]
+    between = list(CoauthorEdge.objects.filter(author__in=neighbours, coauthor__in=neighbours,
+                                               author__lt=F('coauthor')).order_by('author', 'coauthor'))
+    return edges, between
@@ -0,0 +1,150 @@
+import json
+import uuid
+from itertools import islice
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.core.models import UUIDTaggedItem
+from apps.research.citations import author_map, bibtex_key, format_bibtex
+from apps.research.models import Publication
+
+EXPORT_CHUNK_SIZE = 500
+CATALOG_VERSION_KEY = 'research:catalog:version'
+
+# Publication type -> RIS reference type
+RIS_TYPES = {
+    'research_paper': 'JOUR',
+    'white_paper': 'RPRT',
+    'report': 'RPRT',
+    'policy_brief': 'RPRT',
+    'case_study': 'CASE',
+    'working_paper': 'UNPB',
+}
+
+# Publication type -> CSL item type
+CSL_TYPES = {
+    'research_paper': 'article-journal',
+    'white_paper': 'report',
+    'report': 'report',
+    'policy_brief': 'report',
+    'case_study': 'article',
+    'working_paper': 'manuscript',
+}
+
+def catalog_version():
+    """Token and timestamp of the last change to anything an export contains"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, (uuid.uuid4().hex, timezone.now()), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, (uuid.uuid4().hex, timezone.now()), timeout=None)
+
+def tag_map(publication_ids):
+    """Tag names for many publications in a single query"""
+    # prefetch_related('tags') builds a filtered queryset per instance inside
+    # taggit, which dominates large exports; one flat query avoids that
+    tags = {pk: [] for pk in publication_ids}
+    rows = (UUIDTaggedItem.objects
+            .filter(content_type=ContentType.objects.get_for_model(Publication), object_id__in=tags)
+            .order_by('pk')
+            .values_list('object_id', 'tag__name'))
+    for object_id, name in rows:
+        tags[object_id].append(name)
+    return tags
+
+def _split_name(name):
+    """'First Middle Last' -> ('Last', 'First Middle')"""
+    parts = name.split()
+    if len(parts) < 2:
+        return name, ''
+    return parts[-1], ' '.join(parts[:-1])
+
+def _keywords(publication):
+    keywords = [k.strip() for k in publication.keywords.split(',') if k.strip()]
+    return keywords + [tag for tag in publication.tag_names if tag not in keywords]
+
+def render_bibtex(publication, authors):
+    return format_bibtex(publication, authors) + "\n\n"
+
+def render_ris(publication, authors):
+    lines = [('TY', RIS_TYPES.get(publication.publication_type, 'GEN'))]
+    lines += [('AU', ', '.join(filter(None, _split_name(name)))) for name in authors]
+    lines.append(('TI', publication.title))
+    if publication.journal_name:
+        lines.append(('JO', publication.journal_name))
+    if publication.publication_date:
+        lines.append(('PY', str(publication.publication_date.year)))
+        lines.append(('DA', publication.publication_date.strftime('%Y/%m/%d')))
+    lines += [('VL', publication.volume), ('IS', publication.issue)]
+    if publication.pages:
+        start, _, end = publication.pages.partition('-')
+        lines += [('SP', start.strip()), ('EP', end.strip('- '))]
+    lines += [
+        ('PB', publication.publisher),
+        ('DO', publication.doi),
+        ('SN', publication.isbn or publication.issn),
+        ('UR', publication.external_url),
+        ('AB', ' '.join(publication.abstract.split())),
+    ]
+    lines += [('KW', keyword) for keyword in _keywords(publication)]
+    lines.append(('ER', ''))
+    return ''.join(f"{tag}  - {value}\n" for tag, value in lines if value or tag == 'ER') + "\n"
+
+def csl_item(publication, authors):
+    item = {
+        'id': bibtex_key(publication, authors),
+        'type': CSL_TYPES.get(publication.publication_type, 'article'),
+        'title': publication.title,
+        'author': [dict(zip(('family', 'given'), _split_name(name))) for name in authors],
+        'container-title': publication.journal_name,
+        'publisher': publication.publisher,
+        'volume': publication.volume,
+        'issue': publication.issue,
+        'page': publication.pages,
+        'DOI': publication.doi,
+        'ISBN': publication.isbn,
+        'ISSN': publication.issn,
+        'URL': publication.external_url,
+        'abstract': publication.abstract,
+        'keyword': ', '.join(_keywords(publication)),
+    }
+    if publication.publication_date:
+        date = publication.publication_date
+        item['issued'] = {'date-parts': [[date.year, date.month, date.day]]}
+    return {key: value for key, value in item.items() if value}
+
+# Extension -> (content type, renderer, prefix, separator, suffix)
+EXPORT_FORMATS = {
+    'bib': ('application/x-bibtex', render_bibtex, '', '', ''),
+    'ris': ('application/x-research-info-systems', render_ris, '', '', ''),
+    'json': ('application/vnd.citationstyles.csl+json',
+             lambda publication, authors: json.dumps(csl_item(publication, authors)),
+             '[\n', ',\n', '\n]\n'),
+}
+
+def stream_export(queryset, fmt):
+    """Yield the export a chunk of publications at a time
+
+    Rows come from a server-side iterator, with one author query and one tag
+    query per chunk, so memory stays flat as the catalog grows.
+    """
+    _, render, prefix, separator, suffix = EXPORT_FORMATS[fmt]
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    yield prefix
+    first = True
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            break
+        pks = [publication.pk for publication in chunk]
+        authors, tags = author_map(pks), tag_map(pks)
+        for publication in chunk:
+            publication.tag_names = tags[publication.pk]
+        rendered = [render(publication, authors[publication.pk]) for publication in chunk]
+        yield ('' if first else separator) + separator.join(rendered)
+        first = False
+    yield suffix
@@ -0,0 +1,86 @@
+import hashlib
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast, ExtractYear
+
+from apps.core.models import UUIDTaggedItem
+from apps.research.exports import catalog_version
+from apps.research.models import Publication
+from apps.research.search import matching_publications
+
+# Query parameters that narrow the browser's result list, and so its counts
+FACET_FILTERS = ['search', 'category', 'publication_type', 'tag', 'year']
+FACET_CACHE_TIMEOUT = 60 * 60
+FACET_TAG_LIMIT = 50
+
+def normalize_filters(params):
+    """The filters that affect facet counts, spelled one way however the query string spells them"""
+    filters = {}
+    for name in FACET_FILTERS:
+        value = ' '.join(params.get(name, '').split())
+        if name == 'search':
+            value = value.lower()
+        if name == 'category' and value == 'All':
+            value = ''
+        if name == 'year' and not value.isdigit():
+            value = ''
+        if value:
+            filters[name] = value
+    return filters
+
+def facet_cache_key(filters):
+    # The catalog version moves on whenever a publication, its tags or a category change
+    token, _ = catalog_version()
+    query = '&'.join(f'{name}={value}' for name, value in sorted(filters.items()))
+    return f"research:facets:{token}:{hashlib.md5(query.encode()).hexdigest()}"
+
+def _grouped(queryset, facet, expression, counted='pk', distinct=False):
+    return (queryset.order_by()
+            .annotate(facet=Value(facet, output_field=CharField()),
+                      value=Cast(expression, output_field=CharField()))
+            .values('facet', 'value')
+            .annotate(count=Count(counted, distinct=distinct)))
+
+def facet_counts(queryset):
+    """Total and counts per publication type, category, year and tag, in a single query"""
+    # Tags are counted from the tag assignments, never joined back to the
+    # publications, so a tag filter cannot narrow the counts to that one tag
+    tagged = UUIDTaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Publication), object_id__in=queryset.values('pk'))
+    parts = [
+        _grouped(queryset, 'total', Value('')),
+        _grouped(queryset, 'publication_type', F('publication_type')),
+        _grouped(queryset.filter(category__isnull=False), 'category', F('category__name')),
+        _grouped(queryset.filter(publication_date__isnull=False), 'year', ExtractYear('publication_date')),
+        _grouped(tagged, 'tag', F('tag__name'), counted='object_id', distinct=True),
+    ]
+    rows = parts[0].union(*parts[1:], all=True)
+
+    type_labels = dict(Publication.PUBLICATION_TYPES)
+    facets = {'total': 0, 'publication_type': [], 'category': [], 'year': [], 'tag': []}
+    for row in rows:
+        if row['facet'] == 'total':
+            facets['total'] = row['count']
+        elif row['facet'] == 'year':
+            facets['year'].append({'value': int(row['value']), 'count': row['count']})
+        else:
+            label = type_labels.get(row['value'], row['value']) if row['facet'] == 'publication_type' else row['value']
+            facets[row['facet']].append({'value': row['value'], 'label': label, 'count': row['count']})
+
+    for name in ['publication_type', 'category', 'tag']:
+        facets[name].sort(key=lambda item: (-item['count'], item['label']))
+    facets['year'].sort(key=lambda item: -item['value'])
+    facets['tag'] = facets['tag'][:FACET_TAG_LIMIT]
+    return facets
+
+def publication_facets(queryset, filters):
+    """Cached facet counts for a queryset already narrowed by normalized filters, plus any search"""
+    key = facet_cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        if filters.get('search'):
+            queryset = matching_publications(queryset, filters['search'])
+        facets = facet_counts(queryset)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
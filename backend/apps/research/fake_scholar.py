@@ -0,0 +1,88 @@
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeScholarHandler(BaseHTTPRequestHandler):
+    """Answers SerpApi's google_scholar search.json with made-up, stable results"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requests.append(params)
+        if server.latency:
+            time.sleep(server.latency)
+        if server.failure_rate and random.random() < server.failure_rate:
+            self._reply(500, {'error': 'Simulated failure'})
+            return
+        if url.path.rstrip('/') != '/search.json' or params.get('engine') != 'google_scholar':
+            self._reply(404, {'error': 'Not found'})
+            return
+
+        start, count = int(params.get('start', 0)), int(params.get('num', 10))
+        results = server.results_for(params.get('q', ''), params.get('as_ylo'), params.get('as_yhi'))
+        self._reply(200, {'organic_results': results[start:start + count]})
+
+class FakeScholarServer(ThreadingHTTPServer):
+    """Local stand-in for SerpApi's Google Scholar engine with tunable latency and failures
+
+    Every query has results_per_query results, the same on every call, so
+    a second run over unchanged searches should find nothing new.
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, results_per_query=45):
+        super().__init__((host, port), FakeScholarHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.results_per_query = results_per_query
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def results_for(self, query, year_from=None, year_to=None):
+        low, high = int(year_from or 2000), int(year_to or 2024)
+        results = []
+        for number in range(self.results_per_query):
+            digest = hashlib.md5(f'{query}:{number}'.encode()).hexdigest()
+            year = low + int(digest[:4], 16) % (high - low + 1)
+            results.append({
+                'result_id': digest[:12],
+                'title': f'Work {number + 1} citing {query}',
+                'link': f'https://example.org/works/{digest[:12]}',
+                'publication_info': {'summary': f'A Author, B Author - Journal {digest[12]}, {year} - example.org'},
+            })
+        return results
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their read timeout hang up before the reply is written
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a background thread, e.g. inside a test"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,222 @@
+import logging
+import re
+from django.db import transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from apps.research.models import Publication, PublicationIdentifier
+
+logger = logging.getLogger(__name__)
+
+# Identifiers one resolve request may ask about
+RESOLVE_MAX_IDENTIFIERS = 1000
+# Publications returned per identifier; an ISSN can match a whole journal
+RESOLVE_MATCH_LIMIT = 20
+INDEX_BATCH_SIZE = 1000
+
+DOI_PREFIX = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+ARXIV_PREFIX = re.compile(r'^(?:https?://arxiv\.org/abs/|arxiv:\s*)', re.IGNORECASE)
+ARXIV_VERSION = re.compile(r'v\d+$')
+ISSN = re.compile(r'^\d{4}-?\d{3}[\dXx]$')
+
+# Patterns that tell a bare identifier's scheme apart
+DOI = re.compile(r'^10\.\d{4,9}/\S+$')
+ARXIV_ID = re.compile(r'^(?:\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?$', re.IGNORECASE)
+SCHEME_PREFIX = re.compile(r'^(isbn|issn)\s*:\s*', re.IGNORECASE)
+
+# Publication field each scheme is read from
+SCHEME_FIELDS = {'doi': 'doi', 'isbn': 'isbn', 'issn': 'issn', 'arxiv': 'arxiv_id'}
+# Schemes naming a single publication; an ISSN is shared by a journal's articles
+UNIQUE_SCHEMES = ['doi', 'isbn', 'arxiv']
+
+def normalize_doi(value):
+    return DOI_PREFIX.sub('', (value or '').strip()).lower()
+
+def normalize_isbn(value):
+    """ISBN as 13 digits, so the ISBN-10 and ISBN-13 forms of a book compare equal"""
+    digits = re.sub(r'[^0-9X]', '', (value or '').upper())
+    # Only an ISBN-10's check digit may be an X
+    if len(digits) == 10 and digits[:9].isdigit():
+        digits = '978' + digits[:9]
+    elif len(digits) != 13 or not digits.isdigit():
+        return ''
+    check = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits[:12]))
+    return digits[:12] + str((10 - check % 10) % 10)
+
+def normalize_issn(value):
+    """ISSN as '1234-567X', or '' when it is not eight characters with a valid check digit"""
+    value = re.sub(r'[\s\-]', '', (value or '').upper())
+    if not re.match(r'^\d{7}[\dX]$', value):
+        return ''
+    check = (11 - sum(int(d) * (8 - i) for i, d in enumerate(value[:7])) % 11) % 11
+    if value[7] != ('X' if check == 10 else str(check)):
+        return ''
+    return f'{value[:4]}-{value[4:]}'
+
+def normalize_arxiv_id(value):
+    value = ARXIV_PREFIX.sub('', (value or '').strip())
+    return ARXIV_VERSION.sub('', value).lower()
+
+NORMALIZERS = {'doi': normalize_doi, 'isbn': normalize_isbn, 'issn': normalize_issn, 'arxiv': normalize_arxiv_id}
+
+def isbn_is_valid(value):
+    """Whether an ISBN-10 or ISBN-13 carries the right check digit"""
+    digits = re.sub(r'[\s\-]', '', (value or '').upper())
+    if re.match(r'^\d{9}[\dX]$', digits):
+        total = sum((10 - i) * (10 if d == 'X' else int(d)) for i, d in enumerate(digits))
+        return total % 11 == 0
+    return bool(re.match(r'^\d{13}$', digits)) and normalize_isbn(digits) == digits
+
+def clean_identifier_fields(publication):
+    """Store a publication's identifiers in one spelling: no URL prefixes, spaces or stray hyphens"""
+    publication.doi = DOI_PREFIX.sub('', (publication.doi or '').strip())
+    publication.arxiv_id = ARXIV_PREFIX.sub('', (publication.arxiv_id or '').strip())
+    isbn = re.sub(r'[\s\-]', '', (publication.isbn or '').upper())
+    if isbn_is_valid(isbn):
+        publication.isbn = isbn
+    publication.issn = normalize_issn(publication.issn) or (publication.issn or '').strip()
+
+def publication_identifiers(publication):
+    """(scheme, normalized value) pairs a publication can be looked up by"""
+    keys = [(scheme, NORMALIZERS[scheme](getattr(publication, field))) for scheme, field in SCHEME_FIELDS.items()]
+    return [(scheme, value) for scheme, value in keys if value]
+
+def identifier_query(keys):
+    """Q matching the lookup rows for (scheme, normalized value) pairs, one IN list per scheme"""
+    by_scheme = {}
+    for scheme, value in keys:
+        by_scheme.setdefault(scheme, set()).add(value)
+    query = Q(pk__in=[])
+    for scheme, values in sorted(by_scheme.items()):
+        query |= Q(scheme=scheme, value__in=sorted(values))
+    return query
+
+def identifier_errors(publication):
+    """Field -> message for malformed identifiers and ones already held by another publication"""
+    errors = {}
+    if publication.isbn and not isbn_is_valid(publication.isbn):
+        errors['isbn'] = "Enter a valid ISBN-10 or ISBN-13."
+    if publication.issn and not normalize_issn(publication.issn):
+        errors['issn'] = "Enter a valid ISSN, e.g. 1234-5679."
+
+    keys = [(scheme, value) for scheme, value in publication_identifiers(publication) if scheme in UNIQUE_SCHEMES]
+    if not keys:
+        return errors
+    taken = (PublicationIdentifier.objects.filter(identifier_query(keys)).exclude(publication_id=publication.pk)
+             .values_list('scheme', 'publication__title'))
+    for scheme, title in taken:
+        errors.setdefault(SCHEME_FIELDS[scheme], f'"{title}" already has this identifier.')
+    return errors
+
+def index_identifiers(publications):
+    """Bring the lookup rows of many publications in line with their fields, returning conflicts
+
+    A DOI, ISBN or arXiv ID another publication already holds stays with
+    it; the (publication, scheme, value) triples left out are returned.
+    """
+    publication_ids = [p.pk for p in publications]
+    if not publication_ids:
+        return []
+    wanted = {(p.pk, scheme, value) for p in publications for scheme, value in publication_identifiers(p)}
+    current = {(publication_id, scheme, value): pk for pk, publication_id, scheme, value in
+               PublicationIdentifier.objects.filter(publication__in=publication_ids)
+               .values_list('pk', 'publication_id', 'scheme', 'value')}
+
+    stale = [pk for key, pk in current.items() if key not in wanted]
+    if stale:
+        PublicationIdentifier.objects.filter(pk__in=stale).delete()
+    order = {pk: position for position, pk in enumerate(publication_ids)}
+    # Inserted in the order given, so the first publication claiming an identifier gets it
+    missing = sorted(wanted - set(current), key=lambda key: order[key[0]])
+    if not missing:
+        return []
+    PublicationIdentifier.objects.bulk_create(
+        [PublicationIdentifier(publication_id=publication_id, scheme=scheme, value=value)
+         for publication_id, scheme, value in missing], ignore_conflicts=True)
+
+    claimed = set(PublicationIdentifier.objects.filter(publication__in=publication_ids)
+                  .values_list('publication_id', 'scheme', 'value'))
+    return [key for key in missing if key not in claimed]
+
+def rebuild_identifier_index(batch_size=INDEX_BATCH_SIZE):
+    """Re-derive every lookup row from the publications, returning (publications, conflicts)
+
+    The oldest publication keeps an identifier that several share.
+    """
+    publications = (Publication.objects.exclude(doi='', isbn='', issn='', arxiv_id='')
+                    .order_by('created_at', 'pk').only('pk', *SCHEME_FIELDS.values()))
+    ids = list(publications.values_list('pk', flat=True))
+    conflicts = []
+    # Readers see the old rows until the new ones are all in
+    with transaction.atomic():
+        PublicationIdentifier.objects.all().delete()
+        for start in range(0, len(ids), batch_size):
+            conflicts += index_identifiers(list(publications.filter(pk__in=ids[start:start + batch_size])))
+    return len(ids), conflicts
+
+def normalize_identifier_fields(sender, instance, raw=False, **kwargs):
+    if not raw:
+        clean_identifier_fields(instance)
+
+def update_identifiers_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the lookup rows of a saved publication current"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(SCHEME_FIELDS.values()):
+        return
+    for publication_id, scheme, value in index_identifiers([instance]):
+        logger.warning("Publication %s: %s %s already belongs to another publication",
+                       publication_id, scheme, value)
+
+def parse_identifier(item):
+    """(scheme, normalized value) for one requested identifier, or (scheme, '') when unrecognized
+
+    Items are either {'scheme': ..., 'value': ...} or bare strings, whose
+    scheme is told from a prefix such as 'doi:' or 'issn:' or from the
+    shape of the value.
+    """
+    if isinstance(item, dict):
+        scheme = str(item.get('scheme', '')).lower()
+        if scheme not in NORMALIZERS:
+            return scheme, ''
+        return scheme, NORMALIZERS[scheme](str(item.get('value', '')))
+
+    value = str(item).strip()
+    prefix = SCHEME_PREFIX.match(value)
+    if prefix:
+        scheme = prefix.group(1).lower()
+        return scheme, NORMALIZERS[scheme](value[prefix.end():])
+    if DOI_PREFIX.match(value) or DOI.match(value):
+        return 'doi', normalize_doi(value)
+    if ARXIV_PREFIX.match(value) or ARXIV_ID.match(value):
+        return 'arxiv', normalize_arxiv_id(value)
+    if ISSN.match(value):
+        return 'issn', normalize_issn(value)
+    if isbn_is_valid(value):
+        return 'isbn', normalize_isbn(value)
+    return None, ''
+
+def resolve_identifiers(keys, published_only=True):
+    """{(scheme, value): (match count, [publication, ...])} for the given keys, in one query
+
+    Each identifier keeps its RESOLVE_MATCH_LIMIT newest publications.
+    """
+    if not keys:
+        return {}
+    rows = PublicationIdentifier.objects.filter(identifier_query(keys))
+    if published_only:
+        rows = rows.filter(publication__status='published')
+    partition = [F('scheme'), F('value')]
+    rows = (rows.select_related('publication')
+            .only('scheme', 'value', 'publication__id', 'publication__title', 'publication__status',
+                  'publication__publication_type', 'publication__publication_date')
+            .annotate(match_rank=Window(RowNumber(), partition_by=partition,
+                                        order_by=[F('publication__publication_date').desc(nulls_last=True),
+                                                  F('publication_id').asc()]),
+                      match_count=Window(Count('pk'), partition_by=partition))
+            .filter(match_rank__lte=RESOLVE_MATCH_LIMIT)
+            .order_by('scheme', 'value', 'match_rank'))
+    found = {}
+    for row in rows:
+        found.setdefault((row.scheme, row.value), (row.match_count, []))[1].append(row.publication)
+    return found
@@ -0,0 +1,114 @@
+import datetime
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from apps.core.pagination import KeysetPagination
+from apps.research.models import Publication
+
+PAGE_SIZE = 20
+
+class Command(BaseCommand):
+    help = "Compare OFFSET paging with keyset paging of published publications at increasing depth"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per depth")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        start = datetime.date(2000, 1, 1)
+
+        # Everything below is rolled back, leaving the database as it was
+        with transaction.atomic():
+            self.stdout.write(f"Inserting {options['rows']:,} publications on {connection.vendor}")
+            for offset in range(0, options['rows'], options['batch_size']):
+                count = min(options['batch_size'], options['rows'] - offset)
+                Publication.objects.bulk_create([
+                    Publication(
+                        title=f'Paper {offset + i}',
+                        abstract='',
+                        publication_type='research_paper',
+                        status='published' if rng.random() < 0.9 else 'draft',
+                        # Few distinct dates, so the tiebreak columns matter, and some undated rows
+                        publication_date=(start + datetime.timedelta(days=rng.randrange(3_000))
+                                          if rng.random() < 0.95 else None),
+                    ) for i in range(count)
+                ])
+
+            queryset = Publication.objects.filter(status='published')
+            total = queryset.count()
+            # Undated rows last, where KeysetPagination puts them on every backend
+            ordering = [F('publication_date').desc(nulls_last=True), F('created_at').desc(), F('id').desc()]
+            self.check_walk(queryset, ordering, total)
+
+            depths = [0, 100, 1_000, 10_000, 100_000]
+            for depth in [d for d in depths if d < total]:
+                offset_ms = self.time(options['repeat'], lambda: self.offset_page(queryset, ordering, depth))
+                cursor = self.cursor_at(queryset, ordering, depth)
+                keyset_ms = self.time(options['repeat'], lambda: self.keyset_page(queryset, cursor))
+                self.stdout.write(f"row {depth:>7,}: OFFSET + COUNT {offset_ms:8.2f} ms   "
+                                  f"keyset {keyset_ms:6.2f} ms   ({offset_ms / keyset_ms:.1f}x)")
+
+            transaction.set_rollback(True)
+
+    def request(self, cursor=None, page_size=PAGE_SIZE):
+        params = {'page_size': page_size}
+        if cursor:
+            params['cursor'] = cursor
+        return Request(RequestFactory().get('/api/research/publications/', params))
+
+    def offset_page(self, queryset, ordering, depth):
+        """What PageNumberPagination does: a COUNT(*) and an OFFSET query"""
+        queryset.count()
+        return list(queryset.order_by(*ordering)[depth:depth + PAGE_SIZE])
+
+    def keyset_page(self, queryset, cursor):
+        return KeysetPagination().paginate_queryset(queryset, self.request(cursor))
+
+    def cursor_at(self, queryset, ordering, depth):
+        """The cursor a client would hold after reading `depth` rows"""
+        if depth == 0:
+            return None
+        row = queryset.order_by(*ordering)[depth - 1]
+        paginator = KeysetPagination()
+        paginator.ordering = paginator.get_ordering(queryset, None)
+        return paginator.encode_cursor(paginator.row_values(row))
+
+    def check_walk(self, queryset, ordering, total):
+        """Page forwards through everything, then back, and compare with the OFFSET order"""
+        expected = list(queryset.order_by(*ordering).values_list('pk', flat=True))
+        seen, cursor = [], None
+        started = time.perf_counter()
+        while True:
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, self.request(cursor, page_size=100))
+            seen += [row.pk for row in page]
+            cursor = paginator.next_cursor()
+            if not cursor:
+                break
+        if seen != expected:
+            raise CommandError("Keyset pages do not match the OFFSET ordering")
+        self.stdout.write(f"Walked all {total:,} published rows in {time.perf_counter() - started:.1f}s "
+                          f"in the same order as OFFSET paging")
+
+        # One step back from the last page returns the page before it
+        paginator.paginate_queryset(queryset, self.request(paginator.previous_cursor(), page_size=100))
+        previous = [row.pk for row in paginator.page]
+        if previous != expected[-len(page) - 100:-len(page)]:
+            raise CommandError("The previous link does not return the preceding page")
+
+    def time(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
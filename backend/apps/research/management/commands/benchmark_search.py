@@ -0,0 +1,87 @@
+import itertools
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.research.models import Publication
+from apps.research.search import ensure_search_index, rebuild_search_index, search_publications
+
+SYLLABLES = ['ka', 'ri', 'to', 'me', 'shu', 'dra', 'vin', 'lo', 'pe', 'sa', 'na', 'gur', 'ti', 'bo', 'zel']
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+class Command(BaseCommand):
+    help = "Compare icontains filtering with the full-text index over synthetic publications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per query")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = make_vocabulary(20_000, rng)
+        # Zipf-like frequencies, so queries hit common, middling and rare terms
+        weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+        queries = [
+            vocabulary[5],
+            vocabulary[500],
+            vocabulary[15_000],
+            f'{vocabulary[50]} {vocabulary[2_000]}',
+            vocabulary[300][:-1],
+        ]
+
+        ensure_search_index()
+        # Everything below is rolled back, leaving the database as it was
+        with transaction.atomic():
+            self.stdout.write(f"Inserting {options['rows']:,} publications on {connection.vendor}")
+            started = time.perf_counter()
+            for offset in range(0, options['rows'], options['batch_size']):
+                count = min(options['batch_size'], options['rows'] - offset)
+                Publication.objects.bulk_create([
+                    Publication(
+                        title=' '.join(rng.choices(vocabulary, cum_weights=weights, k=8)).capitalize(),
+                        keywords=', '.join(rng.choices(vocabulary, cum_weights=weights, k=4)),
+                        abstract=' '.join(rng.choices(vocabulary, cum_weights=weights, k=120)),
+                        publication_type='research_paper',
+                        status='published',
+                    ) for _ in range(count)
+                ])
+            self.stdout.write(f"Inserted in {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            rebuild_search_index()
+            self.stdout.write(f"Index built in {time.perf_counter() - started:.1f}s")
+
+            queryset = Publication.objects.filter(status='published')
+            for query in queries:
+                scan = self.time(options['repeat'], lambda: self.icontains(queryset, query))
+                indexed = self.time(options['repeat'], lambda: search_publications(queryset, query, limit=20))
+                self.stdout.write(f"{query!r:28} icontains {scan * 1000:8.1f} ms   "
+                                  f"full-text {indexed * 1000:7.1f} ms   ({scan / indexed:.0f}x)")
+
+            transaction.set_rollback(True)
+
+    def icontains(self, queryset, query):
+        """What DRF's SearchFilter did: AND of per-term OR'd icontains, plus the page count"""
+        condition = Q()
+        for term in query.split():
+            condition &= Q(title__icontains=term) | Q(abstract__icontains=term) | Q(keywords__icontains=term)
+        matches = queryset.filter(condition)
+        return matches.count(), list(matches[:20])
+
+    def time(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+
+from apps.research.related import RELATED_COUNT, RELATED_MIN_SCORE, build_related_index, update_related_index
+
+class Command(BaseCommand):
+    help = "Precompute each published publication's related list from TF-IDF similarity"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=RELATED_COUNT, help="Related publications kept per publication")
+        parser.add_argument('--min-score', type=float, default=RELATED_MIN_SCORE,
+                            help="Cosine similarity below which a publication is not related")
+        parser.add_argument('--publication', action='append', default=[], dest='publications',
+                            help="Only refresh the lists this publication affects (repeatable)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['publications']:
+            refreshed = update_related_index(options['publications'], options['top_k'], options['min_score'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Refreshed {refreshed:,} related lists in {time.perf_counter() - started:.1f}s"))
+        else:
+            publications, entries = build_related_index(options['top_k'], options['min_score'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {entries:,} related entries for {publications:,} publications "
+                f"in {time.perf_counter() - started:.1f}s"))
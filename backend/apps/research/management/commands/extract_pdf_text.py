@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.research.models import Publication
+from apps.research.pdftext import extract_pdf_texts
+
+class Command(BaseCommand):
+    help = "Extract text from publication PDFs into the search index, skipping files that have not changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.PDF_TEXT_WORKERS,
+                            help="Extraction processes; 0 extracts in this process")
+        parser.add_argument('--publication', action='append', default=[], dest='publications',
+                            help="Only this publication (repeatable)")
+        parser.add_argument('--force', action='store_true', help="Extract again even when the PDF is unchanged")
+
+    def handle(self, *args, **options):
+        queryset = Publication.objects.all()
+        if options['publications']:
+            queryset = queryset.filter(pk__in=options['publications'])
+
+        started = time.perf_counter()
+        totals = extract_pdf_texts(
+            queryset,
+            workers=options['workers'],
+            force=options['force'],
+            progress=lambda totals: self.stderr.write(f"{totals['publications']:,} PDFs...", ending='\r'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['publications']:,} PDFs in {time.perf_counter() - started:.1f}s: "
+            f"{totals['extracted']:,} extracted, {totals['unchanged']:,} unchanged, {totals['failed']:,} failed"))
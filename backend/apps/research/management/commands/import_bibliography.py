@@ -0,0 +1,84 @@
+import csv
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.research.bibliography import (
+    IMPORT_BATCH_SIZE, PARSERS, REPORT_HEADER, detect_format, import_bibliography,
+)
+from apps.research.models import Publication, ResearchCategory
+
+class Command(BaseCommand):
+    help = "Import publications and their authors from BibTeX or RIS files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help=".bib or .ris files, or - for stdin")
+        parser.add_argument('--format', choices=sorted(PARSERS),
+                            help="Parse every file as this format instead of going by extension")
+        parser.add_argument('--status', default='published',
+                            choices=[value for value, _ in Publication.STATUS_CHOICES])
+        parser.add_argument('--category', help="Research category name for every imported publication")
+        parser.add_argument('--tag', action='append', default=[], dest='tags',
+                            help="Tag every imported publication (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--create-authors', action='store_true',
+                            help="Create inactive users for authors without a matching user instead of leaving them out")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would be imported or skipped without writing anything")
+        parser.add_argument('--report', help="Write a CSV line per entry; a dry run prints it to stdout otherwise")
+
+    def handle(self, *args, **options):
+        category = None
+        if options['category']:
+            category = ResearchCategory.objects.filter(name=options['category']).first()
+            if category is None:
+                raise CommandError(f"Research category '{options['category']}' does not exist")
+
+        parsers = []
+        for path in options['files']:
+            fmt = options['format'] or detect_format(path)
+            if fmt is None:
+                raise CommandError(f"Cannot tell the format of {path}; pass --format")
+            parsers.append((path, PARSERS[fmt]))
+
+        report_file = open(options['report'], 'w', newline='') if options['report'] else None
+        writer = None
+        if report_file or options['dry_run']:
+            writer = csv.writer(report_file or self.stdout)
+            writer.writerow(REPORT_HEADER)
+
+        started = time.perf_counter()
+        try:
+            for path, parse in parsers:
+                source = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', errors='replace')
+                try:
+                    totals = import_bibliography(
+                        parse(source),
+                        status=options['status'],
+                        category=category,
+                        tags=options['tags'],
+                        batch_size=options['batch_size'],
+                        dry_run=options['dry_run'],
+                        create_authors=options['create_authors'],
+                        report=writer.writerow if writer else None,
+                        progress=lambda totals: self.stderr.write(f"{totals['entries']:,} entries...", ending='\r'),
+                    )
+                finally:
+                    if source is not sys.stdin:
+                        source.close()
+                self._summary(path, totals, options)
+        finally:
+            if report_file:
+                report_file.close()
+
+        self.stderr.write(f"Finished in {time.perf_counter() - started:.1f}s")
+        if options['report']:
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['report']}"))
+
+    def _summary(self, path, totals, options):
+        verb = "would be imported" if options['dry_run'] else "imported"
+        authors = "unmatched" if not options['create_authors'] else (
+            "new authors" if options['dry_run'] else "authors created")
+        self.stderr.write(f"{path}: {totals['entries']:,} entries, {totals['created']:,} {verb}, "
+                          f"{totals['duplicates']:,} already in the catalog or repeated, "
+                          f"{totals['invalid']:,} invalid, {totals['new_authors']:,} {authors}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.research.bibliography import IMPORT_BATCH_SIZE, rebuild_author_surnames
+
+class Command(BaseCommand):
+    help = "Refill the folded surnames bibliography imports match author names against"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Users per batch")
+        parser.add_argument('--missing-only', action='store_true', help="Only fold users not indexed yet")
+
+    def handle(self, *args, **options):
+        count = rebuild_author_surnames(options['batch_size'], missing_only=options['missing_only'])
+        self.stdout.write(self.style.SUCCESS(f"Folded the surnames of {count:,} users"))
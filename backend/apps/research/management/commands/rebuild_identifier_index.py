@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.research.identifiers import INDEX_BATCH_SIZE, rebuild_identifier_index
+
+class Command(BaseCommand):
+    help = "Rebuild the DOI, ISBN, ISSN and arXiv ID lookup table from the publications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=INDEX_BATCH_SIZE, help="Publications per batch")
+
+    def handle(self, *args, **options):
+        count, conflicts = rebuild_identifier_index(options['batch_size'])
+        for publication_id, scheme, value in conflicts:
+            self.stdout.write(self.style.WARNING(
+                f"Publication {publication_id}: {scheme} {value} already belongs to an older publication"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed the identifiers of {count:,} publications; {len(conflicts):,} duplicates left out"))
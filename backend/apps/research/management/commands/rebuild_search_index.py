@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.research.search import rebuild_search_index
+
+class Command(BaseCommand):
+    help = "Rebuild the publication full-text search index from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true',
+                            help="On PostgreSQL, only fill publications that have no search vector yet")
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(missing_only=options['missing_only'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count:,} publications"))
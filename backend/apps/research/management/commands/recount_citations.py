@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.research.citation_counts import RECOUNT_BATCH_SIZE, recount_citations
+
+class Command(BaseCommand):
+    help = "Recompute Publication.citation_count from verified Citation rows to fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RECOUNT_BATCH_SIZE, help="Publications per query")
+
+    def handle(self, *args, **options):
+        corrected = recount_citations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Citation counts recounted; {corrected:,} publications corrected"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.research.author_stats import STATS_BATCH_SIZE, refresh_author_stats
+
+class Command(BaseCommand):
+    help = "Recompute every author's publication and citation totals, h-index and i10-index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=STATS_BATCH_SIZE, help="Authors per query")
+
+    def handle(self, *args, **options):
+        stored = refresh_author_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Stored stats for {stored:,} authors"))
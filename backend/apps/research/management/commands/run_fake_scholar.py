@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.research.fake_scholar import FakeScholarServer
+
+class Command(BaseCommand):
+    help = "Run a local fake Google Scholar (SerpApi) API; point SCHOLAR_BASE_URL at it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help="Seconds to wait before every response")
+        parser.add_argument('--failure-rate', type=float, default=0.0,
+                            help="Fraction of requests answered with HTTP 500")
+        parser.add_argument('--results', type=int, default=45, help="Results every query has")
+
+    def handle(self, *args, **options):
+        server = FakeScholarServer(port=options['port'], latency=options['latency'],
+                                   failure_rate=options['failure_rate'], results_per_query=options['results'])
+        self.stdout.write(f"Fake Google Scholar listening on {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
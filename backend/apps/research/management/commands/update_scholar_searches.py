@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+
+from apps.research.scholar import update_scholar_searches
+
+class Command(BaseCommand):
+    help = "Run the due auto-updating Google Scholar searches and record the citations they find"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Searches to run (default SCHOLAR_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        totals = update_scholar_searches(options['limit'])
+        if totals is None:
+            self.stdout.write(self.style.WARNING("Another update is already running"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {totals['searches']:,} searches with {totals['fetched']:,} fetches in "
+            f"{time.perf_counter() - started:.1f}s: {totals['citations']:,} new citations, "
+            f"{totals['failed']:,} searches failed"))
@@ -1,10 +1,21 @@
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from cloudinary.models import CloudinaryField
-from apps.core.models import TimeStampedModel
+from apps.core.models import KeysetIndex, TimeStampedModel, UUIDTaggedItem
 from taggit.managers import TaggableManager
 from django.urls import reverse
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+
+class SearchVectorIndex(GinIndex):
+    """GIN index on PostgreSQL; other backends never fill the column and get a plain index"""
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return models.Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
 
 class ResearchCategory(TimeStampedModel):
     """Categories for research and publications"""
@@ -72,20 +83,36 @@ class Publication(TimeStampedModel):
 
     # Categorization
     category = models.ForeignKey(ResearchCategory, on_delete=models.SET_NULL, null=True, blank=True)
-    tags = TaggableManager(blank=True)
+    tags = TaggableManager(blank=True, through=UUIDTaggedItem)
     keywords = models.CharField(max_length=500, blank=True, help_text="Comma-separated keywords")
 
     # Metrics
     download_count = models.PositiveIntegerField(default=0)
     view_count = models.PositiveIntegerField(default=0)
+    # Verified citations, kept in step with Citation rows by apps.research.citation_counts
     citation_count = models.PositiveIntegerField(default=0)
 
+    # Weighted full-text vector, maintained by apps.research.search (Postgres only)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # SEO and Display
     featured = models.BooleanField(default=False)
     cover_image = CloudinaryField('publication_covers', null=True, blank=True)
 
     class Meta:
-        ordering = ['-publication_date', '-created_at']
+        # Undated publications last, as KeysetPagination pages them
+        ordering = [models.F('publication_date').desc(nulls_last=True), '-created_at']
+        # Keyset pagination of the public list walks the first index, or the
+        # last for most-cited order; facet counts group published rows
+        # through the covering ones in between
+        indexes = [
+            KeysetIndex(fields=['status', '-publication_date', '-created_at', '-id'],
+                        name='research_pub_keyset_idx'),
+            models.Index(fields=['status', 'publication_type'], name='research_pub_type_facet_idx'),
+            models.Index(fields=['status', 'category'], name='research_pub_cat_facet_idx'),
+            models.Index(fields=['status', '-citation_count', '-id'], name='research_pub_cited_idx'),
+            SearchVectorIndex(fields=['search_vector'], name='research_pub_search_gin'),
+        ]
         verbose_name = "Publication"
         verbose_name_plural = "Publications"
 
@@ -95,68 +122,29 @@ class Publication(TimeStampedModel):
     def get_absolute_url(self):
         return reverse('publication-detail', kwargs={'pk': self.pk})
 
+    def clean(self):
+        """Reject malformed identifiers and ones another publication already has"""
+        from apps.research.identifiers import identifier_errors
+        errors = identifier_errors(self)
+        if errors:
+            raise ValidationError(errors)
+
     @property
     def author_names(self):
-        return [contrib.author.get_full_name() or contrib.author.username 
-                for contrib in self.authorcontribution_set.all().order_by('order')]
+        from apps.research.citations import author_map
+        return author_map([self.pk])[self.pk]
 
     @property
     def citation_apa(self):
         """Generate APA citation"""
-        authors = ", ".join(self.author_names[:3])  # First 3 authors
-        if len(self.author_names) > 3:
-            authors += " et al."
-
-        citation = f"{authors} ({self.publication_date.year if self.publication_date else 'n.d.'}). {self.title}."
-
-        if self.journal_name:
-            citation += f" {self.journal_name}"
-            if self.volume:
-                citation += f", {self.volume}"
-                if self.issue:
-                    citation += f"({self.issue})"
-            if self.pages:
-                citation += f", {self.pages}"
-
-        citation += "."
-
-        if self.doi:
-            citation += f" https://doi.org/{self.doi}"
-        elif self.external_url:
-            citation += f" {self.external_url}"
-
-        return citation
+        from apps.research.citations import citation_entries
+        return citation_entries([self])[self.pk]['apa']
 
     @property
     def citation_mla(self):
         """Generate MLA citation"""
-        if not self.author_names:
-            return f'"{self.title}." {self.publication_date.year if self.publication_date else "n.d."}.'
-
-        first_author = self.author_names[0]
-        # Reverse name for MLA (Last, First)
-        if " " in first_author:
-            names = first_author.split()
-            first_author = f"{names[-1]}, {' '.join(names[:-1])}"
-
-        citation = f'{first_author}. "{self.title}."'
-
-        if self.journal_name:
-            citation += f" {self.journal_name}"
-            if self.volume:
-                citation += f", vol. {self.volume}"
-                if self.issue:
-                    citation += f", no. {self.issue}"
-            citation += f", {self.publication_date.year if self.publication_date else 'n.d.'}"
-            if self.pages:
-                citation += f", pp. {self.pages}"
-
-        citation += "."
-
-        if self.external_url:
-            citation += f" {self.external_url}"
-
-        return citation
+        from apps.research.citations import citation_entries
+        return citation_entries([self])[self.pk]['mla']
 
 class AuthorContribution(TimeStampedModel):
     """Through model for author contributions"""
@@ -183,6 +171,118 @@ class AuthorContribution(TimeStampedModel):
     def __str__(self):
         return f"{self.author.get_full_name() or self.author.username} - {self.publication.title}"
 
+class RelatedPublication(models.Model):
+    """One precomputed neighbour in a publication's related list, built by apps.research.related"""
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['publication', 'rank']
+        unique_together = ['publication', 'rank']
+        verbose_name = "Related Publication"
+        verbose_name_plural = "Related Publications"
+
+    def __str__(self):
+        return f"{self.publication_id} #{self.rank}: {self.related_id}"
+
+class PublicationText(models.Model):
+    """Text extracted from a publication's PDF for the search index, kept by apps.research.pdftext"""
+    publication = models.OneToOneField(Publication, on_delete=models.CASCADE, primary_key=True,
+                                       related_name='extracted_text')
+    source = models.CharField(max_length=255, help_text="Stored pdf_file value the text was extracted from")
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the PDF")
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Publication Text"
+        verbose_name_plural = "Publication Texts"
+
+    def __str__(self):
+        return f"Text of {self.publication_id}"
+
+class PublicationIdentifier(models.Model):
+    """One normalized identifier of a publication, kept in step by apps.research.identifiers"""
+    SCHEME_CHOICES = [
+        ('doi', 'DOI'),
+        ('isbn', 'ISBN'),
+        ('issn', 'ISSN'),
+        ('arxiv', 'arXiv ID'),
+    ]
+
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='identifiers')
+    scheme = models.CharField(max_length=5, choices=SCHEME_CHOICES)
+    value = models.CharField(max_length=200)
+
+    class Meta:
+        # A DOI, ISBN or arXiv ID names one publication; an ISSN names the
+        # journal, which every article in it shares
+        constraints = [
+            models.UniqueConstraint(fields=['scheme', 'value'], condition=~models.Q(scheme='issn'),
+                                    name='research_identifier_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['scheme', 'value'], name='research_identifier_idx'),
+        ]
+        verbose_name = "Publication Identifier"
+        verbose_name_plural = "Publication Identifiers"
+
+    def __str__(self):
+        return f"{self.scheme}:{self.value}"
+
+class DaysBetween(models.Func):
+    """Whole days from the first date to the second, as an integer"""
+    # Subtracting dates gives days on PostgreSQL and Oracle
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+    output_field = models.IntegerField()
+
+    def __init__(self, start, end, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='CAST(julianday(%(expressions)s) AS INTEGER)',
+                           arg_joiner=') - julianday(', **extra_context)
+
+class ResearchProjectQuerySet(models.QuerySet):
+    def with_progress(self, today=None):
+        """Annotate `progress` and `ongoing`, the database's completion_percentage and is_ongoing"""
+        from django.utils import timezone
+        today = models.Value(today or timezone.now().date(), output_field=models.DateField())
+        progress = models.Case(
+            models.When(models.Q(start_date__isnull=True) | models.Q(expected_completion__isnull=True),
+                        then=0),
+            models.When(start_date__gt=today, then=0),
+            models.When(expected_completion__lte=today, then=100),
+            default=(DaysBetween('start_date', today) * 100 / DaysBetween('start_date', 'expected_completion')),
+            output_field=models.IntegerField(),
+        )
+        ongoing = models.ExpressionWrapper(models.Q(status__in=ResearchProject.ONGOING_STATUSES),
+                                           output_field=models.BooleanField())
+        return self.annotate(progress=progress, ongoing=ongoing)
+
+    def progress_at_least(self, percentage, today=None):
+        """Projects at least `percentage` complete, annotated as by with_progress
+
+        Any progress needs a start on or before today and an expected
+        completion, and full progress an expected completion already
+        passed; those date ranges come from research_proj_progress_idx
+        before the percentage itself is worked out.
+        """
+        from django.utils import timezone
+        today = today or timezone.now().date()
+        queryset = self.with_progress(today)
+        if percentage <= 0:
+            return queryset
+        queryset = queryset.filter(start_date__lte=today, expected_completion__isnull=False)
+        if percentage >= 100:
+            queryset = queryset.filter(expected_completion__lte=today)
+        return queryset.filter(progress__gte=percentage)
+
 class ResearchProject(TimeStampedModel):
     """Research projects and ongoing work"""
     STATUS_CHOICES = [
@@ -192,6 +292,7 @@ class ResearchProject(TimeStampedModel):
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
     ]
+    ONGOING_STATUSES = ['planning', 'active']
 
     PRIORITY_CHOICES = [
         ('low', 'Low'),
@@ -222,7 +323,7 @@ class ResearchProject(TimeStampedModel):
 
     # Categorization
     category = models.ForeignKey(ResearchCategory, on_delete=models.SET_NULL, null=True, blank=True)
-    tags = TaggableManager(blank=True)
+    tags = TaggableManager(blank=True, through=UUIDTaggedItem)
 
     # Outcomes
     publications = models.ManyToManyField(Publication, blank=True, related_name='projects')
@@ -233,8 +334,15 @@ class ResearchProject(TimeStampedModel):
     proposal_document = CloudinaryField('project_proposals', null=True, blank=True)
     final_report = CloudinaryField('project_reports', null=True, blank=True)
 
+    objects = ResearchProjectQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-start_date', '-created_at']
+        ordering = [models.F('start_date').desc(nulls_last=True), '-created_at']
+        indexes = [
+            KeysetIndex(fields=['-start_date', '-created_at', '-id'], name='research_proj_keyset_idx'),
+            models.Index(fields=['start_date', 'expected_completion'], name='research_proj_progress_idx'),
+            KeysetIndex(fields=['status', '-start_date', '-created_at', '-id'], name='research_proj_status_idx'),
+        ]
         verbose_name = "Research Project"
         verbose_name_plural = "Research Projects"
 
@@ -243,7 +351,7 @@ class ResearchProject(TimeStampedModel):
 
     @property
     def is_ongoing(self):
-        return self.status in ['planning', 'active']
+        return self.status in self.ONGOING_STATUSES
 
     @property
     def completion_percentage(self):
@@ -261,7 +369,8 @@ class ResearchProject(TimeStampedModel):
         else:
             total_days = (self.expected_completion - self.start_date).days
             elapsed_days = (today - self.start_date).days
-            return min(100, int((elapsed_days / total_days) * 100))
+            # Integer arithmetic, as in ResearchProjectQuerySet.with_progress
+            return elapsed_days * 100 // total_days
 
 class GoogleScholarSearch(TimeStampedModel):
     """Saved Google Scholar searches for research integration"""
@@ -276,8 +385,16 @@ class GoogleScholarSearch(TimeStampedModel):
     year_from = models.IntegerField(null=True, blank=True)
     year_to = models.IntegerField(null=True, blank=True)
 
+    # Works found by an auto-updating search are recorded as citations of this publication
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE, null=True, blank=True,
+                                    related_name='scholar_searches')
+
     class Meta:
         ordering = ['-last_searched']
+        # The auto-update worker takes due searches, least recently searched first
+        indexes = [
+            models.Index(fields=['auto_update', 'is_active', 'last_searched'], name='research_scholar_due_idx'),
+        ]
         verbose_name = "Google Scholar Search"
         verbose_name_plural = "Google Scholar Searches"
 
@@ -303,3 +420,49 @@ class Citation(TimeStampedModel):
 
     def __str__(self):
         return f"Citation of '{self.publication.title}' by {self.citing_authors}"
+
+class AuthorSurname(models.Model):
+    """A user's surname folded for case and accents, so imported author names find their accounts"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='folded_surname')
+    surname = models.CharField(max_length=150, db_index=True)
+
+    def __str__(self):
+        return self.surname
+
+class AuthorStats(models.Model):
+    """Bibliometrics over an author's published publications, kept by apps.research.author_stats"""
+    author = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='research_stats')
+    publication_count = models.PositiveIntegerField(default=0)
+    # Sum of Publication.citation_count, so verified citations only
+    citation_count = models.PositiveIntegerField(default=0)
+    h_index = models.PositiveIntegerField(default=0)
+    i10_index = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Author Stats"
+        verbose_name_plural = "Author Stats"
+
+    def __str__(self):
+        return f"Stats of {self.author_id}"
+
+class CoauthorEdge(models.Model):
+    """One direction of a weighted co-authorship link, built by apps.research.coauthors"""
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coauthor_edges')
+    coauthor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    publication_count = models.PositiveIntegerField(help_text="Published publications written together")
+    # Newman's collaboration weight: each joint publication adds 1 / (its authors - 1)
+    weight = models.FloatField()
+
+    class Meta:
+        # Stored in both directions, so an ego network is one index range
+        unique_together = ['author', 'coauthor']
+        indexes = [
+            models.Index(fields=['author', '-weight'], name='research_coauthor_ego_idx'),
+            models.Index(fields=['author', '-publication_count'], name='research_coauthor_count_idx'),
+        ]
+        verbose_name = "Co-author Edge"
+        verbose_name_plural = "Co-author Edges"
+
+    def __str__(self):
+        return f"{self.author_id} - {self.coauthor_id}"
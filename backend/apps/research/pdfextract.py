@@ -0,0 +1,35 @@
+import io
+import re
+import unicodedata
+from pypdf import PdfReader
+
+# Worker processes import this module fresh, so it must not touch Django
+
+# Extracted text is cut here; the search index gains little from the rest of a book
+PDF_TEXT_MAX_CHARS = 1_000_000
+
+HYPHENATED = re.compile(r'(\w)-\s*\n\s*(\w)')
+CONTROL = re.compile(r'[\x00-\x08\x0b-\x1f\x7f]')
+WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text):
+    """One line of plain text: NFKC, line-break hyphenation undone, whitespace collapsed"""
+    text = unicodedata.normalize('NFKC', text)
+    text = HYPHENATED.sub(r'\1\2', text)
+    text = CONTROL.sub(' ', text)
+    return WHITESPACE.sub(' ', text).strip()[:PDF_TEXT_MAX_CHARS]
+
+def extract_text(data):
+    """(normalized text, page count) of a PDF; runs in a worker process"""
+    reader = PdfReader(io.BytesIO(data))
+    if reader.is_encrypted:
+        # Many PDFs are encrypted with an empty password just to set permissions
+        reader.decrypt('')
+    pages, length = [], 0
+    for page in reader.pages:
+        text = page.extract_text() or ''
+        pages.append(text)
+        length += len(text)
+        if length > PDF_TEXT_MAX_CHARS:
+            break
+    return normalize_text('\n'.join(pages)), len(reader.pages)
@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent import futures
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import requests
+from django.conf import settings
+
+from apps.research import search
+from apps.research.models import Publication, PublicationText
+from apps.research.pdfextract import extract_text
+
+logger = logging.getLogger(__name__)
+
+# Larger files are skipped rather than held in memory
+PDF_MAX_BYTES = 50 * 1024 * 1024
+PDF_FETCH_TIMEOUT = 60
+# Worker processes are replaced after this many PDFs, returning what pypdf leaked
+PDF_TASKS_PER_CHILD = 50
+# Seconds a worker may spend on one PDF before it is killed
+PDF_EXTRACT_TIMEOUT = 120
+PDF_TEXT_WRITE_BATCH_SIZE = 20
+PDF_READ_CHUNK_SIZE = 500
+
+class PdfTooLarge(Exception):
+    pass
+
+class ExtractedPdf:
+    """Outcome for one publication: new text, an unchanged file, or an error"""
+
+    def __init__(self, publication, content_hash=None, text='', page_count=0, error='', unchanged=False):
+        self.publication = publication
+        self.content_hash = content_hash
+        self.text = text
+        self.page_count = page_count
+        self.error = error
+        self.unchanged = unchanged
+
+def pdf_source(publication):
+    """The stored pdf_file value, which changes whenever a new file is uploaded"""
+    if not publication.pdf_file:
+        return ''
+    return Publication._meta.get_field('pdf_file').get_prep_value(publication.pdf_file)
+
+def fetch_pdf(publication):
+    """The publication's PDF bytes, from PDF_TEXT_LOCAL_ROOT when it is set, otherwise from Cloudinary"""
+    # A value assigned in this process may still be the plain stored string
+    resource = Publication._meta.get_field('pdf_file').to_python(publication.pdf_file)
+    root = settings.PDF_TEXT_LOCAL_ROOT
+    if root:
+        name = resource.public_id
+        if resource.format and not name.endswith(f'.{resource.format}'):
+            name = f'{name}.{resource.format}'
+        path = os.path.join(root, name)
+        if os.path.getsize(path) > PDF_MAX_BYTES:
+            raise PdfTooLarge(f"{path} is over {PDF_MAX_BYTES:,} bytes")
+        with open(path, 'rb') as pdf:
+            return pdf.read()
+
+    chunks, size = [], 0
+    with requests.get(resource.url, stream=True, timeout=PDF_FETCH_TIMEOUT) as response:
+        response.raise_for_status()
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > PDF_MAX_BYTES:
+                raise PdfTooLarge(f"{resource.url} is over {PDF_MAX_BYTES:,} bytes")
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+class ExtractorPool:
+    """Worker processes running extract_text, replaced whenever one dies or overruns
+
+    A worker that crashes breaks its whole pool, failing every PDF in
+    flight. A worker still busy after PDF_EXTRACT_TIMEOUT is killed, which
+    breaks the pool the same way. Either way the next PDFs go to a fresh
+    pool.
+
+    No more PDFs are submitted than there are workers, so none waits in
+    the pool's queue and the timeout measures the PDF's own run.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._pool = self._start()
+
+    def _start(self):
+        return ProcessPoolExecutor(self.workers, max_tasks_per_child=PDF_TASKS_PER_CHILD)
+
+    def _replace(self, pool, kill=False):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = self._start()
+        if kill:
+            # The executor cannot cancel a running call, so its workers are stopped directly
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, data):
+        """(text, page count) of a PDF, raising BrokenProcessPool or futures.TimeoutError"""
+        with self._slots:
+            with self._lock:
+                pool = self._pool
+            try:
+                return pool.submit(extract_text, data).result(timeout=PDF_EXTRACT_TIMEOUT)
+            except futures.TimeoutError:
+                self._replace(pool, kill=True)
+                raise
+            except BrokenProcessPool:
+                self._replace(pool)
+                raise
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+def _extract(data, extractors):
+    if extractors is None:
+        return extract_text(data)
+    try:
+        return extractors.extract(data)
+    except BrokenProcessPool:
+        # Most PDFs in flight when a worker dies are bystanders, so each gets
+        # one more go in the fresh pool
+        return extractors.extract(data)
+
+def _process(publication, known_hash, force, extractors):
+    """Fetch, hash and, unless the file is unchanged, extract one PDF; runs in a fetch thread"""
+    try:
+        data = fetch_pdf(publication)
+    except Exception as e:
+        return ExtractedPdf(publication, error=f"Fetch failed: {e}"[:255])
+    content_hash = hashlib.sha256(data).hexdigest()
+    if content_hash == known_hash and not force:
+        return ExtractedPdf(publication, content_hash, unchanged=True)
+    try:
+        text, page_count = _extract(data, extractors)
+    except BrokenProcessPool as e:
+        # Stored without a hash, like a failed fetch, so the next run tries again
+        return ExtractedPdf(publication, error=f"Extraction worker died: {e}"[:255])
+    except futures.TimeoutError:
+        return ExtractedPdf(publication, content_hash, error=f"Extraction took over {PDF_EXTRACT_TIMEOUT}s")
+    except Exception as e:
+        # Kept with its hash, so a broken file is not retried until it changes
+        return ExtractedPdf(publication, content_hash, error=f"Extraction failed: {e}"[:255])
+    return ExtractedPdf(publication, content_hash, text, page_count)
+
+def _save(results, known):
+    """Store new text and re-index the publications it belongs to"""
+    for result in results:
+        # A re-upload of the same file only needs its new name recorded
+        source = pdf_source(result.publication)
+        if result.unchanged and known[result.publication.pk][1] != source:
+            PublicationText.objects.filter(publication=result.publication).update(source=source)
+
+    stored = [result for result in results if result.content_hash and not result.unchanged]
+    if not stored:
+        return
+    PublicationText.objects.bulk_create(
+        [PublicationText(publication=result.publication, source=pdf_source(result.publication),
+                         content_hash=result.content_hash, text=result.text,
+                         page_count=result.page_count, error=result.error) for result in stored],
+        update_conflicts=True, unique_fields=['publication'],
+        update_fields=['source', 'content_hash', 'text', 'page_count', 'error', 'extracted_at'])
+    search.index_publications([result.publication for result in stored])
+
+def extract_pdf_texts(queryset, workers=None, force=False, progress=None):
+    """Extract and index the text of every PDF in a publication queryset, returning totals
+
+    Fetch threads download the PDFs and hand them to a pool of worker
+    processes, one PDF per worker at a time; at most two per worker are
+    held in memory, so it stays bounded by the largest PDFs rather than the
+    size of the catalog. A file
+    whose hash matches the stored one is not extracted again unless forced.
+    Files that fail to parse or overrun PDF_EXTRACT_TIMEOUT are recorded
+    against their hash; failed fetches and dead workers are retried next run.
+    With workers=0 everything runs in this process, as inside a Celery task.
+    """
+    workers = settings.PDF_TEXT_WORKERS if workers is None else workers
+    publications = queryset.exclude(pdf_file__isnull=True).exclude(pdf_file='')
+    ids = list(publications.order_by('pk').values_list('pk', flat=True))
+    known = {pk: (content_hash, source) for pk, content_hash, source in
+             PublicationText.objects.filter(publication__in=publications.values('pk'))
+             .values_list('publication_id', 'content_hash', 'source')}
+    totals = {'publications': 0, 'extracted': 0, 'unchanged': 0, 'failed': 0}
+    results = []
+
+    def collect(finished):
+        for future in finished:
+            result = future.result()
+            totals['publications'] += 1
+            if result.unchanged:
+                totals['unchanged'] += 1
+            elif result.error:
+                totals['failed'] += 1
+                logger.warning("PDF text for publication %s: %s", result.publication.pk, result.error)
+            else:
+                totals['extracted'] += 1
+            results.append(result)
+        if len(results) >= PDF_TEXT_WRITE_BATCH_SIZE:
+            _save(results, known)
+            results.clear()
+            if progress:
+                progress(totals)
+
+    extractors = ExtractorPool(workers) if workers else None
+    try:
+        with ThreadPoolExecutor(max(workers, 1), thread_name_prefix='pdf-fetch') as fetchers:
+            pending = set()
+            # Rows are read a chunk at a time, with no cursor left open across the writes
+            for start in range(0, len(ids), PDF_READ_CHUNK_SIZE):
+                chunk = Publication.objects.filter(pk__in=ids[start:start + PDF_READ_CHUNK_SIZE]).only(
+                    'pk', 'title', 'keywords', 'abstract', 'pdf_file').order_by('pk')
+                for publication in chunk:
+                    if len(pending) >= 2 * max(workers, 1):
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(finished)
+                    known_hash = known.get(publication.pk, (None, None))[0]
+                    pending.add(fetchers.submit(_process, publication, known_hash, force, extractors))
+            collect(wait(pending).done)
+        _save(results, known)
+    finally:
+        if extractors:
+            extractors.shutdown()
+    return totals
+
+def refresh_publication_text(publication_id):
+    """Bring one publication's extracted text in line with its current PDF"""
+    publication = Publication.objects.filter(pk=publication_id).only(
+        'pk', 'title', 'keywords', 'abstract', 'pdf_file').first()
+    if publication is None:
+        return
+    if not publication.pdf_file:
+        if PublicationText.objects.filter(publication=publication).delete()[0]:
+            search.index_publication(publication)
+        return
+    extract_pdf_texts(Publication.objects.filter(pk=publication.pk), workers=0)
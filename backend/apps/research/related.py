@@ -0,0 +1,197 @@
+import re
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from django.db import connection, transaction
+from django.db.models import Count, Min
+
+from apps.core.locks import lock_until_commit
+from apps.research.exports import tag_map
+from apps.research.models import Publication, RelatedPublication
+
+RELATED_COUNT = 8
+RELATED_MIN_SCORE = 0.05
+# Rows scored against the whole corpus at once; bounds the dense similarity block
+RELATED_BLOCK_SIZE = 128
+RELATED_WRITE_BATCH_SIZE = 2000
+# Held while a build or update reads and rewrites the stored lists
+RELATED_LOCK = 'research:related-index'
+
+# Terms per field are counted this many times; tags count as whole terms
+FIELD_WEIGHTS = {'title': 2, 'keywords': 2, 'abstract': 1}
+TAG_WEIGHT = 2
+# Terms in fewer documents than this cannot link two publications
+MIN_DOCUMENT_FREQUENCY = 2
+# Terms in more than this share of documents say nothing about relatedness
+MAX_DOCUMENT_SHARE = 0.5
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself no nor not now of off on once only or other our ours ourselves out over own same she should so
+some such than that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves using use used based study paper research new may within among however
+""".split())
+
+TOKEN = re.compile(r'[^\W\d_]{2,}', re.UNICODE)
+
+def terms(publication, tags):
+    """Weighted term counts for one publication"""
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token, count in Counter(TOKEN.findall((getattr(publication, field) or '').lower())).items():
+            if token not in STOP_WORDS:
+                counts[token] += count * weight
+    for tag in tags:
+        counts[f'tag:{tag.lower()}'] += TAG_WEIGHT
+    return counts
+
+class RelatedCorpus:
+    """L2-normalized TF-IDF rows for every published publication"""
+
+    def __init__(self, ids, matrix):
+        self.ids = ids
+        self.matrix = matrix
+        self.rows = {pk: row for row, pk in enumerate(ids)}
+
+    @classmethod
+    def load(cls):
+        publications = list(Publication.objects.filter(status='published')
+                            .order_by('pk').only('pk', *FIELD_WEIGHTS))
+        ids = [p.pk for p in publications]
+        tags = tag_map(ids)
+        return cls(ids, vectorize([terms(p, tags[p.pk]) for p in publications]))
+
+    def neighbours(self, rows, count=RELATED_COUNT, min_score=RELATED_MIN_SCORE):
+        """Yield (row, [(other row, score), ...]) with each row's best matches first
+
+        A count of None keeps every match at or above min_score.
+        """
+        total = len(self.ids)
+        for start in range(0, len(rows), RELATED_BLOCK_SIZE):
+            block_rows = np.asarray(rows[start:start + RELATED_BLOCK_SIZE])
+            # The sparse corpus times a dense block is one compiled pass; a
+            # sparse product would build its near-dense result entry by entry
+            scores = np.asarray(self.matrix @ self.matrix[block_rows].T.toarray()).T
+            scores[np.arange(len(block_rows)), block_rows] = -1
+            if count is None or count >= total:
+                for i, row in enumerate(block_rows):
+                    columns = np.flatnonzero(scores[i] >= min_score)
+                    values = scores[i, columns]
+                    # Highest score first, ties broken by position so rebuilds agree
+                    order = np.lexsort((columns, -values))
+                    yield int(row), list(zip(columns[order].tolist(), values[order].tolist()))
+                continue
+
+            best = np.argpartition(-scores, count, axis=1)[:, :count]
+            values = np.take_along_axis(scores, best, axis=1)
+            order = np.lexsort((best, -values), axis=1)
+            best = np.take_along_axis(best, order, axis=1).tolist()
+            values = np.take_along_axis(values, order, axis=1).tolist()
+            for i, row in enumerate(block_rows.tolist()):
+                yield row, [(column, value) for column, value in zip(best[i], values[i]) if value >= min_score]
+
+def vectorize(documents):
+    """CSR matrix of sublinear TF-IDF weights, one L2-normalized row per term Counter"""
+    vocabulary = {}
+    rows, columns, values = [], [], []
+    for row, counts in enumerate(documents):
+        for term, count in counts.items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(count)
+    shape = (len(documents), len(vocabulary))
+    matrix = sparse.csr_matrix((np.asarray(values, dtype=np.float32), (rows, columns)), shape=shape)
+    if not matrix.nnz:
+        return matrix
+
+    frequency = np.bincount(matrix.indices, minlength=shape[1])
+    kept = (frequency >= MIN_DOCUMENT_FREQUENCY) & (frequency <= max(MIN_DOCUMENT_FREQUENCY,
+                                                                    MAX_DOCUMENT_SHARE * shape[0]))
+    matrix = matrix[:, np.flatnonzero(kept)].tocsr()
+    idf = np.log((1 + shape[0]) / (1 + frequency[kept])).astype(np.float32) + 1
+
+    matrix.data = 1 + np.log(matrix.data)
+    matrix = (matrix @ sparse.diags(idf)).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr().astype(np.float32)
+
+def _write(corpus, rows, count, min_score):
+    """Insert the rows' related lists, returning the number of entries"""
+    # A plain executemany; bulk_create spends longer compiling the
+    # statements than the database spends running them
+    db_ids = [Publication._meta.pk.get_db_prep_value(pk, connection) for pk in corpus.ids]
+    sql = (f"INSERT INTO {RelatedPublication._meta.db_table} (publication_id, related_id, rank, score) "
+           f"VALUES (%s, %s, %s, %s)")
+    written = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row, matches in corpus.neighbours(rows, count, min_score):
+            batch += [(db_ids[row], db_ids[other], rank, round(score, 4))
+                      for rank, (other, score) in enumerate(matches, start=1)]
+            if len(batch) >= RELATED_WRITE_BATCH_SIZE:
+                cursor.executemany(sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            written += len(batch)
+    return written
+
+def build_related_index(count=RELATED_COUNT, min_score=RELATED_MIN_SCORE):
+    """Recompute every published publication's related list, returning (publications, entries)"""
+    with transaction.atomic():
+        lock_until_commit(RELATED_LOCK)
+        corpus = RelatedCorpus.load()
+        RelatedPublication.objects.all().delete()
+        written = _write(corpus, list(range(len(corpus.ids))), count, min_score)
+    return len(corpus.ids), written
+
+def update_related_index(publication_ids, count=RELATED_COUNT, min_score=RELATED_MIN_SCORE):
+    """Refresh the lists a few changed publications appear in, returning how many were rewritten
+
+    The changed publications get new lists, as does every list that holds
+    one of them or that one of them now outscores. Everything else is left
+    alone; term weights drift as the catalog grows until the next full build.
+    """
+    # Task arguments arrive as strings
+    publication_ids = {Publication._meta.pk.to_python(pk) for pk in publication_ids}
+    with transaction.atomic():
+        # Runs queue here rather than delete and insert the same
+        # (publication, rank) rows side by side
+        lock_until_commit(RELATED_LOCK)
+        corpus = RelatedCorpus.load()
+        changed = {pk for pk in publication_ids if pk in corpus.rows}
+        gone = publication_ids - changed
+
+        # Lists that hold a changed or vanished publication lose or move it
+        affected = set(RelatedPublication.objects.filter(related__in=publication_ids)
+                       .values_list('publication_id', flat=True))
+        # Lists a changed publication would now make it onto
+        thresholds = {row['publication_id']: (row['lowest'], row['entries']) for row in
+                      RelatedPublication.objects.values('publication_id')
+                      .annotate(lowest=Min('score'), entries=Count('pk'))}
+        changed_rows = sorted(corpus.rows[pk] for pk in changed)
+        for row, matches in corpus.neighbours(changed_rows, None, min_score):
+            for other, score in matches:
+                lowest, entries = thresholds.get(corpus.ids[other], (0, 0))
+                if entries < count or score > lowest:
+                    affected.add(corpus.ids[other])
+
+        refresh = (changed | affected) - gone
+        RelatedPublication.objects.filter(publication__in=refresh | gone).delete()
+        RelatedPublication.objects.filter(related__in=gone).delete()
+        _write(corpus, sorted(corpus.rows[pk] for pk in refresh if pk in corpus.rows), count, min_score)
+    return len(refresh)
+
+def related_publications(publication_id):
+    """A publication's stored related list, best first, in one indexed query"""
+    publications = []
+    for entry in (RelatedPublication.objects.filter(publication_id=publication_id, related__status='published')
+                  .select_related('related').order_by('rank')):
+        entry.related.related_score = entry.score
+        publications.append(entry.related)
+    return publications
@@ -0,0 +1,226 @@
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.research.models import Citation, GoogleScholarSearch
+
+logger = logging.getLogger(__name__)
+
+SCHOLAR_LOCK_KEY = 'research:scholar:update-lock'
+SCHOLAR_RATE_KEY = 'research:scholar:rate'
+# Consecutive failed searches after which a run stops calling the source
+SCHOLAR_FAILURE_LIMIT = 5
+CITATION_WRITE_BATCH_SIZE = 500
+
+# 'A Author, B Author - Journal of X, 2020 - publisher.com'
+SUMMARY_YEAR = re.compile(r',?\s*((?:1[89]|20)\d{2})\s*$')
+
+class SourceUnavailable(Exception):
+    """Raised instead of fetching once a run has seen too many failures"""
+
+class ScholarResult:
+    """One work a search found, mapped onto Citation fields"""
+
+    def __init__(self, scholar_id, title, authors='', venue='', year=None, url=''):
+        self.scholar_id = scholar_id
+        self.title = title
+        self.authors = authors
+        self.venue = venue
+        self.year = year
+        self.url = url
+
+class ScholarSource:
+    """Where search results come from; SCHOLAR_SOURCE names the subclass to use"""
+    # Results asked for per page; a shorter page is the last one
+    page_size = 20
+
+    def fetch(self, params, page):
+        """ScholarResults on one page, counted from 0, of a search's (query, author, year from, year to)"""
+        raise NotImplementedError
+
+def parse_summary(summary):
+    """(authors, venue, year) from a result's publication summary line"""
+    parts = [part.strip() for part in (summary or '').split(' - ')]
+    authors = parts[0].rstrip('…').strip() if parts else ''
+    venue = parts[1] if len(parts) > 1 else ''
+    year = None
+    match = SUMMARY_YEAR.search(venue)
+    if match:
+        year = int(match.group(1))
+        venue = venue[:match.start()].strip()
+    return authors, venue, year
+
+class SerpApiSource(ScholarSource):
+    """Google Scholar results through SerpApi's JSON API, or anything answering in its shape"""
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def fetch(self, params, page):
+        query, author_filter, year_from, year_to = params
+        if author_filter:
+            query = f'{query} author:"{author_filter}"'
+        request = {
+            'engine': 'google_scholar',
+            'q': query,
+            'start': page * self.page_size,
+            'num': self.page_size,
+            'api_key': settings.SCHOLAR_API_KEY,
+        }
+        if year_from:
+            request['as_ylo'] = year_from
+        if year_to:
+            request['as_yhi'] = year_to
+        response = self.session.get(f'{settings.SCHOLAR_BASE_URL}/search.json', params=request,
+                                    timeout=settings.SCHOLAR_TIMEOUT)
+        response.raise_for_status()
+
+        results = []
+        for item in response.json().get('organic_results', []):
+            authors, venue, year = parse_summary(item.get('publication_info', {}).get('summary', ''))
+            results.append(ScholarResult(item.get('result_id', ''), item.get('title', ''), authors,
+                                         venue, year, item.get('link', '')))
+        return results
+
+class RateLimiter:
+    """At most `rate` calls a second across every worker sharing the cache
+
+    Time is cut into slots of 1/rate seconds, and a call claims a slot
+    with an atomic cache.add, so workers in other processes wait their turn.
+    """
+
+    def __init__(self, key, rate):
+        self.key = key
+        self.rate = rate
+
+    def wait(self):
+        while True:
+            now = time.time()
+            slot = int(now * self.rate)
+            if cache.add(f'{self.key}:{slot}', 1, timeout=60):
+                return
+            time.sleep(max((slot + 1) / self.rate - now, 0.001))
+
+def get_source():
+    return import_string(settings.SCHOLAR_SOURCE)()
+
+def search_params(search):
+    """What a search sends to the source; searches that agree on it share one fetch"""
+    return (search.query.strip(), search.author_filter.strip(), search.year_from, search.year_to)
+
+def due_searches(limit):
+    """Active auto-updating searches not run within SCHOLAR_UPDATE_INTERVAL, least recent first"""
+    cutoff = timezone.now() - timedelta(seconds=settings.SCHOLAR_UPDATE_INTERVAL)
+    return list(GoogleScholarSearch.objects
+                .filter(auto_update=True, is_active=True, publication__isnull=False)
+                .filter(Q(last_searched__isnull=True) | Q(last_searched__lte=cutoff))
+                .order_by(F('last_searched').asc(nulls_first=True), 'pk')[:limit])
+
+def _fetch(source, limiter, stopped, params, known, max_pages):
+    """Page through one search until a page brings nothing new, returning the new results
+
+    known holds the ids every publication sharing the search already has,
+    and collects the ids seen here so a repeat on a later page is dropped.
+    """
+    results = []
+    for page in range(max_pages):
+        if stopped.is_set():
+            raise SourceUnavailable("Stopped after repeated source failures")
+        limiter.wait()
+        page_results = source.fetch(params, page)
+        fresh = [result for result in page_results if result.scholar_id and result.scholar_id not in known]
+        known.update(result.scholar_id for result in fresh)
+        results += fresh
+        if not fresh or len(page_results) < source.page_size:
+            break
+    return results
+
+def _store(searches, results, known):
+    """Insert the results each search's publication does not have yet, returning how many were new"""
+    citations = [
+        Citation(publication_id=search.publication_id, citing_title=result.title[:300],
+                 citing_authors=result.authors[:500], citing_publication=result.venue[:200],
+                 citing_year=result.year, citing_url=result.url[:200],
+                 google_scholar_id=result.scholar_id[:100])
+        for search in searches for result in results
+        if result.scholar_id not in known[search.publication_id]
+    ]
+    # Found citations start unverified, so no citation_count moves and
+    # skipping the save signals loses nothing; a row added meanwhile by an
+    # editor wins over the copy found here
+    Citation.objects.bulk_create(citations, batch_size=CITATION_WRITE_BATCH_SIZE, ignore_conflicts=True)
+    for citation in citations:
+        known[citation.publication_id].add(citation.google_scholar_id)
+    return len(citations)
+
+def update_scholar_searches(limit=None, source=None, progress=None):
+    """Run the due auto-updating searches, returning totals, or None while another run holds the lock
+
+    Searches with the same parameters are fetched once for all of their
+    publications. Fetches run SCHOLAR_CONCURRENCY at a time under a rate
+    limit shared by every worker; results are written from this thread.
+    A search that fails keeps its last_searched and is retried next run.
+    """
+    if not cache.add(SCHOLAR_LOCK_KEY, 1, timeout=settings.SCHOLAR_LOCK_TIMEOUT):
+        return None
+    try:
+        return _update(limit or settings.SCHOLAR_BATCH_SIZE, source or get_source(), progress)
+    finally:
+        cache.delete(SCHOLAR_LOCK_KEY)
+
+def _update(limit, source, progress):
+    searches = due_searches(limit)
+    groups = defaultdict(list)
+    for search in searches:
+        groups[search_params(search)].append(search)
+
+    known = defaultdict(set)
+    for publication_id, scholar_id in (Citation.objects
+                                       .filter(publication__in={search.publication_id for search in searches})
+                                       .exclude(google_scholar_id='')
+                                       .values_list('publication_id', 'google_scholar_id')):
+        known[publication_id].add(scholar_id)
+
+    totals = {'searches': len(searches), 'fetched': 0, 'citations': 0, 'failed': 0}
+    limiter = RateLimiter(SCHOLAR_RATE_KEY, settings.SCHOLAR_RATE_LIMIT)
+    stopped = threading.Event()
+    failures = 0
+    with ThreadPoolExecutor(settings.SCHOLAR_CONCURRENCY, thread_name_prefix='scholar') as pool:
+        futures = {}
+        for params, group in groups.items():
+            shared = set.intersection(*(known[search.publication_id] for search in group))
+            futures[pool.submit(_fetch, source, limiter, stopped, params, set(shared),
+                                settings.SCHOLAR_MAX_PAGES)] = params
+
+        for future in as_completed(futures):
+            group = groups[futures[future]]
+            try:
+                results = future.result()
+            except Exception as e:
+                totals['failed'] += len(group)
+                failures += 1
+                if failures >= SCHOLAR_FAILURE_LIMIT and not stopped.is_set():
+                    logger.warning("Scholar source failed %s times in a row; stopping this run", failures)
+                    stopped.set()
+                if not isinstance(e, SourceUnavailable):
+                    logger.warning("Scholar search %r failed: %s", futures[future][0], e)
+                continue
+
+            failures = 0
+            totals['fetched'] += 1
+            totals['citations'] += _store(group, results, known)
+            GoogleScholarSearch.objects.filter(pk__in=[search.pk for search in group]).update(
+                last_searched=timezone.now())
+            if progress:
+                progress(totals)
+    return totals
@@ -0,0 +1,268 @@
+import re
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils.html import escape
+
+from apps.research.models import Publication, PublicationText
+
+# Indexed fields and their weights: title > keywords > abstract
+SEARCH_FIELDS = ['title', 'keywords', 'abstract']
+POSTGRES_WEIGHTS = {'title': 'A', 'keywords': 'B', 'abstract': 'C'}
+SQLITE_WEIGHTS = {'title': 10.0, 'keywords': 4.0, 'abstract': 1.0}
+# Text extracted from the PDF ranks below everything the authors wrote for the record
+BODY_POSTGRES_WEIGHT = 'D'
+BODY_SQLITE_WEIGHT = 0.5
+SEARCH_CONFIG = 'english'
+
+# Matches are delimited with control characters in SQL, then the text is
+# HTML-escaped and the delimiters swapped for <mark> tags
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+
+# SQLite keeps a shadow copy of the indexed text keyed by publication, with an
+# external-content FTS5 table over it that triggers keep in step
+SQLITE_CONTENT_TABLE = 'research_publication_search'
+SQLITE_FTS_TABLE = 'research_publication_fts'
+SQLITE_COLUMNS = SEARCH_FIELDS + ['body']
+
+_columns = ', '.join(SQLITE_COLUMNS)
+_new = ', '.join(f'new.{column}' for column in SQLITE_COLUMNS)
+_old = ', '.join(f'old.{column}' for column in SQLITE_COLUMNS)
+
+SQLITE_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {SQLITE_CONTENT_TABLE} (
+        rowid INTEGER PRIMARY KEY,
+        publication_id TEXT NOT NULL UNIQUE,
+        {', '.join(f'{column} TEXT' for column in SQLITE_COLUMNS)})""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        {_columns},
+        content='{SQLITE_CONTENT_TABLE}', content_rowid='rowid',
+        tokenize='porter unicode61')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_CONTENT_TABLE}_ai AFTER INSERT ON {SQLITE_CONTENT_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, {_columns})
+        VALUES (new.rowid, {_new});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_CONTENT_TABLE}_ad AFTER DELETE ON {SQLITE_CONTENT_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {_columns})
+        VALUES ('delete', old.rowid, {_old});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_CONTENT_TABLE}_au AFTER UPDATE ON {SQLITE_CONTENT_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {_columns})
+        VALUES ('delete', old.rowid, {_old});
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, {_columns})
+        VALUES (new.rowid, {_new});
+    END""",
+]
+
+def search_vector():
+    """Weighted tsvector expression over the indexed fields and the PDF's extracted text"""
+    vectors = [SearchVector(field, weight=POSTGRES_WEIGHTS[field], config=SEARCH_CONFIG)
+               for field in SEARCH_FIELDS]
+    # A subquery rather than a join, so the expression works in UPDATE ... SET
+    body = Subquery(PublicationText.objects.filter(publication=OuterRef('pk')).values('text')[:1])
+    vectors.append(SearchVector(Coalesce(body, Value('')), weight=BODY_POSTGRES_WEIGHT, config=SEARCH_CONFIG))
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector += other
+    return vector
+
+def _db_id(pk):
+    """The publication key as the database stores it (hex text on SQLite)"""
+    return Publication._meta.pk.get_db_prep_value(pk, connection)
+
+def _sqlite_index_current(connection):
+    """Whether the shadow table exists with every indexed column"""
+    if SQLITE_CONTENT_TABLE not in connection.introspection.table_names(include_views=False):
+        return False
+    with connection.cursor() as cursor:
+        columns = {column.name for column in
+                   connection.introspection.get_table_description(cursor, SQLITE_CONTENT_TABLE)}
+    return set(SQLITE_COLUMNS) <= columns
+
+def ensure_search_index(using='default'):
+    """Create the SQLite index tables, filled from the publications, if they are missing or outdated
+
+    Run after migrate; PostgreSQL's GIN index is declared on Publication.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and not _sqlite_index_current(connection):
+        rebuild_search_index(using)
+
+def create_search_index(sender, using='default', **kwargs):
+    """post_migrate handler for the research app"""
+    ensure_search_index(using)
+
+def rebuild_search_index(using='default', missing_only=False):
+    """Rebuild the whole index from the publications table, returning the row count
+
+    On PostgreSQL missing_only fills just the vectors still NULL, e.g. the
+    rows that existed before the column did.
+    """
+    connection = connections[using]
+    table = Publication._meta.db_table
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            publications = Publication.objects.using(using)
+            if missing_only:
+                publications = publications.filter(search_vector__isnull=True)
+            return publications.update(search_vector=search_vector())
+        if connection.vendor != 'sqlite':
+            return 0
+
+        with connection.cursor() as cursor:
+            # Recreate empty, load the shadow table in one statement, then let FTS5
+            # index it in bulk rather than row by row through the triggers
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_CONTENT_TABLE}")
+            cursor.execute(SQLITE_SCHEMA[0])
+            cursor.execute(
+                f"INSERT INTO {SQLITE_CONTENT_TABLE} (publication_id, {_columns}) "
+                f"SELECT p.id, p.title, p.keywords, p.abstract, t.text FROM {table} p "
+                f"LEFT JOIN {PublicationText._meta.db_table} t ON t.publication_id = p.id")
+            for statement in SQLITE_SCHEMA[1:]:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+            cursor.execute(f"SELECT COUNT(*) FROM {SQLITE_CONTENT_TABLE}")
+            return cursor.fetchone()[0]
+
+def index_publications(publications):
+    """Bring many publications' index entries up to date, e.g. after a bulk_create"""
+    if not publications:
+        return
+    if connection.vendor == 'postgresql':
+        Publication.objects.filter(pk__in=[p.pk for p in publications]).update(search_vector=search_vector())
+    elif connection.vendor == 'sqlite':
+        bodies = dict(PublicationText.objects.filter(publication__in=[p.pk for p in publications])
+                      .values_list('publication_id', 'text'))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_CONTENT_TABLE} (publication_id, {_columns}) "
+                f"VALUES (%s, %s, %s, %s, %s) ON CONFLICT (publication_id) DO UPDATE SET "
+                f"{', '.join(f'{column} = excluded.{column}' for column in SQLITE_COLUMNS)}",
+                [(_db_id(p.pk), p.title, p.keywords, p.abstract, bodies.get(p.pk)) for p in publications])
+
+def index_publication(publication):
+    """Bring one publication's index entry up to date after a save"""
+    index_publications([publication])
+
+def unindex_publication(publication):
+    """Drop a deleted publication from the SQLite shadow table"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_CONTENT_TABLE} WHERE publication_id = %s",
+                           [_db_id(publication.pk)])
+
+def _mark(text):
+    """HTML-escape a highlighted fragment, wrapping matches in <mark>"""
+    return escape(text or '').replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query: every term required, the last one as a prefix"""
+    terms = re.findall(r'\w+', text, re.UNICODE)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _check_vendor():
+    """Search is built on PostgreSQL full text search or SQLite's FTS5, nothing else"""
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        raise ImproperlyConfigured(f"Publication search needs PostgreSQL or SQLite, not {connection.display_name}")
+
+def _search_sqlite(queryset, text, limit, after):
+    match = _fts_query(text)
+    if match is None:
+        return []
+
+    # Correlate the caller's filters with each match through the primary key index
+    allowed_sql, allowed_params = queryset.filter(
+        pk=RawSQL('s.publication_id', [])).order_by().values('pk').query.sql_with_params()
+    weights = ', '.join(str(SQLITE_WEIGHTS[field]) for field in SEARCH_FIELDS) + f', {BODY_SQLITE_WEIGHT}'
+    bm25 = f"bm25({SQLITE_FTS_TABLE}, {weights})"
+    # Past the cursor: a worse score, or the same score and a later key. The
+    # score is spelled out because FTS5's own rank column shadows the alias.
+    after_sql, after_params = '', []
+    if after is not None:
+        rank, pk = after
+        after_sql = f"AND ({bm25} > %s OR ({bm25} = %s AND s.publication_id > %s)) "
+        after_params = [-rank, -rank, _db_id(pk)]
+    title_column = SEARCH_FIELDS.index('title')
+    abstract_column = SEARCH_FIELDS.index('abstract')
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT s.publication_id, {bm25} AS rank, "
+            f"highlight({SQLITE_FTS_TABLE}, {title_column}, %s, %s), "
+            f"snippet({SQLITE_FTS_TABLE}, {abstract_column}, %s, %s, '…', 32) "
+            f"FROM {SQLITE_FTS_TABLE} JOIN {SQLITE_CONTENT_TABLE} s ON s.rowid = {SQLITE_FTS_TABLE}.rowid "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND EXISTS ({allowed_sql}) {after_sql}"
+            f"ORDER BY rank, s.publication_id LIMIT %s",
+            [HIGHLIGHT_START, HIGHLIGHT_STOP, HIGHLIGHT_START, HIGHLIGHT_STOP, match,
+             *allowed_params, *after_params, limit])
+        hits = cursor.fetchall()
+
+    pk_field = Publication._meta.pk
+    hits = [(pk_field.to_python(pk), rank, title, abstract) for pk, rank, title, abstract in hits]
+    publications = queryset.in_bulk([hit[0] for hit in hits])
+    results = []
+    for pk, rank, title, abstract in hits:
+        publication = publications.get(pk)
+        if publication is not None:
+            # bm25 scores are negative, lower is better; flip so higher ranks first
+            publication.search_rank = -rank
+            publication.title_highlight = _mark(title)
+            publication.abstract_highlight = _mark(abstract)
+            results.append(publication)
+    return results
+
+def _search_postgres(queryset, text, limit, after):
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    queryset = queryset.filter(search_vector=query).annotate(search_rank=SearchRank(F('search_vector'), query))
+    if after is not None:
+        rank, pk = after
+        queryset = queryset.filter(Q(search_rank__lt=rank) | Q(search_rank=rank, pk__gt=pk))
+    results = list(
+        queryset.annotate(
+            title_highlight=SearchHeadline('title', query, config=SEARCH_CONFIG,
+                                           start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_STOP,
+                                           highlight_all=True),
+            abstract_highlight=SearchHeadline('abstract', query, config=SEARCH_CONFIG,
+                                              start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_STOP,
+                                              max_words=35, min_words=15),
+        )
+        .order_by('-search_rank', 'pk')[:limit]
+    )
+    for publication in results:
+        publication.title_highlight = _mark(publication.title_highlight)
+        publication.abstract_highlight = _mark(publication.abstract_highlight)
+    return results
+
+def matching_publications(queryset, text):
+    """Narrow a queryset to the publications matching free text, without ranking them"""
+    _check_vendor()
+    if connection.vendor == 'postgresql':
+        return queryset.filter(search_vector=SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG))
+    match = _fts_query(text)
+    if match is None:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(
+        f"SELECT s.publication_id FROM {SQLITE_FTS_TABLE} "
+        f"JOIN {SQLITE_CONTENT_TABLE} s ON s.rowid = {SQLITE_FTS_TABLE}.rowid "
+        f"WHERE {SQLITE_FTS_TABLE} MATCH %s", [match]))
+
+def search_publications(queryset, text, limit=50, after=None):
+    """Rank publications in a queryset against free text, best match first, then by key
+
+    Each result carries search_rank, title_highlight and abstract_highlight.
+    after is the (search_rank, pk) of the last result already seen, to
+    continue from there.
+    """
+    _check_vendor()
+    if connection.vendor == 'postgresql':
+        return _search_postgres(queryset, text, limit, after)
+    return _search_sqlite(queryset, text, limit, after)
@@ -0,0 +1,173 @@
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import (
+    post_init, pre_save, post_save, post_delete, pre_delete, m2m_changed, post_migrate,
+)
+
+from apps.core.models import UUIDTaggedItem
+from apps.research import author_stats, citation_counts, identifiers, search
+from apps.research.bibliography import update_author_surname
+from apps.research.citations import invalidate_citations
+from apps.research.exports import bump_catalog_version
+from apps.research.models import (
+    Publication, AuthorContribution, Citation, PublicationText, RelatedPublication, ResearchCategory,
+)
+from apps.research.pdftext import pdf_source
+from apps.research.related import FIELD_WEIGHTS
+from apps.research.tasks import extract_publication_text, update_related_index
+
+# User fields that appear in citations and exports
+AUTHOR_NAME_FIELDS = {'first_name', 'last_name', 'username'}
+
+# Publication fields the related lists are computed from, plus whether it is listed at all
+RELATED_FIELDS = set(FIELD_WEIGHTS) | {'status'}
+
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Re-index a publication when its searchable text may have changed"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(search.SEARCH_FIELDS):
+        return
+    search.index_publication(instance)
+
+def remove_from_search_index(sender, instance, **kwargs):
+    search.unindex_publication(instance)
+
+def extract_new_pdf(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Queue text extraction when a publication's PDF is added, replaced or removed"""
+    if raw:
+        return
+    if update_fields is not None and 'pdf_file' not in update_fields:
+        return
+    extracted = PublicationText.objects.filter(publication=instance).values_list('source', flat=True).first()
+    if (extracted or '') != pdf_source(instance):
+        publication_id = str(instance.pk)
+        transaction.on_commit(lambda: extract_publication_text.delay(publication_id))
+
+def publications_changed(publication_ids):
+    """Drop cached citations and move the export ETag on for changed publications"""
+    publication_ids = list(publication_ids)
+    if publication_ids:
+        invalidate_citations(publication_ids)
+        bump_catalog_version()
+
+def invalidate_publication_citations(sender, instance, **kwargs):
+    publications_changed([instance.pk])
+
+def invalidate_contribution_citations(sender, instance, **kwargs):
+    publications_changed([instance.publication_id])
+
+def invalidate_author_citations(sender, instance, raw=False, update_fields=None, **kwargs):
+    """A renamed user changes every citation they appear in"""
+    if raw:
+        return
+    # Logins save last_login only; skip those without a query
+    if update_fields is not None and not set(update_fields) & AUTHOR_NAME_FIELDS:
+        return
+    publications_changed(
+        AuthorContribution.objects.filter(author=instance).values_list('publication_id', flat=True))
+
+def invalidate_m2m_citations(sender, instance, action, reverse, pk_set, **kwargs):
+    """publication.authors.add()/remove() bypass AuthorContribution's save signals"""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        publications_changed([instance.pk])
+    elif pk_set:
+        publications_changed(pk_set)
+    else:
+        # user.publications.clear() does not report which publications it touched
+        invalidate_author_citations(User, instance)
+
+def tags_changed(sender, instance, action, **kwargs):
+    """Tags are part of the export, so retagging a publication moves its ETag on"""
+    if isinstance(instance, Publication) and action.startswith('post_'):
+        bump_catalog_version()
+
+def related_index_changed(publication_ids):
+    """Refresh the related lists once the change is committed"""
+    publication_ids = [str(pk) for pk in publication_ids]
+    transaction.on_commit(lambda: update_related_index.delay(publication_ids))
+
+def update_related_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & RELATED_FIELDS:
+        return
+    related_index_changed([instance.pk])
+
+def update_related_on_delete(sender, instance, **kwargs):
+    """The lists holding a deleted publication are cascaded away with it; refill them"""
+    related_index_changed([instance.pk, *RelatedPublication.objects.filter(related=instance)
+                           .values_list('publication_id', flat=True)])
+
+def update_related_on_retag(sender, instance, action, **kwargs):
+    if isinstance(instance, Publication) and action.startswith('post_'):
+        related_index_changed([instance.pk])
+
+def categories_changed(sender, instance, **kwargs):
+    """Facet counts are labelled with category names"""
+    bump_catalog_version()
+
+post_migrate.connect(search.create_search_index, sender=apps.get_app_config('research'),
+                     dispatch_uid='research-search-schema')
+post_save.connect(update_search_index, sender=Publication, dispatch_uid='research-search-save')
+post_delete.connect(remove_from_search_index, sender=Publication, dispatch_uid='research-search-delete')
+post_save.connect(extract_new_pdf, sender=Publication, dispatch_uid='research-search-pdf-save')
+
+# Cached citations depend on the publication, its contributions and the authors' names
+post_save.connect(invalidate_publication_citations, sender=Publication,
+                  dispatch_uid='research-citations-publication-save')
+post_delete.connect(invalidate_publication_citations, sender=Publication,
+                    dispatch_uid='research-citations-publication-delete')
+post_save.connect(invalidate_contribution_citations, sender=AuthorContribution,
+                  dispatch_uid='research-citations-contribution-save')
+post_delete.connect(invalidate_contribution_citations, sender=AuthorContribution,
+                    dispatch_uid='research-citations-contribution-delete')
+post_save.connect(invalidate_author_citations, sender=User,
+                  dispatch_uid='research-citations-user-save')
+post_save.connect(update_author_surname, sender=User, dispatch_uid='research-bibliography-user-save')
+m2m_changed.connect(invalidate_m2m_citations, sender=Publication.authors.through,
+                    dispatch_uid='research-citations-authors-changed')
+m2m_changed.connect(tags_changed, sender=UUIDTaggedItem, dispatch_uid='research-export-tags-changed')
+post_save.connect(categories_changed, sender=ResearchCategory, dispatch_uid='research-facets-category-save')
+post_delete.connect(categories_changed, sender=ResearchCategory, dispatch_uid='research-facets-category-delete')
+
+# Related lists depend on the text and tags of published publications
+post_save.connect(update_related_on_save, sender=Publication, dispatch_uid='research-related-save')
+pre_delete.connect(update_related_on_delete, sender=Publication, dispatch_uid='research-related-delete')
+m2m_changed.connect(update_related_on_retag, sender=UUIDTaggedItem, dispatch_uid='research-related-tags-changed')
+
+# Publication.citation_count follows its verified Citation rows
+post_init.connect(citation_counts.remember_loaded_citation, sender=Citation,
+                  dispatch_uid='research-citation-count-init')
+pre_save.connect(citation_counts.fill_missing_citation_values, sender=Citation,
+                 dispatch_uid='research-citation-count-pre-save')
+post_save.connect(citation_counts.update_citation_count_on_save, sender=Citation,
+                  dispatch_uid='research-citation-count-save')
+pre_delete.connect(citation_counts.fill_missing_citation_values, sender=Citation,
+                   dispatch_uid='research-citation-count-pre-delete')
+post_delete.connect(citation_counts.update_citation_count_on_delete, sender=Citation,
+                    dispatch_uid='research-citation-count-delete')
+
+# Identifiers are stored in one spelling and mirrored into the lookup table
+pre_save.connect(identifiers.normalize_identifier_fields, sender=Publication,
+                 dispatch_uid='research-identifiers-normalize')
+post_save.connect(identifiers.update_identifiers_on_save, sender=Publication,
+                  dispatch_uid='research-identifiers-save')
+
+# Author stats follow their published publications' citation counts; changes
+# to the counts themselves are picked up in apps.research.citation_counts
+post_save.connect(author_stats.update_stats_on_publication_save, sender=Publication,
+                  dispatch_uid='research-author-stats-publication-save')
+pre_delete.connect(author_stats.update_stats_on_publication_delete, sender=Publication,
+                   dispatch_uid='research-author-stats-publication-delete')
+pre_save.connect(author_stats.remember_contribution_author, sender=AuthorContribution,
+                 dispatch_uid='research-author-stats-contribution-pre-save')
+post_save.connect(author_stats.update_stats_on_contribution_change, sender=AuthorContribution,
+                  dispatch_uid='research-author-stats-contribution-save')
+post_delete.connect(author_stats.update_stats_on_contribution_change, sender=AuthorContribution,
+                    dispatch_uid='research-author-stats-contribution-delete')
+m2m_changed.connect(author_stats.update_stats_on_authors_changed, sender=Publication.authors.through,
+                    dispatch_uid='research-author-stats-authors-changed')
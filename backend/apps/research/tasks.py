@@ -0,0 +1,51 @@
+from celery import shared_task
+
+@shared_task(ignore_result=True)
+def update_related_index(publication_ids):
+    """Refresh the related lists touched by changed publications"""
+    from apps.research.related import update_related_index as update
+    update(publication_ids)
+
+@shared_task(ignore_result=True)
+def rebuild_related_index():
+    """Recompute every related list with fresh term weights"""
+    from apps.research.related import build_related_index
+    build_related_index()
+
+# Extraction runs in the Celery worker itself, so a PDF that never finishes
+# is stopped by killing the worker child
+@shared_task(ignore_result=True, time_limit=300)
+def extract_publication_text(publication_id):
+    """Extract a publication's new PDF for the search index"""
+    from apps.research.pdftext import refresh_publication_text
+    refresh_publication_text(publication_id)
+
+@shared_task(ignore_result=True)
+def recount_citations():
+    """Recompute every publication's citation_count from its verified citations"""
+    from apps.research.citation_counts import recount_citations as recount
+    recount()
+
+@shared_task(ignore_result=True)
+def refresh_author_stats(author_ids=None):
+    """Recompute the h-index, i10-index and totals of some authors, or of all of them"""
+    from apps.research.author_stats import refresh_author_stats as refresh
+    refresh(author_ids)
+
+@shared_task(ignore_result=True)
+def update_coauthor_graph(author_ids, publication_ids=()):
+    """Recompute the co-authorship edges around publications whose authors changed"""
+    from apps.research.coauthors import update_coauthor_graph as update
+    update(author_ids, publication_ids)
+
+@shared_task(ignore_result=True)
+def rebuild_coauthor_graph():
+    """Recompute every co-authorship edge"""
+    from apps.research.coauthors import build_coauthor_graph
+    build_coauthor_graph()
+
+@shared_task(ignore_result=True)
+def update_scholar_searches():
+    """Run the due auto-updating Google Scholar searches"""
+    from apps.research.scholar import update_scholar_searches as update
+    update()
@@ -0,0 +1,254 @@
+import datetime
+import io
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+
+from apps.cms.models import SiteSettings
+from apps.core.pagination import KeysetPagination
+from apps.core.singletons import site_settings
+from apps.research.bibliography import import_bibliography, parse_bibtex
+from apps.research.coauthors import build_coauthor_graph, update_coauthor_graph
+from apps.research.fake_scholar import FakeScholarServer
+from apps.research.identifiers import normalize_isbn
+from apps.research.models import (
+    AuthorContribution, AuthorSurname, Citation, CoauthorEdge, GoogleScholarSearch, Publication,
+    PublicationIdentifier,
+)
+from apps.research.scholar import SCHOLAR_LOCK_KEY, update_scholar_searches
+from apps.research.search import matching_publications
+
+class CoauthorGraphTests(TestCase):
+    """Graphs with no co-authored publication write no edges instead of failing"""
+
+    def setUp(self):
+        self.alice = User.objects.create(username='alice')
+        self.bob = User.objects.create(username='bob')
+
+    def publication(self, *authors):
+        publication = Publication.objects.create(title='Paper', abstract='', publication_type='report',
+                                                 status='published')
+        for order, author in enumerate(authors):
+            AuthorContribution.objects.create(publication=publication, author=author, order=order)
+        return publication
+
+    def test_empty_catalog(self):
+        self.assertEqual(build_coauthor_graph(), (0, 0))
+
+    def test_solo_author(self):
+        self.publication(self.alice)
+        self.assertEqual(build_coauthor_graph(), (1, 0))
+        self.assertEqual(update_coauthor_graph([self.alice.pk]), 0)
+
+    def test_last_coauthor_removed(self):
+        self.publication(self.alice)
+        joint = self.publication(self.alice, self.bob)
+        self.assertEqual(build_coauthor_graph(), (2, 1))
+
+        joint.delete()
+        self.assertEqual(update_coauthor_graph([self.alice.pk, self.bob.pk]), 0)
+        self.assertFalse(CoauthorEdge.objects.exists())
+
+    def test_profile_lists_graph_coauthors(self):
+        carol = User.objects.create(username='carol', first_name='Carol', last_name='Cole')
+        self.publication(self.alice, self.bob)
+        self.publication(self.alice, carol)
+        self.publication(carol, self.alice)
+        build_coauthor_graph()
+
+        response = self.client.get(reverse('research:author-detail', args=[self.alice.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['id'], row['joint_publications']) for row in response.json()['coauthors']],
+                         [(carol.pk, 2), (self.bob.pk, 1)])
+
+class KeysetOrderTests(TestCase):
+    """Keyset pages list undated publications last, in Meta.ordering's order"""
+
+    def test_walk_matches_ordering(self):
+        for day in [None, 3, None, 1, 2, None]:
+            Publication.objects.create(title='Paper', abstract='', publication_type='report', status='published',
+                                       publication_date=day and datetime.date(2024, 1, day))
+        expected = list(Publication.objects.order_by(*Publication._meta.ordering, '-id').values_list('pk', flat=True))
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            paginator = KeysetPagination()
+            seen += [row.pk for row in paginator.paginate_queryset(Publication.objects.all(),
+                                                                    Request(RequestFactory().get('/', params)))]
+            cursor = paginator.next_cursor()
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+        self.assertIsNone(Publication.objects.get(pk=expected[-1]).publication_date)
+
+class SearchPagingTests(TestCase):
+    """Search results page by rank and key, reaching every match the facets count"""
+
+    def test_walk_reaches_every_match(self):
+        # Equal titles tie on rank, so the key decides their order
+        for n in range(7):
+            Publication.objects.create(title='Graph colouring' if n % 2 else 'Graph colouring bounds',
+                                       abstract='', publication_type='report', status='published')
+        Publication.objects.create(title='Trees', abstract='', publication_type='report', status='published')
+        seen, cursor = [], None
+        while True:
+            params = {'search': 'graph', 'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            page = self.client.get(reverse('research:publication-list'), params).json()
+            self.assertLessEqual(len(page['results']), 2)
+            seen += [(row['search_rank'], row['id']) for row in page['results']]
+            if not page['next']:
+                break
+            cursor = parse_qs(urlsplit(page['next']).query)['cursor'][0]
+        self.assertEqual(len(set(seen)), 7)
+        self.assertEqual(seen, sorted(seen, key=lambda row: (-row[0], row[1])))
+
+        facets = self.client.get(reverse('research:publication-facets'), {'search': 'graph'}).json()
+        self.assertEqual(facets['total'], 7)
+
+    def test_unsupported_backend(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaises(ImproperlyConfigured):
+                matching_publications(Publication.objects.all(), 'graph')
+
+class IdentifierTests(TestCase):
+    """Malformed ISBNs normalize to nothing instead of raising"""
+
+    def test_isbn_forms(self):
+        self.assertEqual(normalize_isbn('0-306-40615-2'), '9780306406157')
+        self.assertEqual(normalize_isbn('080442957X'), '9780804429573')
+        self.assertEqual(normalize_isbn('12345X7890'), '')
+        self.assertEqual(normalize_isbn('978030640615X'), '')
+
+    def test_malformed_isbn(self):
+        publication = Publication.objects.create(title='Book', abstract='', publication_type='book',
+                                                 status='published', isbn='12345X7890')
+        self.assertFalse(PublicationIdentifier.objects.filter(publication=publication, scheme='isbn').exists())
+
+        response = self.client.post(reverse('research:publication-resolve'),
+                                    {'identifiers': [{'scheme': 'isbn', 'value': '12345X7890'}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['match_count'], 0)
+
+class BibliographyImportTests(TestCase):
+    """Imports match existing users even before their surnames were indexed, and only create users on request"""
+
+    SOURCE = r'''@article{a, title={One}, author={M{\"u}ller, J{\"o}rg and Roe, Ann}, year=2020}'''
+
+    def setUp(self):
+        self.muller = User.objects.create(username='jm', first_name='Jorg', last_name='Muller')
+        # As if the user predates the surname index
+        AuthorSurname.objects.all().delete()
+
+    def test_existing_author_matched(self):
+        totals = import_bibliography(parse_bibtex(io.StringIO(self.SOURCE)))
+        self.assertEqual(totals['new_authors'], 1)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(list(AuthorContribution.objects.values_list('author', flat=True)), [self.muller.pk])
+
+    def test_create_authors(self):
+        import_bibliography(parse_bibtex(io.StringIO(self.SOURCE)), create_authors=True)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertFalse(User.objects.get(last_name='Roe').is_active)
+
+class ScholarUpdateTests(TestCase):
+    """update_scholar_searches against the local stand-in for SerpApi"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeScholarServer(results_per_query=30)
+        cls.server.start()
+        cls.settings = override_settings(SCHOLAR_SOURCE='apps.research.scholar.SerpApiSource',
+                                         SCHOLAR_BASE_URL=cls.server.base_url, SCHOLAR_RATE_LIMIT=1000)
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.delete(SCHOLAR_LOCK_KEY)
+        self.server.failure_rate = 0.0
+        self.server.requests.clear()
+
+    def search(self, query, **fields):
+        publication = Publication.objects.create(title=query, abstract='', publication_type='report',
+                                                 status='published')
+        return GoogleScholarSearch.objects.create(query=query, auto_update=True, publication=publication, **fields)
+
+    def queries(self):
+        return [params['q'] for params in self.server.requests]
+
+    def test_grouped_searches_fetched_once(self):
+        first, second = self.search('graphs'), self.search('graphs')
+        self.search('trees')
+        totals = update_scholar_searches()
+        self.assertEqual(totals, {'searches': 3, 'fetched': 2, 'citations': 90, 'failed': 0})
+        # Two pages of 20 per query, whichever publications share it
+        self.assertEqual(sorted(self.queries()), ['graphs', 'graphs', 'trees', 'trees'])
+        self.assertEqual(first.publication.citations.count(), 30)
+        self.assertEqual(second.publication.citations.count(), 30)
+
+    def test_repeats_ignored(self):
+        search = self.search('graphs')
+        # A second search of the same publication; an editor adds one of its
+        # works by hand while the run is under way
+        GoogleScholarSearch.objects.create(query='trees', auto_update=True, publication=search.publication)
+        editor = []
+
+        def progress(totals):
+            if not editor:
+                stored = set(search.publication.citations.values_list('google_scholar_id', flat=True))
+                other = next(query for query in ['graphs', 'trees']
+                             if self.server.results_for(query)[0]['result_id'] not in stored)
+                editor.append(Citation.objects.create(
+                    publication=search.publication, citing_title='Checked by hand', citing_authors='Editor',
+                    is_verified=True, google_scholar_id=self.server.results_for(other)[0]['result_id']))
+
+        self.assertEqual(update_scholar_searches(progress=progress)['failed'], 0)
+        self.assertEqual(search.publication.citations.count(), 60)
+        editor[0].refresh_from_db()
+        self.assertEqual(editor[0].citing_title, 'Checked by hand')
+
+        # Run again: everything found is already stored
+        GoogleScholarSearch.objects.update(last_searched=None)
+        self.assertEqual(update_scholar_searches()['citations'], 0)
+        self.assertEqual(search.publication.citations.count(), 60)
+
+    def test_failed_search_keeps_last_searched(self):
+        last_searched = timezone.now() - datetime.timedelta(days=30)
+        search = self.search('graphs', last_searched=last_searched)
+        self.server.failure_rate = 1.0
+        totals = update_scholar_searches()
+        self.assertEqual(totals, {'searches': 1, 'fetched': 0, 'citations': 0, 'failed': 1})
+        search.refresh_from_db()
+        self.assertEqual(search.last_searched, last_searched)
+        self.assertFalse(Citation.objects.exists())
+
+class MaintenanceModeTests(TestCase):
+    """Public research endpoints answer 503 to everyone but staff while the site is under maintenance"""
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SiteSettings.objects.create(maintenance_mode=True)
+        # The cached copy would outlive the rolled-back row
+        self.addCleanup(site_settings.invalidate)
+
+    def test_facets_and_list_unavailable(self):
+        for name in ['research:publication-facets', 'research:publication-list']:
+            self.assertEqual(self.client.get(reverse(name)).status_code, 503)
+
+    def test_staff_get_through(self):
+        self.client.force_login(User.objects.create(username='editor', is_staff=True))
+        self.assertEqual(self.client.get(reverse('research:publication-facets')).status_code, 200)
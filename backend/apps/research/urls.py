@@ -5,8 +5,15 @@ app_name = 'research'
 
 urlpatterns = [
     path('publications/', views.PublicationListView.as_view(), name='publication-list'),
-    path('publications/<int:pk>/', views.PublicationDetailView.as_view(), name='publication-detail'),
+    path('publications/facets/', views.publication_facet_counts, name='publication-facets'),
+    path('publications/resolve/', views.resolve_publications, name='publication-resolve'),
+    path('publications/export.<str:fmt>', views.export_publications, name='publication-export'),
+    path('publications/<uuid:pk>/', views.PublicationDetailView.as_view(), name='publication-detail'),
+    path('publications/<uuid:pk>/download/', views.download_publication, name='publication-download'),
+    path('authors/<int:pk>/', views.AuthorDetailView.as_view(), name='author-detail'),
+    path('authors/<int:pk>/network/', views.author_network, name='author-network'),
+    path('coauthors/graph/', views.coauthor_graph, name='coauthor-graph'),
     path('projects/', views.ResearchProjectListView.as_view(), name='project-list'),
-    path('projects/<int:pk>/', views.ResearchProjectDetailView.as_view(), name='project-detail'),
+    path('projects/<uuid:pk>/', views.ResearchProjectDetailView.as_view(), name='project-detail'),
 ]
 
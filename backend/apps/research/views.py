@@ -1,36 +1,56 @@
 
 from rest_framework import generics, viewsets, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, F, FloatField, Sum
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.text import compress_sequence
+from django.views.decorators.http import condition, require_GET
+from django.views.decorators.vary import vary_on_headers
 import razorpay
+import requests
+import hashlib
 import json
 import uuid
 from datetime import datetime, timedelta
 
 # Import your models (adjust imports based on actual structure)
+from apps.core.counters import increment
+from apps.core.pagination import KeysetPagination
 from apps.core.models import Team, Department, FocusArea, ImpactStory, Contact, SiteStats
+from apps.core.permissions import SiteAvailable, site_available
 from apps.membership.models import MembershipTier, MembershipApplication, Payment
-from apps.research.models import Publication, ResearchProject
+from apps.research.models import AuthorContribution, AuthorStats, CoauthorEdge, Publication, ResearchProject
+from apps.research.author_stats import author_stats
+from apps.research.citations import citation_entries, display_name
+from apps.research.coauthors import ego_network, graph_version, top_coauthors
+from apps.research.exports import EXPORT_FORMATS, catalog_version, stream_export, tag_map
+from apps.research.facets import normalize_filters, publication_facets
+from apps.research.identifiers import RESOLVE_MAX_IDENTIFIERS, parse_identifier, resolve_identifiers
+from apps.research.related import related_publications
+from apps.research.search import search_publications
 from apps.donations.models import Donation, DonationCertificate
 from apps.issues.models import ReportedIssue, IssueCategory
 from apps.cms.models import SiteSettings, Page, Slider
-
-# Initialize Razorpay client
-razorpay_client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+from apps.payments.gateway import GatewayUnavailable, get_razorpay_client
+from apps.payments.idempotency import idempotent
 
 class TeamListView(generics.ListAPIView):
     """Get team members"""
     queryset = Team.objects.filter(status='active')
-    permission_classes = [AllowAny]
+    permission_classes = [SiteAvailable, AllowAny]
 
     def list(self, request):
         team_members = self.get_queryset().order_by('order', 'name')
@@ -50,7 +70,7 @@ class TeamListView(generics.ListAPIView):
         return Response(data)
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def contact_form_submit(request):
     """Handle contact form submissions"""
     try:
@@ -98,7 +118,8 @@ Submitted at: {contact.created_at}
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
+@idempotent('payment-order')
 def create_payment_order(request):
     """Create Razorpay order for payment"""
     try:
@@ -107,7 +128,7 @@ def create_payment_order(request):
         amount = float(data.get('amount'))
 
         # Create Razorpay order
-        razorpay_order = razorpay_client.order.create({
+        razorpay_order = get_razorpay_client().order.create({
             'amount': int(amount * 100),  # Convert to paise
             'currency': 'INR',
             'payment_capture': '1'
@@ -131,6 +152,13 @@ def create_payment_order(request):
             'razorpay_key': settings.RAZORPAY_KEY_ID
         })
 
+    except (GatewayUnavailable, requests.RequestException,
+            razorpay.errors.ServerError, razorpay.errors.GatewayError):
+        return Response({
+            'success': False,
+            'error': 'Payment gateway is not responding. Please try again shortly.'
+        }, status=503)
+
     except Exception as e:
         return Response({
             'success': False,
@@ -138,7 +166,7 @@ def create_payment_order(request):
         }, status=400)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([SiteAvailable, IsAuthenticated])
 def verify_payment(request):
     """Verify Razorpay payment"""
     try:
@@ -161,7 +189,7 @@ def verify_payment(request):
         }
 
         try:
-            razorpay_client.utility.verify_payment_signature(params_dict)
+            get_razorpay_client().utility.verify_payment_signature(params_dict)
         except razorpay.errors.SignatureVerificationError:
             payment.status = 'failed'
             payment.save()
@@ -190,7 +218,7 @@ def verify_payment(request):
         }, status=400)
 
 @api_view(['GET'])
-@permission_classes([AllowAny])
+@permission_classes([SiteAvailable, AllowAny])
 def homepage_data(request):
     """Get all data needed for homepage"""
     try:
@@ -214,3 +242,401 @@ def homepage_data(request):
             'error': str(e)
         }, status=500)
 
+def publication_data(publication, citations, tags):
+    """Public representation of a publication, given its citation entry and tag names"""
+    return {
+        'id': str(publication.id),
+        'title': publication.title,
+        'abstract': publication.abstract,
+        'publication_type': publication.get_publication_type_display(),
+        'publication_date': publication.publication_date,
+        'authors': citations['authors'],
+        'journal_name': publication.journal_name,
+        'publisher': publication.publisher,
+        'volume': publication.volume,
+        'issue': publication.issue,
+        'pages': publication.pages,
+        'doi': publication.doi,
+        'category': publication.category.name if publication.category else None,
+        'tags': tags,
+        'pdf_url': publication.pdf_file.url if publication.pdf_file else None,
+        # Counts the download before redirecting to the PDF
+        'download_url': (reverse('research:publication-download', args=[publication.pk])
+                         if publication.pdf_file else None),
+        'external_url': publication.external_url,
+        'download_count': publication.download_count,
+        'view_count': publication.view_count,
+        'citation_count': publication.citation_count,
+        'citation_apa': citations['apa'],
+        'citation_mla': citations['mla'],
+        'citation_chicago': citations['chicago'],
+        'citation_bibtex': citations['bibtex'],
+    }
+
+def filter_publications(queryset, params):
+    """Apply the category, type, tag and year query parameters"""
+    category = params.get('category')
+    if category and category != 'All':
+        queryset = queryset.filter(category__name=category)
+    if params.get('publication_type'):
+        queryset = queryset.filter(publication_type=params['publication_type'])
+    if params.get('tag'):
+        queryset = queryset.filter(tags__name=params['tag'])
+    if params.get('year', '').isdigit():
+        queryset = queryset.filter(publication_date__year=params['year'])
+    return queryset
+
+class SearchPagination(KeysetPagination):
+    """Keyset pages that also page ranked search results, by rank and then key
+
+    Search pages only go forward; the list is read as an endless scroll.
+    """
+
+    def paginate_search(self, queryset, text, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        rank = FloatField()
+        rank.set_attributes_from_name('search_rank')
+        self.ordering = [(rank, True), (queryset.model._meta.pk, False)]
+        after, reverse = self.decode_cursor(request)
+        if reverse:
+            raise NotFound(self.invalid_cursor_message)
+
+        rows = search_publications(queryset, text, limit=self.page_size + 1, after=after)
+        self.has_next = len(rows) > self.page_size
+        self.has_previous = False
+        self.page = rows[:self.page_size]
+        return self.page
+
+class PublicationListView(generics.ListAPIView):
+    """List published research a page at a time, or ranked by relevance when searching"""
+    permission_classes = [SiteAvailable, AllowAny]
+    pagination_class = SearchPagination
+    # ?sort= values and the orderings they page through, each backed by an index
+    sort_orderings = {
+        'recent': ['-publication_date', '-created_at'],
+        'most_cited': ['-citation_count'],
+    }
+
+    def get_queryset(self):
+        return filter_publications(
+            Publication.objects.filter(status='published').select_related('category'),
+            self.request.query_params)
+
+    def list(self, request):
+        queryset = self.get_queryset()
+        query = request.query_params.get('search', '').strip()
+        if not query:
+            self.ordering = self.sort_orderings.get(request.query_params.get('sort'), self.sort_orderings['recent'])
+            publications = self.paginate_queryset(queryset)
+        else:
+            publications = self.paginator.paginate_search(queryset, query, request)
+
+        citations = citation_entries(publications)
+        tags = tag_map([p.pk for p in publications])
+        data = []
+        for publication in publications:
+            item = publication_data(publication, citations[publication.pk], tags[publication.pk])
+            if query:
+                item.update({
+                    'search_rank': publication.search_rank,
+                    'title_highlight': publication.title_highlight,
+                    'abstract_highlight': publication.abstract_highlight,
+                })
+            data.append(item)
+        return self.get_paginated_response(data)
+
+@api_view(['GET'])
+@permission_classes([SiteAvailable, AllowAny])
+def publication_facet_counts(request):
+    """Counts per type, category, year and tag for the publications the list would show"""
+    filters = normalize_filters(request.query_params)
+    queryset = filter_publications(Publication.objects.filter(status='published'), filters)
+    return Response(publication_facets(queryset, filters))
+
+@api_view(['POST'])
+@permission_classes([SiteAvailable, AllowAny])
+def resolve_publications(request):
+    """Look up many DOIs, ISBNs, ISSNs and arXiv IDs at once, answered from one query"""
+    items = request.data.get('identifiers') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({
+            'success': False,
+            'error': 'Send a non-empty "identifiers" list'
+        }, status=400)
+    if len(items) > RESOLVE_MAX_IDENTIFIERS:
+        return Response({
+            'success': False,
+            'error': f'At most {RESOLVE_MAX_IDENTIFIERS} identifiers per request'
+        }, status=400)
+
+    keys = [parse_identifier(item) for item in items]
+    # Staff can also resolve drafts and archived publications
+    found = resolve_identifiers([key for key in keys if key[1]], published_only=not request.user.is_staff)
+    results = []
+    for item, (scheme, value) in zip(items, keys):
+        count, matches = found.get((scheme, value), (0, []))
+        results.append({
+            'identifier': item,
+            'scheme': scheme,
+            'normalized': value or None,
+            'match_count': count,
+            'matches': [{
+                'id': str(publication.id),
+                'title': publication.title,
+                'publication_type': publication.get_publication_type_display(),
+                'publication_date': publication.publication_date,
+                'status': publication.status,
+            } for publication in matches],
+        })
+    return Response({
+        'success': True,
+        'resolved': sum(1 for result in results if result['matches']),
+        'results': results,
+    })
+
+class PublicationDetailView(generics.RetrieveAPIView):
+    """Get a single published publication"""
+    queryset = Publication.objects.filter(status='published').select_related('category')
+    permission_classes = [SiteAvailable, AllowAny]
+
+    def retrieve(self, request, pk=None):
+        publication = get_object_or_404(self.get_queryset(), pk=pk)
+        increment(Publication, publication.pk, 'view_count')
+        data = publication_data(publication, citation_entries([publication])[publication.pk],
+                                tag_map([publication.pk])[publication.pk])
+        data.update({
+            'issn': publication.issn,
+            'isbn': publication.isbn,
+            'arxiv_id': publication.arxiv_id,
+            'related': [{
+                'id': str(related.id),
+                'title': related.title,
+                'publication_type': related.get_publication_type_display(),
+                'publication_date': related.publication_date,
+                'score': related.related_score,
+            } for related in related_publications(publication.pk)],
+        })
+        return Response(data)
+
+@require_GET
+@site_available
+def download_publication(request, pk):
+    """Count a download and redirect to the publication's PDF"""
+    publication = get_object_or_404(
+        Publication.objects.filter(status='published').only('pdf_file'), pk=pk)
+    if not publication.pdf_file:
+        raise Http404("This publication has no PDF")
+    increment(Publication, publication.pk, 'download_count')
+    return redirect(publication.pdf_file.url)
+
+# Co-authors listed on a researcher's profile, most joint publications first
+COAUTHOR_LIMIT = 50
+
+class AuthorDetailView(generics.RetrieveAPIView):
+    """A researcher's published work, roles, co-authors and precomputed bibliometrics"""
+    permission_classes = [SiteAvailable, AllowAny]
+
+    def retrieve(self, request, pk=None):
+        stats = author_stats(pk)
+        # Only people with published work have a public profile
+        if stats is None:
+            raise Http404("No published work by this author")
+        author = stats.author
+
+        contributions = (AuthorContribution.objects
+                         .filter(author=author, publication__status='published')
+                         .select_related('publication')
+                         .order_by(F('publication__publication_date').desc(nulls_last=True), '-publication__created_at'))
+        # From the precomputed graph, one index range, rather than a self-join per request
+        coauthors = top_coauthors(author.pk, COAUTHOR_LIMIT)
+
+        return Response({
+            'id': author.pk,
+            'name': display_name(author.first_name, author.last_name, author.username),
+            'publication_count': stats.publication_count,
+            'citation_count': stats.citation_count,
+            'h_index': stats.h_index,
+            'i10_index': stats.i10_index,
+            'stats_updated_at': stats.updated_at,
+            'publications': [{
+                'id': str(contribution.publication.id),
+                'title': contribution.publication.title,
+                'publication_type': contribution.publication.get_publication_type_display(),
+                'publication_date': contribution.publication.publication_date,
+                'journal_name': contribution.publication.journal_name,
+                'citation_count': contribution.publication.citation_count,
+                'role': contribution.get_role_display(),
+                'author_position': contribution.order + 1,
+            } for contribution in contributions],
+            'coauthors': [{
+                'id': edge.coauthor_id,
+                'name': display_name(edge.coauthor.first_name, edge.coauthor.last_name, edge.coauthor.username),
+                'joint_publications': edge.publication_count,
+            } for edge in coauthors],
+        })
+
+# Co-authors around a researcher by default, and at most
+EGO_NETWORK_LIMIT = 50
+EGO_NETWORK_MAX = 200
+COAUTHOR_GRAPH_CACHE_TIMEOUT = 60 * 60
+
+def coauthor_nodes(author_ids):
+    """Graph nodes for authors with published work, given their ids or a subquery of them"""
+    rows = (AuthorStats.objects.filter(author__in=author_ids).order_by('author')
+            .values_list('author', 'author__first_name', 'author__last_name', 'author__username',
+                         'publication_count', 'h_index'))
+    return [{
+        'id': author_id,
+        'name': display_name(first_name, last_name, username),
+        'publication_count': publication_count,
+        'h_index': h_index,
+    } for author_id, first_name, last_name, username, publication_count, h_index in rows]
+
+def edge_data(source, target, publication_count, weight):
+    return {'source': source, 'target': target, 'publication_count': publication_count, 'weight': weight}
+
+@api_view(['GET'])
+@permission_classes([SiteAvailable, AllowAny])
+def author_network(request, pk):
+    """A researcher's strongest co-authors and the links among them, from the precomputed edges"""
+    if author_stats(pk) is None:
+        raise Http404("No published work by this author")
+    limit = request.query_params.get('limit', '')
+    limit = min(int(limit), EGO_NETWORK_MAX) if limit.isdigit() and int(limit) > 0 else EGO_NETWORK_LIMIT
+
+    edges, between = ego_network(pk, limit)
+    return Response({
+        'author': pk,
+        'nodes': coauthor_nodes([pk] + [edge.coauthor_id for edge in edges]),
+        'edges': [edge_data(edge.author_id, edge.coauthor_id, edge.publication_count, edge.weight)
+                  for edge in edges + between],
+    })
+
+@api_view(['GET'])
+@permission_classes([SiteAvailable, AllowAny])
+def coauthor_graph(request):
+    """The whole co-authorship graph, optionally only links with ?min_publications= joint publications"""
+    minimum = request.query_params.get('min_publications', '')
+    minimum = int(minimum) if minimum.isdigit() else 1
+    # The version moves on whenever an edge changes
+    key = f"research:coauthor-graph:{graph_version()}:{minimum}"
+    data = cache.get(key)
+    if data is None:
+        edges = CoauthorEdge.objects.filter(publication_count__gte=minimum)
+        data = {
+            # Edges are stored both ways, so their authors are every node
+            'nodes': coauthor_nodes(edges.values('author')),
+            # Each link once, from its lower author id
+            'edges': [edge_data(*row) for row in
+                      edges.filter(author__lt=F('coauthor')).order_by('author', 'coauthor')
+                      .values_list('author', 'coauthor', 'publication_count', 'weight')],
+        }
+        cache.set(key, data, COAUTHOR_GRAPH_CACHE_TIMEOUT)
+    return Response(data)
+
+def _export_gzipped(request):
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+def _export_etag(request, fmt):
+    token, _ = catalog_version()
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()[:8]
+    # The gzip and identity bodies differ byte for byte, so their strong tags must too
+    encoding = '-gzip' if _export_gzipped(request) else ''
+    return f"{fmt}-{token}-{query}{encoding}"
+
+def _export_last_modified(request, fmt):
+    return catalog_version()[1]
+
+@require_GET
+@site_available
+# Outside condition() so 304s carry Vary too
+@vary_on_headers('Accept-Encoding')
+@condition(etag_func=_export_etag, last_modified_func=_export_last_modified)
+def export_publications(request, fmt):
+    """Stream every published publication as BibTeX, RIS or CSL-JSON"""
+    if fmt not in EXPORT_FORMATS:
+        raise Http404(f"Unknown export format '{fmt}'")
+
+    queryset = filter_publications(Publication.objects.filter(status='published'), request.GET)
+    content = stream_export(queryset.order_by('-publication_date', 'pk'), fmt)
+    content_type = EXPORT_FORMATS[fmt][0]
+
+    response = StreamingHttpResponse(content_type=f'{content_type}; charset=utf-8')
+    if _export_gzipped(request):
+        response.streaming_content = compress_sequence(chunk.encode() for chunk in content)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response.streaming_content = content
+    response['Content-Disposition'] = f'attachment; filename="shodhsrija-publications.{fmt}"'
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
+
+def project_data(project):
+    """Public representation of a research project annotated by ResearchProjectQuerySet.with_progress"""
+    return {
+        'id': str(project.id),
+        'title': project.title,
+        'description': project.description,
+        'objectives': project.objectives,
+        'status': project.get_status_display(),
+        'priority': project.get_priority_display(),
+        'start_date': project.start_date,
+        'end_date': project.end_date,
+        'expected_completion': project.expected_completion,
+        'principal_investigator': (
+            project.principal_investigator.get_full_name() or project.principal_investigator.username
+            if project.principal_investigator else None),
+        'category': project.category.name if project.category else None,
+        'is_ongoing': project.ongoing,
+        'completion_percentage': project.progress,
+    }
+
+class ResearchProjectListView(generics.ListAPIView):
+    """List research projects that are not cancelled, a page at a time"""
+    permission_classes = [SiteAvailable, AllowAny]
+    pagination_class = KeysetPagination
+    # ?sort= values and the orderings they page through; progress is worked
+    # out per row, so paging by it sorts every project matching the filters
+    sort_orderings = {
+        'recent': ['-start_date', '-created_at'],
+        'progress': ['-progress', '-start_date', '-created_at'],
+    }
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = ResearchProject.objects.exclude(status='cancelled').select_related(
+            'category', 'principal_investigator')
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if params.get('progress__gte', '').isdigit():
+            return queryset.progress_at_least(int(params['progress__gte']))
+        return queryset.with_progress()
+
+    def list(self, request):
+        self.ordering = self.sort_orderings.get(request.query_params.get('sort'), self.sort_orderings['recent'])
+        projects = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response([project_data(project) for project in projects])
+
+class ResearchProjectDetailView(generics.RetrieveAPIView):
+    """Get a single research project"""
+    queryset = ResearchProject.objects.exclude(status='cancelled').select_related(
+        'category', 'principal_investigator')
+    permission_classes = [SiteAvailable, AllowAny]
+
+    def get_queryset(self):
+        return super().get_queryset().with_progress()
+
+    def retrieve(self, request, pk=None):
+        project = get_object_or_404(self.get_queryset(), pk=pk)
+        data = project_data(project)
+        data.update({
+            'methodology': project.methodology,
+            'deliverables': project.deliverables,
+            'impact_metrics': project.impact_metrics,
+            'publications': [
+                {'id': str(p.id), 'title': p.title}
+                for p in project.publications.filter(status='published')
+            ],
+        })
+        return Response(data)
@@ -6,6 +6,7 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 from pathlib import Path
+from celery.schedules import crontab
 import dj_database_url
 from django.urls import reverse_lazy
 
@@ -57,6 +58,7 @@ LOCAL_APPS = [
     'apps.donations',
     'apps.issues',
     'apps.cms',
+    'apps.payments',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -69,6 +71,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.SiteSettingsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -99,6 +102,8 @@ if DEBUG:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Take the write lock up front so locking reads queue instead of failing
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
         }
     }
 else:
@@ -151,13 +156,19 @@ DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Generate time-ordered (UUIDv7-style) primary keys for TimeStampedModel rows.
+# Only new rows are affected; existing uuid4 keys stay valid and need no rewrite.
+TIME_ORDERED_UUID_PKS = config('TIME_ORDERED_UUID_PKS', default=False, cast=bool)
+
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.TokenAuthentication',
     ],
+    # Views that set their own permission_classes list SiteAvailable themselves
     'DEFAULT_PERMISSION_CLASSES': [
+        'apps.core.permissions.SiteAvailable',
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -190,10 +201,34 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@shodhsrija.org')
+EMAIL_TIMEOUT = 10
+
+# Outbound email queue, drained by the send_queued_emails Celery task
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
 
 # Razorpay configuration
 RAZORPAY_KEY_ID = config('RAZORPAY_KEY_ID', default='')
 RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='')
+RAZORPAY_WEBHOOK_SECRET = config('RAZORPAY_WEBHOOK_SECRET', default='')
+RAZORPAY_BASE_URL = config('RAZORPAY_BASE_URL', default='https://api.razorpay.com')
+RAZORPAY_CONNECT_TIMEOUT = 3.05
+RAZORPAY_READ_TIMEOUT = 10
+RAZORPAY_POOL_SIZE = 10
+# Open the circuit after this many consecutive failures, probe again after the reset timeout
+RAZORPAY_BREAKER_FAILURE_THRESHOLD = 5
+RAZORPAY_BREAKER_RESET_TIMEOUT = 30
+
+# Webhook events applied per transaction, and how long a queued processing task
+# absorbs further events before another is enqueued
+WEBHOOK_BATCH_SIZE = 500
+WEBHOOK_SCHEDULE_WINDOW = 5
+
+# How long an Idempotency-Key is remembered for payment and donation orders
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+# An unfinished request older than this is taken to have died with its worker;
+# well above the Razorpay timeouts, so live requests keep their claim
+IDEMPOTENCY_CLAIM_LEASE = 60
 
 # Custom User Model (if needed in future)
 # AUTH_USER_MODEL = 'authentication.User'
@@ -396,6 +431,89 @@ if not DEBUG:
         }
     }
 
+# View and download counters are buffered (in Redis, or in process during
+# development) and flushed to the database in grouped updates
+COUNTER_BACKEND = config('COUNTER_BACKEND', default='memory' if DEBUG else 'redis')
+COUNTER_REDIS_URL = config('REDIS_URL', default='redis://127.0.0.1:6379/1')
+COUNTER_FLUSH_INTERVAL = 5
+
+# Celery configuration
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=config('REDIS_URL', default='redis://127.0.0.1:6379/1'))
+CELERY_TIMEZONE = TIME_ZONE
+# Run tasks inline during development so no worker or broker is needed
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=DEBUG, cast=bool)
+CELERY_BEAT_SCHEDULE = {
+    # Counters are kept live by signals; the nightly recount fixes any drift
+    'recount-site-stats': {
+        'task': 'apps.core.tasks.recount_site_stats',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    # Picks up emails waiting on a retry backoff
+    'send-queued-emails': {
+        'task': 'apps.core.tasks.send_queued_emails',
+        'schedule': 60.0,
+    },
+    # Catches events whose processing task was lost
+    'process-webhook-events': {
+        'task': 'apps.payments.tasks.process_webhook_events',
+        'schedule': 30.0,
+    },
+    'flush-counters': {
+        'task': 'apps.core.tasks.flush_counters',
+        'schedule': float(COUNTER_FLUSH_INTERVAL),
+    },
+    'purge-idempotency-records': {
+        'task': 'apps.payments.tasks.purge_idempotency_records',
+        'schedule': crontab(minute=30),
+    },
+    # citation_count is kept live by signals; this catches bulk writes that skip them
+    'recount-citations': {
+        'task': 'apps.research.tasks.recount_citations',
+        'schedule': crontab(hour=3, minute=15),
+    },
+    # Author stats are refreshed as citations and authorship change; this catches bulk writes
+    'refresh-author-stats': {
+        'task': 'apps.research.tasks.refresh_author_stats',
+        'schedule': crontab(hour=3, minute=20),
+    },
+    # Related lists are patched as publications change; the nightly build refreshes term weights
+    'rebuild-related-index': {
+        'task': 'apps.research.tasks.rebuild_related_index',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    # Edges are patched as authorship changes; this catches bulk writes
+    'rebuild-coauthor-graph': {
+        'task': 'apps.research.tasks.rebuild_coauthor_graph',
+        'schedule': crontab(hour=3, minute=45),
+    },
+    'update-scholar-searches': {
+        'task': 'apps.research.tasks.update_scholar_searches',
+        'schedule': crontab(minute=10),
+    },
+}
+
+# PDF text extraction for search: worker processes for batch runs, and a
+# directory to read PDFs from instead of Cloudinary (a local copy, or fixtures)
+PDF_TEXT_WORKERS = config('PDF_TEXT_WORKERS', default=2, cast=int)
+PDF_TEXT_LOCAL_ROOT = config('PDF_TEXT_LOCAL_ROOT', default='')
+
+# Google Scholar auto-update: the source class (SerpApi by default; run_fake_scholar
+# serves the same API locally), how often each search is due in seconds, and how
+# hard the source is hit, with the rate shared by every worker through the cache
+SCHOLAR_SOURCE = config('SCHOLAR_SOURCE', default='apps.research.scholar.SerpApiSource')
+SCHOLAR_BASE_URL = config('SCHOLAR_BASE_URL', default='https://serpapi.com')
+SCHOLAR_API_KEY = config('SCHOLAR_API_KEY', default='')
+SCHOLAR_TIMEOUT = 20
+SCHOLAR_UPDATE_INTERVAL = config('SCHOLAR_UPDATE_INTERVAL', default=7 * 24 * 60 * 60, cast=int)
+SCHOLAR_BATCH_SIZE = 500
+SCHOLAR_MAX_PAGES = 5
+SCHOLAR_CONCURRENCY = 4
+SCHOLAR_RATE_LIMIT = config('SCHOLAR_RATE_LIMIT', default=2.0, cast=float)
+SCHOLAR_LOCK_TIMEOUT = 60 * 60
+
+# Seconds a worker trusts its in-memory singletons before re-checking the version key
+SINGLETON_VERSION_CHECK_INTERVAL = config('SINGLETON_VERSION_CHECK_INTERVAL', default=1.0, cast=float)
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -17,6 +17,7 @@ urlpatterns = [
     path('api/donations/', include('apps.donations.urls')),
     path('api/issues/', include('apps.issues.urls')),
     path('api/cms/', include('apps.cms.urls')),
+    path('api/payments/', include('apps.payments.urls')),
 
     # Catch-all for React frontend (should be last)
     path('', TemplateView.as_view(template_name='index.html'), name='frontend'),
@@ -1,11 +1,12 @@
 
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { motion } from 'framer-motion';
 import { Helmet } from 'react-helmet-async';
 import { useForm } from 'react-hook-form';
 import { useMutation } from 'react-query';
 import toast from 'react-hot-toast';
 import { HeartIcon, ShieldCheckIcon, DocumentCheckIcon } from '@heroicons/react/24/solid';
+import { generateIdempotencyKey } from '../utils/helpers';
 
 // Load Razorpay
 const loadRazorpay = () => {
@@ -18,11 +19,12 @@ const loadRazorpay = () => {
   });
 };
 
-const createDonationOrder = async (data) => {
+const createDonationOrder = async ({ idempotencyKey, ...data }) => {
   const response = await fetch('/api/donations/create-order/', {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      'Idempotency-Key': idempotencyKey,
     },
     body: JSON.stringify(data),
   });
@@ -50,8 +52,14 @@ const Donations = () => {
 
   const { register, handleSubmit, formState: { errors }, reset } = useForm();
 
+  // One key per checkout attempt, so double submits and retries after a
+  // lost response get the same order back. A new key is drawn once an order
+  // is created or the donor changes what they are submitting.
+  const checkout = useRef({ key: generateIdempotencyKey(), body: null });
+
   const donationMutation = useMutation(createDonationOrder, {
     onSuccess: async (data) => {
+      checkout.current = { key: generateIdempotencyKey(), body: null };
       await handlePayment(data);
     },
     onError: (error) => {
@@ -128,10 +136,24 @@ const Donations = () => {
     // Store donor data in session for payment verification
     sessionStorage.setItem('donation_data', JSON.stringify(donationData));
 
-    donationMutation.mutate({
-      payment_type: 'donation',
+    const order = {
+      donor_name: data.name,
+      donor_email: data.email,
+      donor_phone: data.phone || '',
+      pan_number: data.pan_number || '',
+      wants_80g_certificate: Boolean(data.wants_80g_certificate),
+      purpose: data.purpose || '',
+      message: data.message || '',
+      donation_type: donationType,
       amount: getCurrentAmount(),
-    });
+    };
+    const body = JSON.stringify(order);
+    if (checkout.current.body !== null && checkout.current.body !== body) {
+      checkout.current.key = generateIdempotencyKey();
+    }
+    checkout.current.body = body;
+
+    donationMutation.mutate({ idempotencyKey: checkout.current.key, ...order });
   };
 
   return (
@@ -46,6 +46,8 @@ const createPaymentOrder = async (data) => {
     headers: {
       'Content-Type': 'application/json',
       'Authorization': `Bearer ${token}`,
+      // Paying again for the same application reuses its order
+      'Idempotency-Key': `membership-${data.application_id}`,
     },
     body: JSON.stringify(data),
   });
@@ -2,36 +2,68 @@
 import React, { useState } from 'react';
 import { motion } from 'framer-motion';
 import { Helmet } from 'react-helmet-async';
-import { useQuery } from 'react-query';
+import { useInfiniteQuery, useQuery } from 'react-query';
 import { MagnifyingGlassIcon, DocumentArrowDownIcon, ClipboardDocumentIcon } from '@heroicons/react/24/outline';
 
-const fetchPublications = async (searchQuery = '', category = '') => {
+const fetchPublications = async (searchQuery = '', category = '', cursor = '') => {
   const params = new URLSearchParams();
   if (searchQuery) params.append('search', searchQuery);
   if (category) params.append('category', category);
+  if (cursor) params.append('cursor', cursor);
 
   const response = await fetch(`/api/research/publications/?${params.toString()}`);
   if (!response.ok) throw new Error('Failed to fetch publications');
   return response.json();
 };
 
+const fetchFacets = async (searchQuery = '') => {
+  const params = new URLSearchParams();
+  if (searchQuery) params.append('search', searchQuery);
+
+  const response = await fetch(`/api/research/publications/facets/?${params.toString()}`);
+  if (!response.ok) throw new Error('Failed to fetch facet counts');
+  return response.json();
+};
+
 const Research = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('');
   const [showCitation, setShowCitation] = useState(null);
   const [citationFormat, setCitationFormat] = useState('apa');
 
-  const { data: publications, isLoading, refetch } = useQuery(
-    ['publications', searchQuery, selectedCategory], 
-    () => fetchPublications(searchQuery, selectedCategory),
-    { keepPreviousData: true }
+  const { data, isLoading, refetch, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery(
+    ['publications', searchQuery, selectedCategory],
+    ({ pageParam }) => fetchPublications(searchQuery, selectedCategory, pageParam),
+    {
+      keepPreviousData: true,
+      getNextPageParam: (lastPage) => lastPage.next ? new URL(lastPage.next).searchParams.get('cursor') : undefined,
+    }
   );
+  const publications = data ? data.pages.flatMap((page) => page.results) : [];
+
+  // Counted across every category, so each button shows what selecting it would list
+  const { data: facets } = useQuery(['publication-facets', searchQuery], () => fetchFacets(searchQuery), {
+    keepPreviousData: true,
+  });
+  const categoryCount = (category) => {
+    if (!facets) return null;
+    if (category === 'All') return facets.total;
+    const facet = facets.category.find((item) => item.value === category);
+    return facet ? facet.count : 0;
+  };
 
   const handleSearch = (e) => {
     e.preventDefault();
     refetch();
   };
 
+  const citationFormats = [
+    { value: 'apa', label: 'APA' },
+    { value: 'mla', label: 'MLA' },
+    { value: 'chicago', label: 'Chicago' },
+    { value: 'bibtex', label: 'BibTeX' },
+  ];
+
   const categories = [
     'All', 'Urban Issues', 'Environmental Issues', 'Digital Divide', 'Governance Issues', 'Social Issues'
   ];
@@ -122,6 +154,9 @@ const Research = () => {
                     }`}
                   >
                     {category}
+                    {categoryCount(category) !== null && (
+                      <span className="ml-1 opacity-75">({categoryCount(category)})</span>
+                    )}
                   </button>
                 ))}
               </div>
@@ -208,9 +243,9 @@ const Research = () => {
 
                     {/* Actions */}
                     <div className="flex flex-wrap gap-2">
-                      {publication.pdf_url && (
+                      {publication.download_url && (
                         <a
-                          href={publication.pdf_url}
+                          href={publication.download_url}
                           target="_blank"
                           rel="noopener noreferrer"
                           className="flex items-center space-x-1 px-3 py-2 bg-green-600 hover:bg-green-700 text-white rounded text-sm font-medium transition-colors"
@@ -251,35 +286,28 @@ const Research = () => {
                         <div className="flex items-center justify-between mb-3">
                           <h4 className="font-semibold text-gray-900 dark:text-white">Citation</h4>
                           <div className="flex space-x-2">
-                            <button
-                              onClick={() => setCitationFormat('apa')}
-                              className={`px-2 py-1 text-xs rounded ${
-                                citationFormat === 'apa'
-                                  ? 'bg-blue-600 text-white'
-                                  : 'bg-gray-200 dark:bg-gray-600 text-gray-700 dark:text-gray-300'
-                              }`}
-                            >
-                              APA
-                            </button>
-                            <button
-                              onClick={() => setCitationFormat('mla')}
-                              className={`px-2 py-1 text-xs rounded ${
-                                citationFormat === 'mla'
-                                  ? 'bg-blue-600 text-white'
-                                  : 'bg-gray-200 dark:bg-gray-600 text-gray-700 dark:text-gray-300'
-                              }`}
-                            >
-                              MLA
-                            </button>
+                            {citationFormats.map((format) => (
+                              <button
+                                key={format.value}
+                                onClick={() => setCitationFormat(format.value)}
+                                className={`px-2 py-1 text-xs rounded ${
+                                  citationFormat === format.value
+                                    ? 'bg-blue-600 text-white'
+                                    : 'bg-gray-200 dark:bg-gray-600 text-gray-700 dark:text-gray-300'
+                                }`}
+                              >
+                                {format.label}
+                              </button>
+                            ))}
                           </div>
                         </div>
                         <div className="bg-white dark:bg-gray-800 p-3 rounded border">
-                          <p className="text-sm text-gray-700 dark:text-gray-300 font-mono">
-                            {citationFormat === 'apa' ? publication.citation_apa : publication.citation_mla}
+                          <p className="text-sm text-gray-700 dark:text-gray-300 font-mono whitespace-pre-wrap">
+                            {publication[`citation_${citationFormat}`]}
                           </p>
                         </div>
                         <button
-                          onClick={() => copyToClipboard(citationFormat === 'apa' ? publication.citation_apa : publication.citation_mla)}
+                          onClick={() => copyToClipboard(publication[`citation_${citationFormat}`])}
                           className="mt-2 px-3 py-1 bg-blue-600 hover:bg-blue-700 text-white text-xs rounded transition-colors"
                         >
                           Copy to Clipboard
@@ -295,6 +323,17 @@ const Research = () => {
                     )}
                   </motion.div>
                 ))}
+                {hasNextPage && (
+                  <div className="lg:col-span-2 text-center">
+                    <button
+                      onClick={() => fetchNextPage()}
+                      disabled={isFetchingNextPage}
+                      className="px-6 py-3 bg-blue-600 hover:bg-blue-700 disabled:opacity-50 text-white rounded-full font-semibold transition-colors"
+                    >
+                      {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
               </motion.div>
             ) : (
               <div className="text-center py-12">
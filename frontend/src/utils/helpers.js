@@ -81,6 +81,14 @@ export const debounce = (func, wait) => {
   };
 };
 
+// Unique key for the Idempotency-Key header, so a repeated submit replays the first response
+export const generateIdempotencyKey = () => {
+  if (window.crypto && window.crypto.randomUUID) {
+    return window.crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+};
+
 export const getFileSize = (bytes) => {
   const sizes = ['Bytes', 'KB', 'MB', 'GB'];
   if (bytes === 0) return '0 Bytes';